@@ -4,16 +4,18 @@ import yaml
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from agents.research_agent.agent import ResearcherAgent
 from agents.research_agent.state import State
+from agents.research_agent.batch import BatchRunner
 from langchain_core.runnables import RunnableConfig
 import asyncio
 import time
-import datetime
 
 async def test():
     """Test the agent."""
     
     # topic = "Casos de uso de agentes en el MWC Barcelona 2025"
     topic = input("Enter the topic to research: ")
+    # With checkpointing, the thread_id printed by an interrupted run resumes it
+    thread_id = input("Enter the thread ID of a run to resume (empty for a new run): ").strip() or None
 
 
     # Load the YAML file into a dictionary
@@ -25,14 +27,13 @@ async def test():
     # Create a RunnableConfig object. The key "configurable" is expected by AgentConfig.from_runnable_config
     runnable_config = RunnableConfig(configurable=config_data)
 
-    # Create a sample config
-    agent = ResearcherAgent()
-
     test_state = State(
             topic=topic
         )
-    
-    output_state = await agent.run(test_state, config=runnable_config)
+
+    # The agent releases its shared resources on exit, also when the run fails or times out
+    async with ResearcherAgent() as agent:
+        output_state = await agent.run(test_state, config=runnable_config, thread_id=thread_id)
     print("----------------------------------------------------------------------------------------------------------------------------------------")
     output_dictionary = output_state["synthesized_info"]["content"]
     print("Synthesized information:")
@@ -41,9 +42,7 @@ async def test():
     print("----------------------------------------------------------------------------------------------------------------------------------------")
 
 async def company_research():
-    """Test the agent."""
-    input_excel = "research_questions.xlsx"
-
+    """Research the companies concurrently with the batch runner."""
     # Load the YAML file into a dictionary
     print("Loading config data...")
     with open("config/research_agent_config.yaml", "r") as file:
@@ -52,31 +51,25 @@ async def company_research():
     # Create a RunnableConfig object. The key "configurable" is expected by AgentConfig.from_runnable_config
     runnable_config = RunnableConfig(configurable=config_data)
 
-    # Create a sample config
-    agent = ResearcherAgent()
-
-    # Do date_time formatting
-    output_excel = "companies_research_"+ datetime.datetime.now().strftime("%Y%m%d_%H%M%S")+".xlsx"
-
     # Companies to research
     companies = ["Veolia", "Airpharm Logistics", "Celsa", "Insudpharma", "Tous", "Laboratorios Rovi", "Bon Preu", "Bacardi", "Damm", "Cbre", "Aedas Home", "Carrefour", "Dkv Seguros Salud", "Acesur", "Asisa", "Intrum",  "Grupo Consorcio Conservas", "Refrival", "Unicaja", "Diglo Servicer", "Bankinter", "Ayvens", "Mutua Madrileña", "El Corte Inglés", "Seguros Santalucia", "Ferrovial"]
-   
-    for company in companies:
-        print(f"Researching {company}...")
-        # Create a new state for each company
-        test_state = State(
-            topic=company+" info",
-            company=company,
-            output_excel=output_excel,  
-            input_excel=input_excel 
-        )
 
-        # Run the workflow with the first test state
-        output_state = await agent.run(test_state, config=runnable_config)
+    # A single agent for the batch: the companies share its graphs and the pooled HTTP session
+    runner = BatchRunner(runnable_config)
+    try:
+        report = await runner.run(companies)
+    finally:
+        # Close the pooled HTTP session shared by all the companies, also when the batch fails
+        await runner.agent.aclose()
 
-        print("----------------------------------------------------------------------------------------------------------------------------------------")
-        for message in output_state["messages"]:
-            print(message.content)
+    print("----------------------------------------------------------------------------------------------------------------------------------------")
+    for result in report.results:
+        if result.status in ("ok", "skipped"):
+            for message in result.output["messages"]:
+                print(message.content)
+        else:
+            print(f"{result.company}: {result.status} ({result.error})")
+    print(f"Batch: {report.summary()}")
 
 async def main():
     """Run the test with a timeout of 90 minutes."""
@@ -88,4 +81,5 @@ async def main():
     except asyncio.TimeoutError:
         print("Test timed out")
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,18 +1,39 @@
 import asyncio
+import functools
 import json
+import uuid
 import pandas as pd
-from typing import Any, Dict, List, Optional, cast
-from langchain_core.messages import AIMessage
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, cast
+from langchain_core.messages import AIMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from pydantic import BaseModel, Field
-from agents.utils.prompt_manager import PromptManager
+from agents.utils.prompt_manager import PromptManager, get_prompt_registry
 from agents.research_agent.state import State
-from agents.tools.scrape_website import extract_notes
+from agents.research_agent.pipeline import StreamingExtraction
+from agents.research_agent.progress import emit_progress, progress_event
+from agents.tools.scrape_website import extract_notes, fetch_page_text, summarize_page, summarize_pages, fetch_failure, is_fetch_failure, FETCH_FAILURES, WebInfo, PackedWebInfo
+from agents.tools.page_dedup import simhash, group_near_duplicates, find_near_duplicate, get_fingerprint_store
+from agents.tools.http_client import close_fetcher
+from agents.tools.fetch_cache import close_fetch_cache
+from agents.tools.search_cache import close_search_cache
+from agents.utils.cassette import close_cassette
+from agents.utils.checkpoint import get_checkpointer, close_checkpointer
+from agents.utils.blob_store import BLOB_KEY, get_blob_store, close_blob_store, is_blob_ref
+from agents.tools.fetch_scheduler import reset_fetch_scheduler
+from agents.utils.executor import LoopLagMonitor, get_parse_executor, shutdown_parse_executor
 from agents.tools.search_webs import search
+from agents.tools.query_fanout import fan_out_search
 from agents.tools.get_info_excel import generate_json_schema
+from agents.utils.urls import dedup_url_key
 from agents.tools.save_info_extracted import ExcelInfoSaver
 from interfaces.llm_interface import LLMInterface
+from interfaces.llm_registry import get_llm_registry, close_llm_registry
+from interfaces.llm_cache import get_llm_cache, close_llm_cache
+from interfaces.semantic_cache import get_semantic_cache, close_semantic_cache
+from interfaces.llm_rate_limiter import get_llm_rate_limiter
+from agents.utils.llm_ledger import LLMLedger, set_current_ledger, reset_current_ledger, summarize_records
 from agents.research_agent.agent_config import AgentConfig
 
 class SynthesizedInfo(BaseModel):
@@ -45,6 +66,30 @@ class InfoIsSatisfactory(BaseModel):
         default=None,
     )
 
+
+RUN_CONTEXT_KEY = "run_context"
+"Key of the graph config under which the nodes find the RunContext of their run."
+
+
+@dataclass
+class RunContext:
+    """
+    Configuration, prompts, LLM ledger and counters of one run of the agent. Concurrent runs (a batch) share
+    the agent and its compiled graphs, so each run passes its own context to the nodes in the graph config.
+    """
+    config: AgentConfig
+    prompt_manager: PromptManager
+    ledger: LLMLedger
+    dedup_stats: Dict[str, int] = field(default_factory=lambda: {"duplicates_collapsed": 0, "llm_calls_avoided": 0})
+    packing_stats: Dict[str, int] = field(default_factory=lambda: {"calls": 0, "packed_calls": 0, "pages_packed": 0, "calls_saved": 0, "tokens_saved": 0, "fallbacks": 0})
+    loop_lag_stats: Optional[Dict[str, float]] = None
+
+
+def run_context(config: RunnableConfig) -> RunContext:
+    """The RunContext of the run a node is called in, from the config the graph passes to it."""
+    return config["configurable"][RUN_CONTEXT_KEY]
+
+
 class ResearcherAgent:
     """
     Data enrichment agent that uses a LangGraph workflow to gather and process information.
@@ -52,6 +97,15 @@ class ResearcherAgent:
     """
     def __init__(self):
         self.graph = self.graph_building()
+        self.streaming_graph = self.graph_building(streaming=True)
+        self.llm_stats = None
+        self.llm_cache_stats = None
+        self.rate_limiter_stats = None
+        self.semantic_cache_stats = None
+        self.checkpoint_stats = None
+        self.blob_store_stats = None
+        # LLM call records of every run of this agent (the batch)
+        self.ledger_records: List[Dict[str, Any]] = []
 
     def excel_to_json(self, state: State):
         """Convert the Excel file to a JSON schema."""
@@ -70,63 +124,224 @@ class ResearcherAgent:
             "extraction_schema": state.extraction_schema
         }
     
-    async def search_urls(self, state: State):
+    async def search_urls(self, state: State, config: RunnableConfig):
         """Search for URLs related to the topic."""
         print(f"Searching for URLs related to {state.topic}")
+        agent_config = run_context(config).config
         topic = state.topic
-        response = await search(topic, self.config)
-        urls = [item["url"] for item in response]
+        if not agent_config.search_fanout:
+            response = await search(topic, agent_config)
+            urls = [item["url"] for item in response]
+        else:
+            # Several query variants in one round trip, keeping the best fused URLs not extracted yet
+            response = await fan_out_search(topic, agent_config)
+            urls = self.filter_new_urls([item["url"] for item in response], state)[:agent_config.search_url_budget]
         return {
             "messages": [AIMessage(content="Search completed. URLs extracted.")],
             "urls": urls
         }
     
-    async def extract_info(self, state: State):
+    async def extract_info(self, state: State, config: RunnableConfig):
         """Extract information from the URLs."""
         print(f"Extracting information from URLs")
+        run = run_context(config)
         urls = state.urls
         if not urls:
             return {
-                "messages": [AIMessage(content="No valid URLs found.")]
+                "messages": [AIMessage(content="No valid URLs found.")],
+                "new_urls": [],
             }
-        extraction_tasks = [extract_notes(url, state=state, config=self.config) for url in urls]
-        extracted_info = await asyncio.gather(*extraction_tasks)
 
-        # Update the state with the extracted information
-        state.extracted_info.update({url: info for url, info in zip(urls, extracted_info)})
-        
-        # Convert the extracted information into AIMessages
-        messages = [AIMessage(content=f"Extracted info from {url}:\n{info}") for url, info in state.extracted_info.items()]
+        # Skip the URLs already extracted in a previous loop of this run
+        urls = self.filter_new_urls(urls, state)
+        extracted_before = dict(state.extracted_info)
+        llm_calls_avoided_before = run.dedup_stats["llm_calls_avoided"]
+        if not urls:
+            return self.extraction_update(state, run, 0, extracted_before, llm_calls_avoided_before)
+
+        if run.config.dedup_pages:
+            await self.extract_unique_pages(urls, state, run)
+        elif run.config.extract_packing:
+            texts = await asyncio.gather(*(fetch_page_text(url, run.config) for url in urls))
+            pages = [(url, text) for url, text in zip(urls, texts) if text not in FETCH_FAILURES]
+            notes = await summarize_pages(pages, state, run.config, run.packing_stats)
+            state.extracted_info.update({url: notes[url] if url in notes else fetch_failure(url, text) for url, text in zip(urls, texts)})
+            print(f"Packed extraction: {run.packing_stats}")
+        else:
+            extraction_tasks = [extract_notes(url, state=state, config=run.config) for url in urls]
+            extracted_info = await asyncio.gather(*extraction_tasks)
 
+            # Update the state with the extracted information
+            state.extracted_info.update({url: info for url, info in zip(urls, extracted_info)})
+
+        return self.extraction_update(state, run, len(urls), extracted_before, llm_calls_avoided_before)
+
+    async def search_extract_info(self, state: State, config: RunnableConfig):
+        """Search the topic and extract the information of the URLs as a streaming pipeline, without stage barriers."""
+        print(f"Searching and extracting information for {state.topic}")
+        run = run_context(config)
+        extracted_before = dict(state.extracted_info)
+        llm_calls_avoided_before = run.dedup_stats["llm_calls_avoided"]
+        pipeline = StreamingExtraction(state, run.config, run.dedup_stats, self.known_urls(state))
+        await pipeline.run()
+        if run.config.dedup_pages:
+            print(f"Deduplication: {run.dedup_stats}")
+
+        state.urls = pipeline.found_urls
         return {
-            "messages": messages
+            **self.extraction_update(state, run, len(pipeline.new_urls), extracted_before, llm_calls_avoided_before),
+            "urls": state.urls,
         }
 
+    def extraction_update(self, state: State, run: RunContext, urls_new: int, extracted_before: Dict[str, Any], llm_calls_avoided_before: int) -> Dict[str, Any]:
+        """State update of an extraction loop: the newly extracted URLs, their messages and the loop counters."""
+        new_urls = [
+            url for url, info in state.extracted_info.items()
+            if info is not extracted_before.get(url) and not is_fetch_failure(info)
+        ]
+        skipped = len(state.urls) - urls_new
+        loop_stats = {
+            "loop": state.loop_count,
+            "urls_found": len(state.urls),
+            "urls_new": urls_new,
+            "fetches_avoided": skipped,
+            "llm_calls_avoided": skipped + run.dedup_stats["llm_calls_avoided"] - llm_calls_avoided_before,
+        }
+        print(f"Loop {state.loop_count}: {loop_stats}")
 
-    async def synthesize_info(self, state: State):
+        # Convert only the newly extracted information into AIMessages, or a status line with the compact state
+        if run.config.compact_state:
+            messages = [AIMessage(content=f"Extracted info from {len(new_urls)} new sources.")] if new_urls else []
+        else:
+            messages = [AIMessage(content=f"Extracted info from {url}:\n{state.extracted_info[url]}") for url in new_urls]
+        if not messages:
+            messages = [AIMessage(content="No new sources found.")]
+
+        return {
+            "messages": messages,
+            "extracted_info": state.extracted_info,
+            "new_urls": new_urls,
+            "loop_stats": state.loop_stats + [loop_stats],
+            "page_fingerprints": state.page_fingerprints,
+        }
+
+    def known_urls(self, state: State) -> Set[str]:
+        """Canonical URLs already extracted in this run, including the sources collapsed into them."""
+        seen = set()
+        for url, info in state.extracted_info.items():
+            if is_fetch_failure(info):
+                continue  # Failed fetches are retried
+            seen.add(dedup_url_key(url))
+            seen.update(dedup_url_key(source) for source in info.get("sources", []))
+        return seen
+
+    def filter_new_urls(self, urls: List[str], state: State) -> List[str]:
+        """Drop the URLs that, compared by their dedup key, were already extracted in this run or repeat in the list."""
+        seen = self.known_urls(state)
+        new_urls = []
+        for url in urls:
+            url_key = dedup_url_key(url)
+            if url_key not in seen:
+                seen.add(url_key)
+                new_urls.append(url)
+        return new_urls
+
+    async def extract_unique_pages(self, urls: List[str], state: State, run: RunContext):
+        """
+        Fetch the pages and collapse near-duplicates (e.g. syndicated press releases) before the LLM call,
+        so each unique page is extracted once and its notes carry all the source URLs.
+        """
+        texts = await asyncio.gather(*(fetch_page_text(url, run.config) for url in urls))
+        pages = [(url, text) for url, text in zip(urls, texts) if text not in FETCH_FAILURES]
+        state.extracted_info.update({url: fetch_failure(url, text) for url, text in zip(urls, texts) if text in FETCH_FAILURES})
+
+        executor = get_parse_executor(run.config)
+        fingerprints = await asyncio.gather(
+            *(executor.run(simhash, text, run.config.dedup_shingle_words) for _, text in pages)
+        )
+        store = get_fingerprint_store(run.config)
+        max_distance = run.config.dedup_max_distance
+
+        to_extract = []
+        for group in group_near_duplicates(fingerprints, max_distance):
+            sources = [pages[index][0] for index in group]
+            representative = max(group, key=lambda index: len(pages[index][1]))
+            url, text = pages[representative]
+            fingerprint = fingerprints[representative]
+            run.dedup_stats["duplicates_collapsed"] += len(group) - 1
+
+            # Near-duplicate of a page extracted in a previous loop, only the new sources are added
+            previous_url = find_near_duplicate(fingerprint, state.page_fingerprints, max_distance)
+            if previous_url and previous_url in state.extracted_info:
+                previous_sources = state.extracted_info[previous_url].setdefault("sources", [previous_url])
+                previous_sources.extend(source for source in sources if source not in previous_sources)
+                run.dedup_stats["llm_calls_avoided"] += len(group)
+                continue
+
+            # Near-duplicate of a page already extracted for the same topic, e.g. by an earlier run
+            reused_notes = store.lookup(fingerprint, state.topic)
+            if reused_notes is not None:
+                state.extracted_info[url] = {**reused_notes, "url": url, "sources": sources}
+                state.page_fingerprints[url] = fingerprint
+                await emit_progress("extraction", {"url": url, "notes": state.extracted_info[url], "reused": True})
+                run.dedup_stats["llm_calls_avoided"] += len(group)
+                continue
+
+            run.dedup_stats["llm_calls_avoided"] += len(group) - 1
+            to_extract.append((url, text, fingerprint, sources))
+
+        if run.config.extract_packing:
+            # Several unique pages per LLM call
+            packed = await summarize_pages([(url, text) for url, text, _, _ in to_extract], state, run.config, run.packing_stats)
+            extracted_notes = [packed[url] for url, _, _, _ in to_extract]
+            print(f"Packed extraction: {run.packing_stats}")
+        else:
+            extracted_notes = await asyncio.gather(
+                *(summarize_page(url, text, state, run.config) for url, text, _, _ in to_extract)
+            )
+        for (url, _, fingerprint, sources), notes in zip(to_extract, extracted_notes):
+            store.add(fingerprint, state.topic, dict(notes))
+            state.extracted_info[url] = {**notes, "sources": sources} if len(sources) > 1 else notes
+            state.page_fingerprints[url] = fingerprint
+
+        print(f"Deduplication: {run.dedup_stats}")
+
+
+    async def synthesize_info(self, state: State, config: RunnableConfig):
         """Synthesize the extracted information into a coherent response."""
         print(f"Synthesizing extracted information")
+        run = run_context(config)
         if not state.extracted_info:
             return {
                 "messages": [AIMessage(content="No extracted information to synthesize.")]
             }
          
-        # Get the prompt for the synthesis
-        prompt = self.prompt_manager.get_prompt("synthesize")
         if not state.previous_info:
             state.previous_info = ''
         
-        prompt = prompt.format(
+        # The previous synthesis already covers the sources of the earlier loops, only the new ones are sent
+        if state.previous_info:
+            if not state.new_urls:
+                print(f"No new sources, keeping the previous synthesis")
+                return {
+                    "messages": [AIMessage(content="No new sources, synthesis kept.")],
+                    "synthesized_info": state.previous_info,
+                }
+            extracted_info = {url: state.extracted_info[url] for url in state.new_urls}
+        else:
+            extracted_info = state.extracted_info
+
+        prompt = run.prompt_manager.render(
+            "synthesize",
             topic=state.topic,
-            extracted_info=json.dumps(state.extracted_info, indent=2, ensure_ascii=False),
+            extracted_info=json.dumps(extracted_info, indent=2, ensure_ascii=False),
             previous_info=json.dumps(state.previous_info, indent=2, ensure_ascii=False)
         )
 
         # Call the LLM to synthesize the information
-        llm = LLMInterface(self.config).get_llm()
-        bound_model = llm.with_structured_output(SynthesizedInfo)
-        response = cast(SynthesizedInfo, await bound_model.ainvoke(prompt))
-        response = await llm.ainvoke(prompt)
+        llm_interface = LLMInterface(run.config)
+        response = cast(SynthesizedInfo, await llm_interface.ainvoke(prompt, node="synthesize", schema=SynthesizedInfo))
+        response = await llm_interface.ainvoke(prompt, node="synthesize")
         state.synthesized_info = response.model_dump()
           
         return {
@@ -135,23 +350,23 @@ class ResearcherAgent:
         }
  
 
-    async def validate_info(self, state: State):
+    async def validate_info(self, state: State, config: RunnableConfig):
         """Review if the synthesized information is satisfactory, and if not, generate a new topic to restart the search."""
         print(f"Validating synthesized information")
+        run = run_context(config)
         if not state.synthesized_info:
             return {
                 "messages": [AIMessage(content="No synthesized information to validate.")]
             }
         
-        prompt = self.prompt_manager.get_prompt("validate").format(
+        prompt = run.prompt_manager.render(
+            "validate",
             topic=state.topic,
             synthesized_info=json.dumps(state.synthesized_info, indent=2, ensure_ascii=False)
         )
 
         # Call the LLM to validate the synthesized information, see if it's satisfactory
-        llm = LLMInterface(self.config).get_llm()
-        bound_model = llm.with_structured_output(InfoIsSatisfactory)
-        response = cast(InfoIsSatisfactory, await bound_model.ainvoke(prompt))
+        response = cast(InfoIsSatisfactory, await LLMInterface(run.config).ainvoke(prompt, node="validate", schema=InfoIsSatisfactory))
         state.is_satisfactory = bool(response.is_satisfactory)
 
         # If the info is satisfactory, return the final response
@@ -182,25 +397,64 @@ class ResearcherAgent:
             "messages": [AIMessage(content=f"Saved extracted information to {state.output_excel}")]
         }
 
-    async def router_decision(self, state: State):
+    async def router_decision(self, state: State, config: RunnableConfig):
         """Decide whether to end the search or continue."""
-        if state.is_satisfactory == True or state.loop_count >= self.config.max_loops:
+        if state.is_satisfactory == True or state.loop_count >= run_context(config).config.max_loops:
             return "end"
         else:
             return "search"
 
-    def graph_building(self):
+    def compact_node(self, node):
+        """
+        Wrap a node for the compact state: the node works on the full page notes as usual, resolved from the
+        blob store, and its state update carries references to them and removes the messages beyond the limit.
+        With checkpointing, the blobs referenced by the state checkpointed after the node are touched, so the
+        blob store's TTL sweep does not delete the notes of a run that can still be resumed.
+        """
+        @functools.wraps(node)
+        async def compact(state: State, config: RunnableConfig):
+            agent_config = run_context(config).config
+            store = get_blob_store(agent_config)
+            if store is None:
+                return await node(state, config)
+            extracted_refs = state.extracted_info
+            # The store reads and writes SQLite and compresses the notes, off the event loop
+            state.extracted_info = await asyncio.to_thread(store.resolve, extracted_refs)
+            update = await node(state, config)
+            if "extracted_info" in update:
+                extracted_info = update["extracted_info"]
+                refs = await asyncio.to_thread(
+                    store.put_many, {url: info for url, info in extracted_info.items() if not is_fetch_failure(info)}
+                )
+                update["extracted_info"] = extracted_refs = {url: refs.get(url, info) for url, info in extracted_info.items()}
+            if get_checkpointer(agent_config) is not None:
+                await asyncio.to_thread(store.touch, [ref[BLOB_KEY] for ref in extracted_refs.values() if is_blob_ref(ref)])
+            excess = len(state.messages) + len(update.get("messages", [])) - agent_config.state_message_limit
+            if excess > 0:
+                removed = [RemoveMessage(id=message.id) for message in state.messages[:excess] if message.id]
+                update["messages"] = removed + list(update.get("messages", []))
+            return update
+        return compact
+
+    def graph_building(self, streaming: bool = False):
         self.workflow = StateGraph(
             State, config_schema=AgentConfig
         )
-        self.workflow.add_node("search", self.search_urls)
-        self.workflow.add_node("extract_info", self.extract_info)
-        self.workflow.add_node("synthesize", self.synthesize_info)
-        self.workflow.add_node("validate", self.validate_info)
+        if streaming:
+            # A single node streams the search results into the fetches and the extractions
+            self.workflow.add_node("search", self.compact_node(self.search_extract_info))
+        else:
+            self.workflow.add_node("search", self.compact_node(self.search_urls))
+            self.workflow.add_node("extract_info", self.compact_node(self.extract_info))
+        self.workflow.add_node("synthesize", self.compact_node(self.synthesize_info))
+        self.workflow.add_node("validate", self.compact_node(self.validate_info))
 
         self.workflow.add_edge("__start__", "search")
-        self.workflow.add_edge("search", "extract_info")
-        self.workflow.add_edge("extract_info", "synthesize")
+        if streaming:
+            self.workflow.add_edge("search", "synthesize")
+        else:
+            self.workflow.add_edge("search", "extract_info")
+            self.workflow.add_edge("extract_info", "synthesize")
         self.workflow.add_edge("synthesize", "validate")
         self.workflow.add_conditional_edges(
             "validate",
@@ -214,16 +468,186 @@ class ResearcherAgent:
         return graph
 
     async def run(
-        self, state: State, config: RunnableConfig
+        self, state: State, config: RunnableConfig, thread_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Executes the LangGraph workflow for the given state and configuration.
 
         :param state: The input state for the research process.
         :param config: Optional configuration for the workflow.
+        :param thread_id: With checkpointing, the ID of the run to resume if it was interrupted, a new run if None.
         :return: The output state after running the workflow.
         """
         print(f"Called run method")
-        self.config = AgentConfig.from_runnable_config(config)
-        self.prompt_manager = PromptManager(self.config)
-        return await self.graph.ainvoke(state, {"recursion_limit": 100})
+        graph, run = self.prepare_run(state, config)
+        graph, graph_input, run_config, checkpoint, output = await self.resume_point(graph, run, state, thread_id)
+        if output is None:
+            ledger_token = set_current_ledger(run.ledger)
+            try:
+                if not run.config.monitor_loop_lag:
+                    output = await graph.ainvoke(graph_input, run_config)
+                else:
+                    # Measure how responsive the event loop stays while the run is in progress
+                    async with LoopLagMonitor() as monitor:
+                        output = await graph.ainvoke(graph_input, run_config)
+                    run.loop_lag_stats = monitor.get_stats()
+                    print(f"Event loop lag: {run.loop_lag_stats}")
+            finally:
+                self.close_ledger(run, ledger_token)
+            self.prune_checkpoints(run, checkpoint)
+        return self.finish_run(output, run, checkpoint)
+
+    async def astream(
+        self, state: State, config: RunnableConfig, thread_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Executes the LangGraph workflow like run, yielding its progress as it happens: with checkpointing, first
+        a checkpoint event with the thread_id to resume the run with; then node_start and node_end of each node,
+        one extraction event per page as soon as its notes are ready, the tokens of the synthesis as the model
+        streams them, and last a result event with the synthesized information.
+
+        :param state: The input state for the research process.
+        :param config: Optional configuration for the workflow.
+        :param thread_id: With checkpointing, the ID of the run to resume if it was interrupted, a new run if None.
+        :return: An async iterator of progress events, dictionaries with their type under "event".
+        """
+        print(f"Called astream method")
+        graph, run = self.prepare_run(state, config)
+        graph, graph_input, run_config, checkpoint, output = await self.resume_point(graph, run, state, thread_id)
+        if checkpoint is not None:
+            yield {"event": "checkpoint", **checkpoint}
+        if output is None:
+            ledger_token = set_current_ledger(run.ledger)
+            try:
+                async for event in graph.astream_events(graph_input, run_config, version="v2"):
+                    if event["event"] == "on_chain_end" and not event["parent_ids"]:
+                        output = event["data"]["output"]
+                    progress = progress_event(event)
+                    if progress is not None:
+                        yield progress
+            finally:
+                self.close_ledger(run, ledger_token)
+            self.prune_checkpoints(run, checkpoint)
+        output = self.finish_run(output, run, checkpoint)
+        yield {
+            "event": "result",
+            "topic": output.get("topic"),
+            "synthesized_info": output.get("synthesized_info"),
+            "is_satisfactory": output.get("is_satisfactory"),
+            "loop_count": output.get("loop_count"),
+            "llm_calls": output["llm_ledger"]["total"],
+        }
+
+    def prepare_run(self, state: State, config: RunnableConfig) -> Tuple[Any, RunContext]:
+        """
+        Load the configuration of the run and warm up the model clients; return the graph to run and the run's context.
+        The context is kept per run, so concurrent runs of the agent (a batch) each use their own configuration
+        and record their own calls and counters.
+        """
+        agent_config = AgentConfig.from_runnable_config(config)
+        # Build the shared model client and its structured-output runnables before the first node needs them
+        LLMInterface(agent_config).warm_up([WebInfo, SynthesizedInfo, InfoIsSatisfactory] + ([PackedWebInfo] if agent_config.extract_packing else []))
+        if agent_config.pipeline_mode not in ("graph", "streaming"):
+            raise ValueError(f"Unknown pipeline mode: {agent_config.pipeline_mode}. Use 'graph' or 'streaming'")
+        # Every LLM call of the nodes is recorded in the ledger of this run
+        run = RunContext(agent_config, PromptManager(agent_config), LLMLedger(company=getattr(state, "company", None) or state.topic))
+        return (self.streaming_graph if agent_config.pipeline_mode == "streaming" else self.graph), run
+
+    async def resume_point(self, graph, run: RunContext, state: State, thread_id: Optional[str]) -> Tuple[Any, Optional[State], Dict[str, Any], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Graph, input and run config of the run, its checkpoint info and, for a run that already finished, its final state.
+        The run config carries the run's context to the nodes.
+
+        With checkpointing, the run is the thread thread_id of the checkpointer (a new one if None). A thread
+        interrupted mid-graph resumes after its last finished node, and a finished thread is not run again.
+        """
+        run_config: Dict[str, Any] = {"recursion_limit": 100, "configurable": {RUN_CONTEXT_KEY: run}}
+        checkpointer = get_checkpointer(run.config)
+        if checkpointer is None:
+            return graph, state, run_config, None, None
+        graph = graph.copy({"checkpointer": checkpointer})
+        thread_id = thread_id or uuid.uuid4().hex
+        run_config["configurable"]["thread_id"] = thread_id
+        snapshot = await graph.aget_state(run_config)
+        checkpoint = {"thread_id": thread_id, "resumed_at": list(snapshot.next) or None, "finished_before": bool(snapshot.values) and not snapshot.next}
+        if checkpoint["finished_before"]:
+            print(f"Run {thread_id} already finished, returning its checkpointed state")
+            return graph, None, run_config, checkpoint, dict(snapshot.values)
+        if snapshot.next:
+            print(f"Resuming run {thread_id} at {list(snapshot.next)}")
+            return graph, None, run_config, checkpoint, None
+        print(f"Checkpointing run {thread_id}, pass it as thread_id to resume the run if it is interrupted")
+        return graph, state, run_config, checkpoint, None
+
+    def prune_checkpoints(self, run: RunContext, checkpoint: Optional[Dict[str, Any]]):
+        """Keep only the final checkpoint of a finished run."""
+        if checkpoint is not None:
+            get_checkpointer(run.config).prune(checkpoint["thread_id"])
+
+    def close_ledger(self, run: RunContext, ledger_token):
+        reset_current_ledger(ledger_token)
+        self.ledger_records.extend(run.ledger.records)
+        if run.config.llm_ledger_path:
+            run.ledger.export_jsonl(run.config.llm_ledger_path)
+
+    def finish_run(self, output: Dict[str, Any], run: RunContext, checkpoint: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Add the ledger summary, the counters of the run and the checkpoint info to the output state,
+        and collect the stats of the shared resources.
+        """
+        blob_store = get_blob_store(run.config)
+        if blob_store is not None:
+            # The caller gets the page notes, not their references
+            output["extracted_info"] = blob_store.resolve(output.get("extracted_info") or {})
+            self.blob_store_stats = blob_store.get_stats()
+            print(f"Blob store: {self.blob_store_stats}")
+        if checkpoint is not None:
+            output["checkpoint"] = checkpoint
+            self.checkpoint_stats = get_checkpointer(run.config).get_stats()
+            print(f"Checkpoints: {self.checkpoint_stats}")
+        output["llm_ledger"] = run.ledger.summary(run.config.llm_prices)
+        output["run_stats"] = {"dedup": run.dedup_stats, "packing": run.packing_stats, "loop_lag": run.loop_lag_stats}
+        print(f"LLM calls: {output['llm_ledger']['total']}")
+        if run.config.llm_cascade:
+            print(f"LLM tiers: {output['llm_ledger']['tiers']}")
+        self.llm_stats = get_llm_registry().get_stats()
+        print(f"LLM clients: {self.llm_stats}")
+        self.prompt_stats = get_prompt_registry().get_stats()
+        print(f"Prompts: {self.prompt_stats}")
+        rate_limiter = get_llm_rate_limiter(run.config)
+        if rate_limiter is not None:
+            self.rate_limiter_stats = rate_limiter.get_stats()
+            print(f"LLM rate limiter: {self.rate_limiter_stats}")
+        llm_cache = get_llm_cache(run.config)
+        if llm_cache is not None:
+            self.llm_cache_stats = llm_cache.get_stats()
+            print(f"LLM response cache: {self.llm_cache_stats}")
+        semantic_cache = get_semantic_cache(run.config)
+        if semantic_cache is not None:
+            self.semantic_cache_stats = semantic_cache.get_stats()
+            print(f"Semantic cache: {self.semantic_cache_stats}")
+        return output
+
+    def batch_llm_summary(self, prices: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Any]:
+        """LLM ledger counters over every run of this agent, e.g. all the companies of a batch, costed with the prices."""
+        return summarize_records(self.ledger_records, prices)
+
+    async def aclose(self):
+        """Release the shared resources used by the agent, such as the pooled HTTP session."""
+        await close_fetcher()
+        reset_fetch_scheduler()
+        close_fetch_cache()
+        close_search_cache()
+        close_cassette()
+        close_llm_cache()
+        close_checkpointer()
+        close_blob_store()
+        close_semantic_cache()
+        shutdown_parse_executor()
+        await close_llm_registry()
+
+    async def __aenter__(self) -> "ResearcherAgent":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
@@ -1,5 +1,6 @@
-from typing import Dict
+from typing import Dict, List
 from pydantic import Field
+from pydantic.fields import FieldInfo
 from typing import Optional
 from langchain_core.runnables import RunnableConfig, ensure_config
 from dataclasses import dataclass, fields
@@ -20,6 +21,30 @@ class AgentConfig:
         default=0.0,
         description="LLM temperature"
     )
+    llm_cascade: bool = Field(
+        default=False,
+        description="Cascade mode: the small model answers the llm_cascade_small_nodes first and escalates to llm_name when unsure"
+    )
+    llm_small_provider: str = Field(
+        default="openai",
+        description="Provider of the small model of the cascade"
+    )
+    llm_small_name: str = Field(
+        default="gpt-4o-mini",
+        description="Name of the small model of the cascade"
+    )
+    llm_cascade_small_nodes: List[str] = Field(
+        default_factory=lambda: ["extract", "validate"],
+        description="Nodes answered first by the small model in cascade mode, the others use llm_name directly"
+    )
+    llm_cascade_min_confidence: float = Field(
+        default=0.7,
+        description="Self-reported confidence below which an answer of the small model is escalated"
+    )
+    llm_prices: Dict[str, Dict[str, float]] = Field(
+        default_factory=lambda: {"gpt-4o-mini": {"input": 0.15, "output": 0.6}, "gpt-4o": {"input": 2.5, "output": 10.0}},
+        description="USD per million input and output tokens of each model, for the cost in the LLM ledger"
+    )
     embedding_model: str = Field(
         default="text-embedding-3-small",
         description="Embedding model"
@@ -28,6 +53,14 @@ class AgentConfig:
         default_factory=dict,
         description='Paths of the Agent'
     )
+    prompt_hot_reload: bool = Field(
+        default=False,
+        description="Whether the prompt files are compiled again when they change on disk"
+    )
+    prompt_reload_interval: float = Field(
+        default=2.0,
+        description="Seconds between two checks of the modification time of a prompt file with hot reload"
+    )
     max_search_results: int = Field(
         default=5,
         description="Maximum number of search results"
@@ -36,6 +69,377 @@ class AgentConfig:
         default=1,
         description="Maximum number of loops"
     )
+    http_pool_limit: int = Field(
+        default=100,
+        description="Maximum number of open connections in the shared HTTP pool"
+    )
+    http_limit_per_host: int = Field(
+        default=8,
+        description="Maximum number of open connections per host in the shared HTTP pool"
+    )
+    http_dns_cache_ttl: int = Field(
+        default=300,
+        description="Seconds a resolved host name is kept in the DNS cache"
+    )
+    http_keepalive_timeout: float = Field(
+        default=30.0,
+        description="Seconds an idle pooled connection is kept alive"
+    )
+    fetch_cache_enabled: bool = Field(
+        default=True,
+        description="Whether fetched pages are stored in the on-disk fetch cache"
+    )
+    fetch_cache_dir: str = Field(
+        default=".cache/fetch",
+        description="Directory of the fetch cache (SQLite index and compressed bodies)"
+    )
+    fetch_cache_ttl: int = Field(
+        default=86400,
+        description="Seconds a cached page is served without revalidation when the response has no max-age"
+    )
+    fetch_cache_max_bytes: int = Field(
+        default=512 * 1024 * 1024,
+        description="Maximum size in bytes of the cached bodies before least recently used pages are evicted"
+    )
+    fetch_streaming: bool = Field(
+        default=True,
+        description="Whether pages are streamed and decoded incrementally instead of read whole"
+    )
+    fetch_max_bytes: int = Field(
+        default=2 * 1024 * 1024,
+        description="Maximum number of bytes read per page in streaming mode"
+    )
+    fetch_max_text_chars: int = Field(
+        default=60000,
+        description="Visible characters after which a page stops being read in streaming mode"
+    )
+    fetch_charset_sample_bytes: int = Field(
+        default=32 * 1024,
+        description="Bytes given to encoding detection when neither the header nor a <meta> tag declare the charset"
+    )
+    fetch_global_limit: int = Field(
+        default=32,
+        description="Maximum number of page requests in flight across all domains"
+    )
+    fetch_domain_limit: int = Field(
+        default=2,
+        description="Maximum number of page requests in flight per domain"
+    )
+    fetch_domain_rate: float = Field(
+        default=1.0,
+        description="Requests per second allowed per domain (token bucket refill rate)"
+    )
+    fetch_domain_burst: float = Field(
+        default=2.0,
+        description="Requests per domain that can be sent in a burst (token bucket capacity)"
+    )
+    fetch_respect_robots: bool = Field(
+        default=True,
+        description="Whether robots.txt and its Crawl-delay are honored"
+    )
+    fetch_max_retries: int = Field(
+        default=3,
+        description="Retries of a page answered with 429 or 503"
+    )
+    fetch_backoff_base: float = Field(
+        default=1.0,
+        description="Base delay in seconds of the exponential backoff after a 429 or 503"
+    )
+    fetch_backoff_max: float = Field(
+        default=30.0,
+        description="Maximum backoff delay in seconds"
+    )
+    html_engine: str = Field(
+        default="lxml",
+        description="Engine that turns HTML into visible text ('lxml' or 'bs4')"
+    )
+    passage_ranking: bool = Field(
+        default=True,
+        description="Whether only the page passages most relevant to the topic are sent to the LLM, instead of the first 20k characters"
+    )
+    passage_token_budget: int = Field(
+        default=2000,
+        description="Maximum number of tokens of page content sent to the LLM when passage ranking is enabled"
+    )
+    passage_words: int = Field(
+        default=120,
+        description="Approximate number of words per passage"
+    )
+    extract_packing: bool = Field(
+        default=False,
+        description="Whether several pages are extracted in one LLM call, up to extract_pack_token_budget"
+    )
+    extract_pack_token_budget: int = Field(
+        default=8000,
+        description="Estimated tokens of page content packed into one extraction call"
+    )
+    extract_pack_max_pages: int = Field(
+        default=5,
+        description="Maximum number of pages packed into one extraction call"
+    )
+    dedup_pages: bool = Field(
+        default=True,
+        description="Whether near-duplicate pages are collapsed into a single LLM extraction"
+    )
+    dedup_max_distance: int = Field(
+        default=16,
+        description="Maximum number of different SimHash bits for two pages to be near-duplicates"
+    )
+    dedup_shingle_words: int = Field(
+        default=3,
+        description="Number of words per shingle of the SimHash fingerprint"
+    )
+    search_backend: str = Field(
+        default="tavily",
+        description="Search engine backend: tavily, or fixture to serve results from a local JSON file"
+    )
+    search_fixture_path: str = Field(
+        default="benchmarks/fixtures/search_results.json",
+        description="JSON file mapping queries to results, used by the fixture search backend"
+    )
+    search_fixture_latency: float = Field(
+        default=0.0,
+        description="Simulated latency in seconds of each fixture search"
+    )
+    search_cache_enabled: bool = Field(
+        default=True,
+        description="Cache the search results across runs"
+    )
+    search_cache_path: str = Field(
+        default=".cache/search.sqlite",
+        description="SQLite file of the search-results cache"
+    )
+    search_cache_ttl: int = Field(
+        default=86400,
+        description="Seconds a cached search result is served"
+    )
+    search_cache_max_entries: int = Field(
+        default=5000,
+        description="Maximum number of cached queries, the least recently used are evicted"
+    )
+    search_similarity_threshold: float = Field(
+        default=0.8,
+        description="Minimum term similarity for a near-identical query to be served from the search cache, if it adds no term of its own"
+    )
+    search_fanout: bool = Field(
+        default=False,
+        description="Expand each topic into several query variants searched concurrently and merged by reciprocal rank fusion"
+    )
+    search_query_templates: List[str] = Field(
+        default_factory=lambda: ["{topic} noticias", "{topic} informe anual", "{topic} equipo directivo"],
+        description="Templates of the query variants, {topic} is replaced by the topic"
+    )
+    search_fanout_excel: str = Field(
+        default="",
+        description="Excel file whose question sections also become query variants, empty to use only the templates"
+    )
+    search_max_queries: int = Field(
+        default=6,
+        description="Maximum number of query variants per topic, including the topic itself"
+    )
+    search_url_budget: int = Field(
+        default=10,
+        description="Maximum number of fused URLs sent to extraction per search"
+    )
+    search_rrf_k: int = Field(
+        default=60,
+        description="Rank offset k of reciprocal rank fusion, 1 / (k + rank)"
+    )
+    cassette_mode: str = Field(
+        default="off",
+        description="Record/replay of the LLM, search and page fetch calls: off, record or replay"
+    )
+    cassette_path: str = Field(
+        default=".cache/cassettes/session.jsonl",
+        description="JSONL file the session is recorded to or replayed from"
+    )
+    cassette_latency: str = Field(
+        default="realistic",
+        description="Replay latency: realistic sleeps the recorded time of each call, zero answers immediately"
+    )
+    pipeline_mode: str = Field(
+        default="graph",
+        description="graph runs search, extraction and synthesis as separate steps, streaming overlaps the search, fetches and extractions of each loop"
+    )
+    pipeline_queue_size: int = Field(
+        default=20,
+        description="Capacity of the URL and page queues of the streaming pipeline"
+    )
+    pipeline_fetch_workers: int = Field(
+        default=10,
+        description="Concurrent page fetches of the streaming pipeline"
+    )
+    pipeline_extract_workers: int = Field(
+        default=8,
+        description="Concurrent LLM extractions of the streaming pipeline"
+    )
+    batch_concurrency: int = Field(
+        default=4,
+        description="Companies researched at once by the batch runner"
+    )
+    batch_company_timeout: float = Field(
+        default=900.0,
+        description="Seconds after which the research of a company of a batch is cancelled, 0 for no limit"
+    )
+    checkpoint_enabled: bool = Field(
+        default=True,
+        description="Whether the state of each run is checkpointed after every node, so an interrupted run resumes where it stopped"
+    )
+    checkpoint_path: str = Field(
+        default=".cache/checkpoints.sqlite",
+        description="SQLite file of the run checkpoints"
+    )
+    checkpoint_compression_level: int = Field(
+        default=6,
+        description="zlib level of the compressed checkpoint blobs, from 1 (fastest) to 9 (smallest)"
+    )
+    checkpoint_ttl: int = Field(
+        default=7 * 86400,
+        description="Seconds after its last checkpoint that a run is deleted, 0 to keep every run"
+    )
+    compact_state: bool = Field(
+        default=True,
+        description="Whether the graph state keeps references to the page notes, stored in the blob store, and a bounded history of status messages, so its size and checkpoints do not grow with every loop"
+    )
+    state_message_limit: int = Field(
+        default=20,
+        description="Messages kept in the graph state with compact_state, the oldest are removed"
+    )
+    blob_store_path: str = Field(
+        default=".cache/blobs.sqlite",
+        description="SQLite file of the blob store holding the page notes of the compact state"
+    )
+    blob_store_memory_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        description="Bytes of the most recently used blobs kept in memory"
+    )
+    blob_store_ttl: int = Field(
+        default=7 * 86400,
+        description="Seconds after its last use that a blob is deleted, 0 to keep every blob; at least checkpoint_ttl so resumed runs find their notes"
+    )
+    llm_cache_enabled: bool = Field(
+        default=True,
+        description="Serve repeated LLM requests (same prompt, model, temperature and schema) from a local cache"
+    )
+    llm_cache_path: str = Field(
+        default=".cache/llm.sqlite",
+        description="SQLite file of the LLM response cache"
+    )
+    llm_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        description="Size of the cached LLM responses beyond which the least recently used are evicted"
+    )
+    llm_cache_ttl: int = Field(
+        default=0,
+        description="Seconds a cached LLM response is served, 0 to keep it until evicted"
+    )
+    semantic_cache_enabled: bool = Field(
+        default=False,
+        description="Serve prompts close enough to an earlier one (cosine similarity of their embeddings) from the semantic cache"
+    )
+    semantic_cache_nodes: List[str] = Field(
+        default_factory=lambda: ["extract", "synthesize"],
+        description="Nodes whose LLM calls go through the semantic cache"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.95,
+        description="Minimum cosine similarity between two prompts for the cached response to be served"
+    )
+    semantic_cache_embeddings: str = Field(
+        default="openai",
+        description="Embeddings of the semantic cache: 'openai' (embedding_model) or 'hashing' (local, no API calls)"
+    )
+    semantic_cache_max_chars: int = Field(
+        default=24000,
+        description="Characters of the prompt that are embedded"
+    )
+    semantic_cache_backend: str = Field(
+        default="memory",
+        description="Vector index of the semantic cache: 'memory' (NumPy, this process) or 'redis'"
+    )
+    semantic_cache_capacity: int = Field(
+        default=10000,
+        description="Entries of the in-memory index beyond which the least recently matched are replaced"
+    )
+    semantic_cache_redis_url: str = Field(
+        default="",
+        description="Redis URL of the semantic cache, empty to use REDIS_HOST and REDIS_PORT"
+    )
+    semantic_cache_ttl: int = Field(
+        default=0,
+        description="Seconds a Redis semantic cache entry is kept, 0 to keep it"
+    )
+    llm_rate_limit_enabled: bool = Field(
+        default=True,
+        description="Whether the model calls go through the shared rate limiter (RPM/TPM buckets, adaptive concurrency, 429 retries)"
+    )
+    llm_rpm: int = Field(
+        default=500,
+        description="Requests per minute allowed per model"
+    )
+    llm_tpm: int = Field(
+        default=200000,
+        description="Tokens per minute allowed per model"
+    )
+    llm_max_concurrency: int = Field(
+        default=16,
+        description="Upper bound of the adaptive number of concurrent calls per model"
+    )
+    llm_max_retries: int = Field(
+        default=5,
+        description="Retries of a rate limited (429) model call"
+    )
+    llm_backoff_base: float = Field(
+        default=1.0,
+        description="Base of the jittered exponential backoff after a 429 without Retry-After, in seconds"
+    )
+    llm_backoff_max: float = Field(
+        default=60.0,
+        description="Maximum backoff after a 429, in seconds"
+    )
+    llm_latency_target: float = Field(
+        default=30.0,
+        description="Call latency in seconds above which the concurrency of the model is lowered"
+    )
+    llm_expected_output_tokens: int = Field(
+        default=500,
+        description="Completion tokens reserved per call, on top of the estimated prompt tokens"
+    )
+    llm_priorities: Dict[str, int] = Field(
+        default_factory=lambda: {"synthesize": 0, "validate": 0, "extract": 1},
+        description="Priority lane of each node, lower first. Unlisted nodes get the last lane"
+    )
+    llm_ledger_path: str = Field(
+        default="",
+        description="JSONL file the LLM calls of each run are appended to, empty to keep them in memory only"
+    )
+    parse_executor: str = Field(
+        default="process",
+        description="Where decoding and HTML parsing run: 'process' pool, 'thread' pool or 'inline' on the event loop"
+    )
+    parse_workers: int = Field(
+        default=0,
+        description="Number of parse workers, 0 to use the number of CPUs"
+    )
+    parse_queue_depth: int = Field(
+        default=32,
+        description="Maximum number of parse tasks submitted to the executor at once"
+    )
+    parse_max_tasks_per_child: int = Field(
+        default=200,
+        description="Tasks after which a process pool worker is replaced, 0 to never recycle"
+    )
+    monitor_loop_lag: bool = Field(
+        default=False,
+        description="Whether the event loop lag is measured during each run"
+    )
+
+    def __post_init__(self):
+        """Resolve the Field defaults of the attributes that were not provided."""
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, FieldInfo):
+                setattr(self, f.name, value.get_default(call_default_factory=True))
     
     @classmethod
     def from_runnable_config(cls, config: Optional[RunnableConfig] = None) -> "AgentConfig":
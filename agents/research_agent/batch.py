@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.runnables import RunnableConfig
+from agents.research_agent.agent import ResearcherAgent
+from agents.research_agent.agent_config import AgentConfig
+from agents.research_agent.state import State
+from agents.utils.checkpoint import get_checkpointer
+
+
+@dataclass
+class CompanyResult:
+    """Outcome of the research of one company of a batch."""
+    company: str
+    status: str
+    "ok, skipped (finished in an earlier attempt of the batch), error or timeout"
+    seconds: float
+    output: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    """Results of a batch, in the order of the companies, and its throughput."""
+    results: List[CompanyResult] = field(default_factory=list)
+    seconds: float = 0.0
+    llm: Optional[Dict[str, Any]] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts per status, companies per minute and the p50, p95 and max seconds per company."""
+        durations = sorted(result.seconds for result in self.results)
+
+        def percentile(q: float) -> float:
+            return durations[min(len(durations) - 1, int(q * len(durations)))] if durations else 0.0
+
+        statuses = [result.status for result in self.results]
+        return {
+            "companies": len(self.results),
+            "ok": statuses.count("ok"),
+            "skipped": statuses.count("skipped"),
+            "errors": statuses.count("error"),
+            "timeouts": statuses.count("timeout"),
+            "seconds": round(self.seconds, 2),
+            "companies_per_minute": round(60 * len(self.results) / self.seconds, 2) if self.seconds else 0.0,
+            "p50_seconds": round(percentile(0.5), 2),
+            "p95_seconds": round(percentile(0.95), 2),
+            "max_seconds": round(durations[-1], 2) if durations else 0.0,
+        }
+
+
+def load_companies(path: str) -> List[str]:
+    """Companies of a text file, one per line; blank lines and lines starting with # are skipped."""
+    with open(path, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip() and not line.lstrip().startswith("#")]
+
+
+class BatchRunner:
+    """
+    Researches several companies concurrently with a single agent, so every run shares its compiled graphs
+    and the process-wide HTTP pool, caches, rate limiter and model clients.
+
+    At most concurrency companies run at once, each within timeout seconds (0 for no limit). A company that
+    fails or times out is reported with its error and does not stop the others. on_result is called as each
+    company finishes, with the result and the number of companies done, for progress reporting.
+
+    With checkpointing, each company is the thread "<batch_id>/<company>" of the checkpointer, so running the
+    same batch again after a crash skips the companies that finished and resumes the others where they stopped.
+    batch_id defaults to a hash of the company list; restart discards the checkpoints of the batch first.
+    """
+    def __init__(
+        self,
+        config: RunnableConfig,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        agent: Optional[ResearcherAgent] = None,
+        on_result: Optional[Callable[[CompanyResult, int, int], None]] = None,
+        batch_id: Optional[str] = None,
+        restart: bool = False,
+    ):
+        agent_config = AgentConfig.from_runnable_config(config)
+        self.config = config
+        self.concurrency = max(1, concurrency or agent_config.batch_concurrency)
+        self.timeout = agent_config.batch_company_timeout if timeout is None else timeout
+        self.agent = agent or ResearcherAgent()
+        self.on_result = on_result or self.print_progress
+        self.batch_id = batch_id
+        self.restart = restart
+
+    @staticmethod
+    def print_progress(result: CompanyResult, done: int, total: int):
+        detail = f": {result.error}" if result.error else ""
+        print(f"[{done}/{total}] {result.company} {result.status} in {result.seconds:.1f} s{detail}")
+
+    async def research(self, company: str, batch_id: str) -> CompanyResult:
+        start = time.perf_counter()
+        try:
+            run = self.agent.run(State(topic=f"{company} info"), self.config, thread_id=f"{batch_id}/{company}")
+            output = await (asyncio.wait_for(run, self.timeout) if self.timeout else run)
+            status = "skipped" if output.get("checkpoint", {}).get("finished_before") else "ok"
+            return CompanyResult(company, status, time.perf_counter() - start, output=output)
+        except asyncio.TimeoutError:
+            return CompanyResult(company, "timeout", time.perf_counter() - start, error=f"No result after {self.timeout} s")
+        except Exception as e:
+            return CompanyResult(company, "error", time.perf_counter() - start, error=f"{type(e).__name__}: {e}"[:300])
+
+    async def run(self, companies: List[str]) -> BatchReport:
+        """Research the companies and return their results in the same order."""
+        batch_id = self.batch_id or hashlib.sha256("\n".join(companies).encode("utf-8")).hexdigest()[:12]
+        checkpointer = get_checkpointer(AgentConfig.from_runnable_config(self.config))
+        if checkpointer is not None:
+            if self.restart:
+                checkpointer.delete_threads(f"{batch_id}/")
+            print(f"Batch {batch_id}, checkpointed in {checkpointer.path}")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        done = 0
+
+        async def bounded(company: str) -> CompanyResult:
+            nonlocal done
+            async with semaphore:
+                result = await self.research(company, batch_id)
+            done += 1
+            self.on_result(result, done, len(companies))
+            return result
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(company) for company in companies))
+        report = BatchReport(list(results), time.perf_counter() - start)
+        if self.agent.ledger_records:
+            report.llm = self.agent.batch_llm_summary(AgentConfig.from_runnable_config(self.config).llm_prices)["total"]
+        return report
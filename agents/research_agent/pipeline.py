@@ -0,0 +1,147 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from agents.research_agent.state import State
+from agents.tools.page_dedup import simhash, find_near_duplicate, get_fingerprint_store
+from agents.tools.query_fanout import search_variants
+from agents.tools.scrape_website import fetch_page_text, summarize_page, fetch_failure, FETCH_FAILURES
+from agents.research_agent.progress import emit_progress
+from agents.tools.search_webs import search
+from agents.utils.executor import get_parse_executor
+from agents.utils.urls import dedup_url_key
+
+_DONE = object()
+
+
+async def run_stage(inbox: asyncio.Queue, outbox: Optional[asyncio.Queue], worker: Callable[[Any], Awaitable[Any]], workers: int):
+    """
+    Process the items of the inbox with concurrent workers until the end marker, putting the
+    results that are not None in the outbox, followed by the end marker once all workers stopped.
+    """
+    async def work():
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                await inbox.put(_DONE)  # Let the other workers stop too
+                return
+            result = await worker(item)
+            if outbox is not None and result is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(work() for _ in range(workers)))
+    if outbox is not None:
+        await outbox.put(_DONE)
+
+
+class StreamingExtraction:
+    """
+    Search → fetch → extract pipeline of one research loop, connected by bounded queues.
+
+    Each URL is fetched as soon as a search returns it, and each page is sent to the LLM as soon
+    as it is parsed, so the loop takes as long as its slowest single URL instead of the slowest
+    fetch plus the slowest extraction. Near-duplicate pages are detected as they arrive: the first
+    page of a group is extracted and the later ones are added to its sources.
+    """
+    def __init__(self, state: State, config: Any, dedup_stats: Dict[str, int], known_urls: Set[str]):
+        self.state = state
+        self.config = config
+        self.dedup_stats = dedup_stats
+        self.seen = set(known_urls)
+        self.found_urls: List[str] = []
+        self.new_urls: List[str] = []
+        self.pending_sources: Dict[str, List[str]] = defaultdict(list)
+
+    async def search_results(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the result lists of the searches of the topic as each one returns."""
+        if not self.config.search_fanout:
+            yield await search(self.state.topic, self.config)
+            return
+        async for _, results in search_variants(self.state.topic, self.config):
+            yield results
+
+    async def discover(self, urls: asyncio.Queue):
+        """Put the URLs not extracted yet in the queue as soon as they are found, within the URL budget."""
+        budget = self.config.search_url_budget if self.config.search_fanout else None
+        try:
+            async for results in self.search_results():
+                for item in results:
+                    url = item["url"]
+                    self.found_urls.append(url)
+                    url_key = dedup_url_key(url)
+                    if url_key in self.seen or (budget is not None and len(self.new_urls) >= budget):
+                        continue
+                    self.seen.add(url_key)
+                    self.new_urls.append(url)
+                    await urls.put(url)
+        finally:
+            await urls.put(_DONE)
+
+    async def fetch(self, url: str) -> Optional[Tuple[str, str]]:
+        text = await fetch_page_text(url, self.config)
+        if text in FETCH_FAILURES:
+            self.state.extracted_info[url] = fetch_failure(url, text)
+            return None
+        return url, text
+
+    def add_source(self, url: str, source: str):
+        """Add a near-duplicate page to the sources of an extracted or in-flight page."""
+        info = self.state.extracted_info.get(url)
+        if info is not None:
+            sources = info.setdefault("sources", [url])
+            if source not in sources:
+                sources.append(source)
+        else:
+            self.pending_sources[url].append(source)
+
+    async def extract(self, page: Tuple[str, str]):
+        url, text = page
+        state, config = self.state, self.config
+        if not config.dedup_pages:
+            notes = await summarize_page(url, text, state, config)
+            state.extracted_info[url] = notes
+            return
+
+        fingerprint = await get_parse_executor(config).run(simhash, text, config.dedup_shingle_words)
+        duplicate_of = find_near_duplicate(fingerprint, state.page_fingerprints, config.dedup_max_distance)
+        if duplicate_of is not None:
+            if duplicate_of in self.new_urls:
+                self.dedup_stats["duplicates_collapsed"] += 1
+            self.dedup_stats["llm_calls_avoided"] += 1
+            self.add_source(duplicate_of, url)
+            return
+
+        # Registered before the LLM call, so that the duplicates arriving meanwhile join this page
+        state.page_fingerprints[url] = fingerprint
+        store = get_fingerprint_store(config)
+        reused_notes = store.lookup(fingerprint, state.topic)
+        if reused_notes is not None:
+            self.dedup_stats["llm_calls_avoided"] += 1
+            state.extracted_info[url] = {**reused_notes, "url": url, "sources": [url] + self.pending_sources.pop(url, [])}
+            await emit_progress("extraction", {"url": url, "notes": state.extracted_info[url], "reused": True})
+            return
+
+        notes = await summarize_page(url, text, state, config)
+        store.add(fingerprint, state.topic, dict(notes))
+        sources = [url] + self.pending_sources.pop(url, [])
+        state.extracted_info[url] = {**notes, "sources": sources} if len(sources) > 1 else notes
+
+    async def run(self):
+        """Run the loop; the new entries of state.extracted_info are left in discovery order."""
+        before = set(self.state.extracted_info)
+        urls: asyncio.Queue = asyncio.Queue(maxsize=self.config.pipeline_queue_size)
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.config.pipeline_queue_size)
+        tasks = [
+            asyncio.create_task(self.discover(urls)),
+            asyncio.create_task(run_stage(urls, pages, self.fetch, self.config.pipeline_fetch_workers)),
+            asyncio.create_task(run_stage(pages, None, self.extract, self.config.pipeline_extract_workers)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Same order as the barrier graph, so that the synthesis prompt does not depend on which page finished first
+        extracted_info = self.state.extracted_info
+        added = {url: extracted_info.pop(url) for url in self.new_urls if url in extracted_info and url not in before}
+        extracted_info.update(added)
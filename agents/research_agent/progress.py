@@ -0,0 +1,134 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from langchain_core.callbacks.manager import adispatch_custom_event
+
+NODES = ("search", "extract_info", "synthesize", "validate")
+TOKEN_NODES = ("synthesize",)
+
+
+async def emit_progress(name: str, data: Dict[str, Any]):
+    """Dispatch a progress event to the event streams of the graph run in progress, if any."""
+    try:
+        await adispatch_custom_event(name, data)
+    except RuntimeError:
+        pass  # Not inside a graph run, e.g. a benchmark calling the extraction directly
+
+
+def node_summary(node: str, output: Any) -> Dict[str, Any]:
+    """Compact view of a node's state update: URL counts, validation verdict and the partial synthesis."""
+    if not isinstance(output, dict):
+        return {}
+    summary = {key: len(output[key]) for key in ("urls", "new_urls") if key in output}
+    summary.update({key: output[key] for key in ("synthesized_info", "is_satisfactory", "topic", "loop_count") if key in output})
+    return summary
+
+
+def token_text(chunk: Any) -> str:
+    """Text of a streamed model chunk, or the partial arguments of its tool call for structured output."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        content = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    args = "".join(tool_call.get("args") or "" for tool_call in getattr(chunk, "tool_call_chunks", None) or [])
+    return (content or "") + args
+
+
+def progress_event(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map a LangGraph astream_events (v2) event to a progress event, or None to leave it out:
+    node_start and node_end of the graph nodes, extraction results dispatched with emit_progress,
+    and the tokens streamed by the model in the TOKEN_NODES.
+    """
+    kind, name = event["event"], event["name"]
+    metadata = event.get("metadata") or {}
+    if kind in ("on_chain_start", "on_chain_end") and name in NODES and metadata.get("langgraph_node") == name and len(event["parent_ids"]) == 1:
+        if kind == "on_chain_start":
+            return {"event": "node_start", "node": name}
+        return {"event": "node_end", "node": name, **node_summary(name, event["data"].get("output"))}
+    if kind == "on_custom_event":
+        return {"event": name, **event["data"]}
+    if kind == "on_chat_model_stream" and metadata.get("node") in TOKEN_NODES:
+        text = token_text(event["data"].get("chunk"))
+        if text:
+            return {"event": "token", "node": metadata["node"], "text": text}
+    return None
+
+
+class ProgressBuffer:
+    """
+    Unbounded buffer between a research run and a slower reader, where the run never waits on the reader.
+
+    Consecutive token events of the same node are merged while they wait, so a slow client receives
+    fewer, larger token events instead of a growing backlog. The other events are kept one by one;
+    there are a handful per node and one per extracted page.
+    """
+    def __init__(self):
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.stats = {"events": 0, "tokens_merged": 0, "max_backlog": 0}
+
+    def put(self, event: Dict[str, Any]):
+        self.stats["events"] += 1
+        last = self._events[-1] if self._events else None
+        if event["event"] == "token" and last is not None and last["event"] == "token" and last["node"] == event["node"]:
+            last["text"] += event["text"]
+            self.stats["tokens_merged"] += 1
+        else:
+            self._events.append(dict(event))
+            self.stats["max_backlog"] = max(self.stats["max_backlog"], len(self._events))
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None once closed and drained. Raises asyncio.TimeoutError if none arrives within timeout."""
+        while not self._events:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        return self._events.popleft()
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Server-sent event with the event type and the JSON payload."""
+    data = json.dumps({key: value for key, value in event.items() if key != "event"}, ensure_ascii=False, default=str)
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+
+async def stream_sse(events: AsyncIterator[Dict[str, Any]], keepalive: float = 15.0) -> AsyncIterator[str]:
+    """
+    Server-sent events of a progress event stream. The stream is consumed by its own task into a ProgressBuffer,
+    so a slow client never holds the run back, and a comment line is sent after keepalive seconds without events
+    so idle connections stay open. Closing the generator, e.g. when the client disconnects, cancels the run.
+    """
+    buffer = ProgressBuffer()
+
+    async def pump():
+        try:
+            async for event in events:
+                buffer.put(event)
+        except Exception as e:
+            buffer.put({"event": "error", "error": f"{type(e).__name__}: {e}"[:300]})
+        finally:
+            buffer.close()
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            try:
+                event = await buffer.get(keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            yield format_sse(event)
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
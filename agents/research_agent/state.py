@@ -26,7 +26,16 @@ class State:
     "A list of extracted URLs to be processed by the agent."
 
     extracted_info: Dict[str, dict[str, Any]] = field(default_factory=dict)
-    "A dictionary mapping each processed URL to its extracted information."
+    "A dictionary mapping each processed URL to its notes (the WebInfo fields, and the sources of near-duplicates), or to its fetch failure."
+
+    new_urls: List[str] = field(default_factory=list)
+    "The URLs whose information was extracted in the current loop, the new material for the synthesis."
+
+    loop_stats: List[Dict[str, int]] = field(default_factory=list)
+    "Per-loop counters of the URLs found, and the fetches and LLM calls avoided."
+
+    page_fingerprints: Dict[str, int] = field(default_factory=dict)
+    "SimHash fingerprints of the pages extracted in this run, keyed by the URL holding their notes."
 
     synthesized_info: Optional[dict[str, Any]] = field(default=None)
     "The final synthesized information after processing extracted data."
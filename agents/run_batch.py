@@ -0,0 +1,52 @@
+"""Research a batch of companies concurrently and print the throughput summary.
+
+Run from the repository root:
+    python agents/run_batch.py Veolia Celsa Bankinter [--file companies.txt] [--concurrency 4] [--timeout 900]
+                                [--batch-id ID] [--restart]
+
+With checkpointing enabled, running the same batch again after a crash skips the companies that finished and
+resumes the others where they stopped.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import yaml
+from langchain_core.runnables import RunnableConfig
+from agents.research_agent.batch import BatchRunner, load_companies
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("companies", nargs="*")
+    parser.add_argument("--file", help="File with one company per line")
+    parser.add_argument("--config", default="config/research_agent_config.yaml")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--batch-id", default=None, help="Checkpoint ID of the batch, a hash of the companies by default")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoints of an earlier attempt of the batch")
+    args = parser.parse_args()
+
+    companies = list(args.companies) + (load_companies(args.file) if args.file else [])
+    if not companies:
+        parser.error("Give the companies as arguments or with --file")
+    with open(args.config, "r") as file:
+        runnable_config = RunnableConfig(configurable=yaml.safe_load(file))
+
+    runner = BatchRunner(
+        runnable_config, concurrency=args.concurrency, timeout=args.timeout, batch_id=args.batch_id, restart=args.restart
+    )
+    try:
+        report = await runner.run(companies)
+    finally:
+        await runner.agent.aclose()
+    for result in report.results:
+        if result.status not in ("ok", "skipped"):
+            print(f"{result.company}: {result.status} ({result.error})")
+    print(f"Batch: {report.summary()}")
+    print(f"LLM calls: {report.llm}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
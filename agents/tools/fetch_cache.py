@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from agents.utils.urls import canonicalize_url
+
+
+@dataclass
+class CachedPage:
+    """A page stored in the fetch cache."""
+    url: str
+    body: bytes
+    headers: Dict[str, str]
+    stored_at: float
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class FetchCache:
+    """
+    On-disk fetch cache keyed by canonical URL.
+
+    The index (URL, headers, validators, expiry, last access) lives in SQLite and
+    the bodies are stored as zlib-compressed blobs named after their SHA-256, so
+    identical bodies served under several URLs are stored once.
+    """
+    def __init__(self, cache_dir: str, default_ttl: int = 86400, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.blobs_dir = os.path.join(cache_dir, "blobs")
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                blob_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._conn.commit()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+
+    def _blob_path(self, blob_hash: str) -> str:
+        return os.path.join(self.blobs_dir, blob_hash[:2], blob_hash + ".zlib")
+
+    def _ttl_from_headers(self, headers: Dict[str, str]) -> int:
+        """Use the Cache-Control max-age of the response as TTL when present, the default TTL otherwise."""
+        cache_control = headers.get("Cache-Control", "").lower()
+        if "no-cache" in cache_control:
+            return 0  # Stored, but revalidated on every use
+        match = re.search(r"max-age=(\d+)", cache_control)
+        return int(match.group(1)) if match else self.default_ttl
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached page for the URL, fresh or stale, or None if it is not cached."""
+        key = canonicalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob_hash, headers, stored_at, expires_at FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            blob_hash, headers, stored_at, expires_at = row
+            try:
+                with open(self._blob_path(blob_hash), "rb") as file:
+                    body = zlib.decompress(file.read())
+            except (OSError, zlib.error):
+                # The blob is missing or corrupted, drop the entry
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), key))
+            self._conn.commit()
+        return CachedPage(key, body, json.loads(headers), stored_at, expires_at)
+
+    def conditional_headers(self, page: Optional[CachedPage]) -> Dict[str, str]:
+        """Return the If-None-Match / If-Modified-Since headers to revalidate a stale page."""
+        if page is None:
+            return {}
+        headers = {}
+        if page.headers.get("ETag"):
+            headers["If-None-Match"] = page.headers["ETag"]
+        if page.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = page.headers["Last-Modified"]
+        return headers
+
+    def put(self, url: str, body: bytes, headers: Dict[str, str], ttl: Optional[int] = None):
+        """Store the response body and headers for the URL."""
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return
+        key = canonicalize_url(url)
+        ttl = self._ttl_from_headers(headers) if ttl is None else ttl
+        blob_hash = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(blob_hash)
+        now = time.time()
+        with self._lock:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as file:
+                    file.write(zlib.compress(body, 6))
+                os.replace(tmp_path, blob_path)
+            previous = self._conn.execute("SELECT blob_hash FROM pages WHERE url = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, blob_hash, len(body), json.dumps(headers), now, now + ttl, now),
+            )
+            if previous and previous[0] != blob_hash:
+                self._delete_blob_if_unused(previous[0])
+            self._conn.commit()
+            self.stats["stores"] += 1
+            self._evict()
+
+    def refresh(self, url: str, page: CachedPage, headers: Dict[str, str]):
+        """Extend the expiry of a page after a 304 Not Modified response, keeping its body."""
+        key = canonicalize_url(url)
+        validators = {name: headers[name] for name in ("ETag", "Last-Modified", "Cache-Control") if name in headers}
+        merged_headers = {**page.headers, **validators}
+        now = time.time()
+        expires_at = now + self._ttl_from_headers(merged_headers)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET headers = ?, expires_at = ?, last_access = ? WHERE url = ?",
+                (json.dumps(merged_headers), expires_at, now, key),
+            )
+            self._conn.commit()
+        page.headers = merged_headers
+        page.expires_at = expires_at
+
+    def record_hit(self, page: CachedPage, revalidated: bool = False):
+        """Count a request served from the cache, either directly or after a 304."""
+        self.stats["revalidated" if revalidated else "hits"] += 1
+        self.stats["bytes_saved"] += len(page.body)
+
+    def record_miss(self):
+        self.stats["misses"] += 1
+
+    def _delete_blob_if_unused(self, blob_hash: str):
+        in_use = self._conn.execute("SELECT 1 FROM pages WHERE blob_hash = ? LIMIT 1", (blob_hash,)).fetchone()
+        if not in_use:
+            try:
+                os.remove(self._blob_path(blob_hash))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Evict the least recently used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT url, blob_hash, size FROM pages ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            url, blob_hash, size = row
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._delete_blob_if_unused(blob_hash)
+            self.stats["evictions"] += 1
+            total -= size
+        self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss/bytes-saved counters together with the current size of the cache."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return {**self.stats, "entries": entries, "size_bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_fetch_cache: Optional[FetchCache] = None
+
+
+def get_fetch_cache(config: Optional[Any] = None) -> Optional[FetchCache]:
+    """Return the process-wide fetch cache, or None if it is disabled in the agent config."""
+    global _fetch_cache
+    if config is not None and not config.fetch_cache_enabled:
+        return None
+    if _fetch_cache is None:
+        if config is None:
+            return None
+        _fetch_cache = FetchCache(
+            config.fetch_cache_dir,
+            default_ttl=config.fetch_cache_ttl,
+            max_bytes=config.fetch_cache_max_bytes,
+        )
+    return _fetch_cache
+
+
+def close_fetch_cache():
+    """Close the process-wide fetch cache."""
+    global _fetch_cache
+    if _fetch_cache is not None:
+        _fetch_cache.close()
+        _fetch_cache = None
@@ -0,0 +1,256 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import aiohttp
+from agents.tools.http_client import HttpFetcher, get_fetcher
+
+
+RETRY_STATUSES = (429, 503)
+ROBOTS_TTL = 24 * 3600
+
+
+class RobotsDisallowedError(Exception):
+    """The URL is disallowed by the robots.txt of its domain."""
+
+
+@dataclass
+class DomainState:
+    """Politeness state and counters of a single domain."""
+    max_rate: float
+    rate: float
+    burst: float
+    tokens: float
+    last_refill: float = field(default_factory=time.monotonic)
+    backoff_until: float = 0.0
+    robots: Optional[RobotFileParser] = None
+    robots_fetched_at: float = 0.0
+    crawl_delay: Optional[float] = None
+    semaphore: Optional[asyncio.Semaphore] = None
+    robots_lock: Optional[asyncio.Lock] = None
+    requests: int = 0
+    throttled: int = 0
+    retries: int = 0
+    waiting: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class FetchScheduler:
+    """
+    Politeness and concurrency scheduler that sits between extract_text and the pooled HTTP client.
+
+    - Per-domain concurrency caps and token-bucket rate limits.
+    - robots.txt and Crawl-delay cached per domain.
+    - 429/503 responses halve the domain rate and back off (Retry-After or jittered
+      exponential delay) before retrying. Successes restore the rate additively.
+    - A global limit on in-flight requests.
+    """
+    def __init__(
+        self,
+        fetcher: HttpFetcher,
+        global_limit: int = 32,
+        domain_limit: int = 2,
+        domain_rate: float = 1.0,
+        domain_burst: float = 2.0,
+        respect_robots: bool = True,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ):
+        self.fetcher = fetcher
+        self.global_limit = global_limit
+        self.domain_limit = domain_limit
+        self.domain_rate = domain_rate
+        self.domain_burst = domain_burst
+        self.respect_robots = respect_robots
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._domains: Dict[str, DomainState] = {}
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queued = 0
+        self._in_flight = 0
+
+    def _ensure_loop(self):
+        """Semaphores and locks are bound to a loop, recreate them when the loop changes."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._global_semaphore = asyncio.Semaphore(self.global_limit)
+            for state in self._domains.values():
+                state.semaphore = None
+                state.robots_lock = None
+
+    def _get_domain(self, url: str) -> DomainState:
+        domain = urlsplit(url).netloc.lower()
+        if domain not in self._domains:
+            self._domains[domain] = DomainState(
+                max_rate=self.domain_rate, rate=self.domain_rate, burst=self.domain_burst, tokens=self.domain_burst
+            )
+        state = self._domains[domain]
+        if state.semaphore is None:
+            state.semaphore = asyncio.Semaphore(self.domain_limit)
+            state.robots_lock = asyncio.Lock()
+        return state
+
+    async def _is_allowed(self, state: DomainState, url: str) -> bool:
+        """Check the URL against the cached robots.txt of its domain, fetching it when missing or expired."""
+        async with state.robots_lock:
+            if state.robots is None or time.monotonic() - state.robots_fetched_at > ROBOTS_TTL:
+                parts = urlsplit(url)
+                robots = RobotFileParser()
+                try:
+                    async with self.fetcher.get(f"{parts.scheme}://{parts.netloc}/robots.txt") as response:
+                        if response.status == 200:
+                            robots.parse((await response.text(errors="ignore")).splitlines())
+                        else:
+                            robots.parse([])  # No robots.txt, everything is allowed
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    robots.parse([])
+                state.robots = robots
+                state.robots_fetched_at = time.monotonic()
+                state.crawl_delay = robots.crawl_delay("*")
+                if state.crawl_delay:
+                    # Crawl-delay caps the domain rate
+                    state.max_rate = min(state.max_rate, 1 / float(state.crawl_delay))
+                    state.rate = min(state.rate, state.max_rate)
+                    state.burst = 1.0
+        return state.robots.can_fetch("*", url)
+
+    async def _wait_turn(self, state: DomainState):
+        """Wait until the domain is out of backoff and has a token in its bucket."""
+        while True:
+            now = time.monotonic()
+            if now < state.backoff_until:
+                await asyncio.sleep(state.backoff_until - now)
+                continue
+            state.tokens = min(state.burst, state.tokens + (now - state.last_refill) * state.rate)
+            state.last_refill = now
+            if state.tokens >= 1:
+                state.tokens -= 1
+                return
+            await asyncio.sleep((1 - state.tokens) / state.rate)
+
+    @asynccontextmanager
+    async def _slot(self, state: DomainState) -> AsyncIterator[None]:
+        """Hold a domain slot and a global slot, waiting for the domain rate limit in between."""
+        start = time.monotonic()
+        state.waiting += 1
+        self._queued += 1
+        queued = True
+        try:
+            async with state.semaphore:
+                await self._wait_turn(state)
+                async with self._global_semaphore:
+                    queued = False
+                    self._queued -= 1
+                    state.waiting -= 1
+                    waited = time.monotonic() - start
+                    state.total_wait += waited
+                    state.max_wait = max(state.max_wait, waited)
+                    self._in_flight += 1
+                    try:
+                        yield
+                    finally:
+                        self._in_flight -= 1
+        finally:
+            if queued:
+                self._queued -= 1
+                state.waiting -= 1
+
+    def _backoff_delay(self, response: aiohttp.ClientResponse, attempt: int) -> float:
+        """Use Retry-After when the server sends it, a jittered exponential delay otherwise."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                try:
+                    return min(self.backoff_max, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.5)
+
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """GET the URL once the domain's politeness rules allow it, retrying throttled responses."""
+        self._ensure_loop()
+        state = self._get_domain(url)
+        if self.respect_robots and not await self._is_allowed(state, url):
+            raise RobotsDisallowedError(url)
+
+        attempt = 0
+        while True:
+            async with self._slot(state):
+                state.requests += 1
+                async with self.fetcher.get(url, **kwargs) as response:
+                    if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                        # Throttled: halve the domain rate and back off before the next attempt
+                        state.throttled += 1
+                        state.retries += 1
+                        state.rate = max(state.max_rate / 16, state.rate / 2)
+                        state.backoff_until = time.monotonic() + self._backoff_delay(response, attempt)
+                        attempt += 1
+                        continue
+                    if response.status not in RETRY_STATUSES:
+                        state.rate = min(state.max_rate, state.rate + state.max_rate / 10)
+                    yield response
+                    return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the global queue depth and in-flight count, and the per-domain wait times and throttling."""
+        return {
+            "queue_depth": self._queued,
+            "in_flight": self._in_flight,
+            "domains": {
+                domain: {
+                    "requests": state.requests,
+                    "waiting": state.waiting,
+                    "throttled": state.throttled,
+                    "retries": state.retries,
+                    "rate": state.rate,
+                    "crawl_delay": state.crawl_delay,
+                    "mean_wait_s": state.total_wait / state.requests if state.requests else 0.0,
+                    "max_wait_s": state.max_wait,
+                }
+                for domain, state in self._domains.items()
+            },
+        }
+
+
+_scheduler: Optional[FetchScheduler] = None
+
+
+def get_fetch_scheduler(config: Optional[Any] = None) -> FetchScheduler:
+    """Return the process-wide fetch scheduler, configuring it from the agent config on first use."""
+    global _scheduler
+    if _scheduler is None:
+        if config is None:
+            _scheduler = FetchScheduler(get_fetcher())
+        else:
+            _scheduler = FetchScheduler(
+                get_fetcher(config),
+                global_limit=config.fetch_global_limit,
+                domain_limit=config.fetch_domain_limit,
+                domain_rate=config.fetch_domain_rate,
+                domain_burst=config.fetch_domain_burst,
+                respect_robots=config.fetch_respect_robots,
+                max_retries=config.fetch_max_retries,
+                backoff_base=config.fetch_backoff_base,
+                backoff_max=config.fetch_backoff_max,
+            )
+    return _scheduler
+
+
+def reset_fetch_scheduler():
+    """Drop the process-wide fetch scheduler, e.g. after the fetcher it uses was closed."""
+    global _scheduler
+    _scheduler = None
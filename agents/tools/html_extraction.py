@@ -0,0 +1,82 @@
+import re
+from abc import ABC, abstractmethod
+from html.entities import html5
+from typing import Dict
+from bs4 import BeautifulSoup, CData
+
+
+NON_VISIBLE_TAGS = ("script", "style", "template")
+"Elements whose contents the browser does not render, left out by every engine."
+ENTITY_RE = re.compile(r"&([A-Za-z][A-Za-z0-9]*);")
+
+
+class TextExtractor(ABC):
+    """Engine that turns an HTML document into its visible text, with normalized whitespace."""
+    name: str
+
+    @abstractmethod
+    def extract(self, html: str) -> str:
+        """Return the visible text of the document, without the contents of the NON_VISIBLE_TAGS."""
+
+
+class BeautifulSoupExtractor(TextExtractor):
+    """Pure-Python engine based on BeautifulSoup and html.parser."""
+    name = "bs4"
+
+    def extract(self, html: str) -> str:
+        # html.parser drops the semicolon of unknown entities, which browsers show as written
+        html = ENTITY_RE.sub(lambda match: match.group(0) if match.group(1) + ";" in html5 else "&amp;" + match.group(0)[1:], html)
+        soup = BeautifulSoup(html, "html.parser")
+        for script in soup(NON_VISIBLE_TAGS):
+            script.extract()  # Remove script, style and template tags
+        for cdata in soup.find_all(string=lambda string: isinstance(string, CData)):
+            cdata.extract()  # HTML parsers read CDATA sections outside SVG and MathML as comments
+        return " ".join(soup.get_text().split())  # Normalize whitespace
+
+
+class LxmlExtractor(TextExtractor):
+    """libxml2-based engine, several times faster than BeautifulSoup with html.parser."""
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.etree
+        import lxml.html
+        self._etree = lxml.etree
+        self._html = lxml.html
+
+    def extract(self, html: str) -> str:
+        try:
+            tree = self._html.document_fromstring(html)
+        except (self._etree.ParserError, ValueError):
+            # Empty documents, or documents with an XML encoding declaration that lxml refuses as str
+            try:
+                tree = self._html.document_fromstring(html.encode("utf-8"))
+            except (self._etree.ParserError, ValueError):
+                return ""
+        self._etree.strip_elements(tree, *NON_VISIBLE_TAGS, with_tail=False)
+        return " ".join(tree.text_content().split())  # Normalize whitespace
+
+
+ENGINES = {
+    BeautifulSoupExtractor.name: BeautifulSoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+_extractors: Dict[str, TextExtractor] = {}
+
+
+def get_extractor(name: str = "lxml") -> TextExtractor:
+    """Return the extraction engine with the given name, falling back to BeautifulSoup if it is not available."""
+    if name not in _extractors:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown HTML extraction engine: {name}. Available engines: {', '.join(ENGINES)}")
+        try:
+            _extractors[name] = ENGINES[name]()
+        except ImportError:
+            print(f"HTML extraction engine {name} is not installed, falling back to {BeautifulSoupExtractor.name}")
+            _extractors[name] = BeautifulSoupExtractor()
+    return _extractors[name]
+
+
+def html_to_text(html: str, engine: str = "lxml") -> str:
+    """Return the visible text of the document. Module-level so it can run in a process pool."""
+    return get_extractor(engine).extract(html)
@@ -0,0 +1,197 @@
+import codecs
+import re
+import chardet
+import aiohttp
+from html.parser import HTMLParser
+from typing import Any, Dict, Optional, Tuple
+from agents.tools.http_client import PageFetchStats
+from agents.utils.executor import ParseExecutor
+
+
+CHUNK_SIZE = 64 * 1024
+META_PRESCAN_BYTES = 4096
+HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w\-:.]+)', re.IGNORECASE)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?\s*([\w\-:.]+)', re.IGNORECASE)
+
+
+def _lookup_encoding(name: Optional[str]) -> Optional[str]:
+    """Return the normalized codec name, or None if Python does not know the encoding."""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.decode("ascii", "ignore") if isinstance(name, bytes) else name).name
+    except LookupError:
+        return None
+
+
+def charset_from_header(content_type: str) -> Optional[str]:
+    """Return the charset declared in the Content-Type header."""
+    match = HEADER_CHARSET_RE.search(content_type or "")
+    return _lookup_encoding(match.group(1)) if match else None
+
+
+def charset_from_meta(head: bytes) -> Optional[str]:
+    """Return the charset declared in a <meta> tag at the start of the document."""
+    match = META_CHARSET_RE.search(head[:META_PRESCAN_BYTES])
+    return _lookup_encoding(match.group(1)) if match else None
+
+
+def resolve_encoding(raw_head: bytes, content_type: str = "", sample_bytes: int = 32 * 1024) -> Tuple[str, str]:
+    """
+    Resolve the encoding of an HTML document and where it came from.
+    The header and the <meta> tag are preferred, and detection only runs on a bounded sample.
+    """
+    encoding = charset_from_header(content_type)
+    if encoding:
+        return encoding, "header"
+    encoding = charset_from_meta(raw_head)
+    if encoding:
+        return encoding, "meta"
+    encoding = _lookup_encoding(chardet.detect(raw_head[:sample_bytes])["encoding"])
+    if encoding:
+        return encoding, "detected"
+    return "utf-8", "default"
+
+
+def decode_html(raw_content: bytes, content_type: str = "", sample_bytes: int = 32 * 1024) -> str:
+    """Decode a complete HTML body."""
+    encoding, _ = resolve_encoding(raw_content, content_type, sample_bytes)
+    return raw_content.decode(encoding, errors="ignore")
+
+
+def decode_content(raw_content: bytes, content_type: str = "", sample_bytes: Optional[int] = None) -> str:
+    """
+    Decode the raw HTML bytes using the declared or detected encoding.
+    Without sample_bytes the encoding is detected over the whole body.
+    """
+    if sample_bytes is not None:
+        return decode_html(raw_content, content_type, sample_bytes)
+    detected_encoding = chardet.detect(raw_content)['encoding'] or 'utf-8'
+    return raw_content.decode(detected_encoding, errors='ignore')
+
+
+class VisibleTextCounter(HTMLParser):
+    """Incremental HTML parser that counts the visible characters, after whitespace normalization."""
+    SKIPPED_TAGS = ("script", "style")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.visible_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.visible_chars += sum(len(word) + 1 for word in data.split())
+
+
+class HTMLStreamDecoder:
+    """
+    Incremental decoder of a streamed HTML document that counts its visible characters as it goes.
+    It travels to the parse executor with each chunk, so it pickles the state of its codec decoder
+    rather than the decoder itself, which the CJK codecs cannot pickle.
+    """
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+        self.counter = VisibleTextCounter()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"encoding": self.encoding, "decoder": self.decoder.getstate(), "counter": self.counter}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.encoding = state["encoding"]
+        self.decoder = codecs.getincrementaldecoder(self.encoding)(errors="ignore")
+        self.decoder.setstate(state["decoder"])
+        self.counter = state["counter"]
+
+
+def open_stream(raw_head: bytes, content_type: str, sample_bytes: int) -> Tuple[HTMLStreamDecoder, str]:
+    """Resolve the encoding of a streamed document from its first bytes, returning its decoder and the encoding source."""
+    encoding, source = resolve_encoding(raw_head, content_type, sample_bytes)
+    return HTMLStreamDecoder(encoding), source
+
+
+def feed_stream(stream: HTMLStreamDecoder, data: bytes, final: bool = False) -> Tuple[HTMLStreamDecoder, str]:
+    """
+    Decode the next chunk of a streamed document and count its visible characters.
+    The decoder is returned with the text, as the process pool works on a copy of it.
+    """
+    text = stream.decoder.decode(data, final=final)
+    if text:
+        stream.counter.feed(text)
+    return stream, text
+
+
+async def read_html(
+    response: aiohttp.ClientResponse,
+    stats: PageFetchStats,
+    max_bytes: int,
+    max_text_chars: int,
+    sample_bytes: int = 32 * 1024,
+    executor: Optional[ParseExecutor] = None,
+) -> Tuple[bytes, str]:
+    """
+    Stream an HTML response and decode it incrementally.
+
+    Reading stops at max_bytes, or as soon as the decoded document holds max_text_chars
+    visible characters. Returns the raw bytes read and the decoded document.
+    The encoding detection, the decoding and the counting run in the executor, off the event loop.
+    """
+    executor = executor or ParseExecutor(kind="inline")
+    content_type = response.headers.get("Content-Type", "")
+    stats.content_length = response.content_length
+    if response.content_length and response.content_length > max_bytes:
+        print(f"Content-Length of {stats.url} is {response.content_length} bytes, reading only the first {max_bytes}")
+
+    raw = bytearray()
+    text_parts = []
+    stream: Optional[HTMLStreamDecoder] = None
+
+    async def feed(data: bytes, final: bool = False) -> bool:
+        """Decode the data, returning True once enough visible text has been collected."""
+        nonlocal stream
+        stream, text = await executor.run(feed_stream, stream, data, final)
+        if text:
+            text_parts.append(text)
+            stats.decoded_chars += len(text)
+        return stream.counter.visible_chars >= max_text_chars
+
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        chunk = chunk[:max_bytes - len(raw)]
+        raw += chunk
+        stats.peak_buffer_bytes = max(stats.peak_buffer_bytes, len(raw) + stats.decoded_chars)
+
+        if stream is None:
+            # Buffer until the encoding is known from the header, or until there is a sample to inspect
+            if charset_from_header(content_type) is None and len(raw) < min(sample_bytes, max_bytes):
+                continue
+            stream, stats.encoding_source = await executor.run(open_stream, bytes(raw), content_type, sample_bytes)
+            stats.encoding = stream.encoding
+            chunk = bytes(raw)
+
+        if await feed(chunk):
+            stats.stopped_early = True
+            break
+        if len(raw) >= max_bytes:
+            stats.truncated = True
+            break
+
+    if stream is None:
+        # The whole body was smaller than the detection sample
+        stream, stats.encoding_source = await executor.run(open_stream, bytes(raw), content_type, sample_bytes)
+        stats.encoding = stream.encoding
+        await feed(bytes(raw), final=True)
+    else:
+        await feed(b"", final=True)
+
+    stats.bytes_read = len(raw)
+    stats.peak_buffer_bytes = max(stats.peak_buffer_bytes, len(raw) + stats.decoded_chars)
+    return bytes(raw), "".join(text_parts)
@@ -0,0 +1,156 @@
+import asyncio
+import aiohttp
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
+}
+
+
+@dataclass
+class PageFetchStats:
+    """Transfer and memory figures of a single page read."""
+    url: str
+    content_length: Optional[int] = None
+    bytes_read: int = 0
+    decoded_chars: int = 0
+    peak_buffer_bytes: int = 0  # Raw bytes plus decoded characters held in memory at the peak
+    encoding: Optional[str] = None
+    encoding_source: Optional[str] = None  # header, meta, detected or default
+    truncated: bool = False  # Reading stopped at the max-bytes cutoff
+    stopped_early: bool = False  # Reading stopped once enough visible text was collected
+
+
+class HttpFetcher:
+    """
+    Process-wide HTTP client that owns one long-lived aiohttp session.
+
+    The session and its TCPConnector are created lazily on first use and reused
+    for every fetch, so DNS lookups, TCP and TLS handshakes are paid once per host
+    instead of once per URL.
+    """
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 8,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        total_timeout: float = 30.0,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.total_timeout = total_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "pages_read": 0,
+            "bytes_read": 0,
+            "pages_truncated": 0,
+            "pages_stopped_early": 0,
+            "max_peak_buffer_bytes": 0,
+        }
+        self.recent_pages = deque(maxlen=100)
+
+    async def _on_connection_create_end(self, session, context, params):
+        self.stats["connections_opened"] += 1
+
+    async def _on_connection_reuseconn(self, session, context, params):
+        self.stats["connections_reused"] += 1
+
+    def _build_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session with per-host limits, DNS caching and keep-alive."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(
+            ssl=False,  # Ignore SSL verification
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.total_timeout),
+            headers=DEFAULT_HEADERS,
+            trace_configs=[trace_config],
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use or after the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # A session is bound to the loop it was created in, so a new loop needs a new session
+            self._session = self._build_session()
+            self._loop = loop
+        return self._session
+
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Issue a GET request through the shared session."""
+        session = await self.get_session()
+        self.stats["requests"] += 1
+        async with session.get(url, **kwargs) as response:
+            yield response
+
+    def record_page(self, page_stats: PageFetchStats):
+        """Aggregate the figures of a page read."""
+        self.stats["pages_read"] += 1
+        self.stats["bytes_read"] += page_stats.bytes_read
+        self.stats["pages_truncated"] += int(page_stats.truncated)
+        self.stats["pages_stopped_early"] += int(page_stats.stopped_early)
+        self.stats["max_peak_buffer_bytes"] = max(self.stats["max_peak_buffer_bytes"], page_stats.peak_buffer_bytes)
+        self.recent_pages.append(page_stats)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return request, connection and transfer counters."""
+        return dict(self.stats)
+
+    def get_recent_pages(self) -> List[Dict[str, Any]]:
+        """Return the figures of the most recent page reads."""
+        return [asdict(page_stats) for page_stats in self.recent_pages]
+
+    async def close(self):
+        """Close the shared session and release its pooled connections."""
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+_fetcher: Optional[HttpFetcher] = None
+
+
+def get_fetcher(config: Optional[Any] = None) -> HttpFetcher:
+    """Return the process-wide fetcher, configuring it from the agent config on first use."""
+    global _fetcher
+    if _fetcher is None:
+        if config is None:
+            _fetcher = HttpFetcher()
+        else:
+            _fetcher = HttpFetcher(
+                limit=config.http_pool_limit,
+                limit_per_host=config.http_limit_per_host,
+                dns_cache_ttl=config.http_dns_cache_ttl,
+                keepalive_timeout=config.http_keepalive_timeout,
+            )
+    return _fetcher
+
+
+async def close_fetcher():
+    """Close the process-wide fetcher. It is recreated on the next call to get_fetcher."""
+    global _fetcher
+    if _fetcher is not None:
+        await _fetcher.close()
+        _fetcher = None
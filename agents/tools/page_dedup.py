@@ -0,0 +1,126 @@
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from agents.tools.passage_ranker import tokenize
+
+MAX_DISTANCE = 16
+"""
+Default maximum number of different bits between near-duplicates. Syndicated copies of a page, with their own
+headline, byline and footer, are 8 to 13 bits apart; distinct articles, even from the same press release
+template, 23 or more (see tests/test_page_dedup.py).
+"""
+
+
+def simhash(text: str, shingle_words: int = 3) -> int:
+    """
+    64-bit SimHash of the text, computed over its distinct word shingles, so that boilerplate repeated
+    throughout a page does not outweigh the rest of its content.
+    """
+    tokens = tokenize(text)
+    if len(tokens) < shingle_words:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = sorted({" ".join(tokens[i:i + shingle_words]) for i in range(len(tokens) - shingle_words + 1)})
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little") for shingle in shingles],
+        dtype=np.uint64,
+    )
+    # One row of 64 bits per shingle, each bit votes +1 or -1
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int(np.packbits(votes > 0, bitorder="little").view(np.uint64)[0])
+
+
+def hamming_distances(fingerprint: int, fingerprints: np.ndarray) -> np.ndarray:
+    """Number of different bits between the fingerprint and each of the fingerprints."""
+    xor = np.bitwise_xor(fingerprints, np.uint64(fingerprint))
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def group_near_duplicates(fingerprints: List[int], max_distance: int = MAX_DISTANCE) -> List[List[int]]:
+    """Group the indexes of near-duplicate fingerprints. Each group starts with the first index seen."""
+    groups: List[List[int]] = []
+    representatives: List[int] = []
+    for index, fingerprint in enumerate(fingerprints):
+        if representatives:
+            distances = hamming_distances(fingerprint, np.array(representatives, dtype=np.uint64))
+            closest = int(distances.argmin())
+            if distances[closest] <= max_distance:
+                groups[closest].append(index)
+                continue
+        representatives.append(fingerprint)
+        groups.append([index])
+    return groups
+
+
+def find_near_duplicate(fingerprint: int, known: Dict[str, int], max_distance: int = MAX_DISTANCE) -> Optional[str]:
+    """Return the key of the closest known fingerprint within max_distance bits, if any."""
+    if not known:
+        return None
+    keys = list(known)
+    distances = hamming_distances(fingerprint, np.array([known[key] for key in keys], dtype=np.uint64))
+    closest = int(distances.argmin())
+    return keys[closest] if distances[closest] <= max_distance else None
+
+
+class FingerprintStore:
+    """
+    Process-wide store of page fingerprints and the notes extracted from them, so that later runs
+    reuse the extraction of a near-duplicate page about the same topic. The notes are extracted for
+    the researched topic, so a page found again while researching another topic (e.g. another company
+    of the batch) is extracted again.
+    """
+    def __init__(self, max_distance: int = MAX_DISTANCE, max_entries: int = 10000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._fingerprints = np.zeros(0, dtype=np.uint64)
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "reused": 0}
+
+    def lookup(self, fingerprint: int, topic: str) -> Optional[Dict[str, Any]]:
+        """Return the notes extracted for the closest near-duplicate page about the same topic, if any."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            if not self._entries:
+                return None
+            distances = hamming_distances(fingerprint, self._fingerprints)
+            for index in np.argsort(distances, kind="stable"):
+                if distances[index] > self.max_distance:
+                    break
+                entry = self._entries[index]
+                if entry["topic"] == topic:
+                    self.stats["reused"] += 1
+                    return entry["notes"]
+            return None
+
+    def add(self, fingerprint: int, topic: str, notes: Dict[str, Any]):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the oldest half
+                keep = self.max_entries // 2
+                self._entries = self._entries[-keep:]
+                self._fingerprints = self._fingerprints[-keep:]
+            self._entries.append({"topic": topic, "notes": notes})
+            self._fingerprints = np.append(self._fingerprints, np.uint64(fingerprint))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "entries": len(self._entries)}
+
+
+_fingerprint_store: Optional[FingerprintStore] = None
+
+
+def get_fingerprint_store(config: Optional[Any] = None) -> FingerprintStore:
+    """Return the process-wide fingerprint store."""
+    global _fingerprint_store
+    if _fingerprint_store is None:
+        _fingerprint_store = FingerprintStore(max_distance=config.dedup_max_distance if config else MAX_DISTANCE)
+    return _fingerprint_store
+
+
+def reset_fingerprint_store():
+    """Forget the fingerprints of the previous runs."""
+    global _fingerprint_store
+    _fingerprint_store = None
@@ -0,0 +1,109 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset("""
+a al algo como con de del el en es esta este ha la las lo los mas o para pero por que se sin sobre su sus un una y
+info informacion
+an and are as at be by for from has in is it its of on or that the this to was were with
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text, about four characters per token."""
+    return (len(text) + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free word tokens without stopwords."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [token for token in TOKEN_RE.findall(text) if len(token) > 1 and token not in STOPWORDS]
+
+
+def split_passages(text: str, passage_words: int = 120) -> List[str]:
+    """Split the page text into passages of about passage_words words, cutting at sentence boundaries."""
+    passages = []
+    current: List[str] = []
+    current_words = 0
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        words = sentence.split()
+        # Very long sentences (menus, lists without punctuation) are cut into windows
+        while len(words) > passage_words:
+            if current:
+                passages.append(" ".join(current))
+                current, current_words = [], 0
+            passages.append(" ".join(words[:passage_words]))
+            words = words[passage_words:]
+        if current_words + len(words) > passage_words and current:
+            passages.append(" ".join(current))
+            current, current_words = [], 0
+        if words:
+            current.append(" ".join(words))
+            current_words += len(words)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+class BM25Index:
+    """In-memory inverted index over passages, scored with BM25 using NumPy."""
+    def __init__(self, passages: List[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(passages)
+        postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        lengths = np.zeros(self.n_docs, dtype=np.float64)
+        for doc_id, passage in enumerate(passages):
+            tokens = tokenize(passage)
+            lengths[doc_id] = len(tokens)
+            for token in tokens:
+                postings[token][doc_id] = postings[token].get(doc_id, 0) + 1
+        self.doc_lengths = lengths
+        self.avg_length = float(lengths.mean()) if self.n_docs and lengths.mean() > 0 else 1.0
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            token: (np.fromiter(docs.keys(), dtype=np.int64), np.fromiter(docs.values(), dtype=np.float64))
+            for token, docs in postings.items()
+        }
+
+    def score(self, query: str) -> np.ndarray:
+        """Return the BM25 score of every passage for the query."""
+        scores = np.zeros(self.n_docs, dtype=np.float64)
+        for token in set(tokenize(query)):
+            if token not in self.postings:
+                continue
+            doc_ids, tfs = self.postings[token]
+            idf = np.log(1 + (self.n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_ids] / self.avg_length)
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+
+def select_passages(text: str, query: str, token_budget: int = 2000, passage_words: int = 120) -> str:
+    """
+    Keep the passages of the page most relevant to the query, within the token budget.
+    The selected passages are returned in page order. Pages without any match keep their first passages.
+    """
+    passages = split_passages(text, passage_words)
+    if not passages or estimate_tokens(text) <= token_budget:
+        return text
+
+    scores = BM25Index(passages).score(query)
+    order = np.argsort(-scores, kind="stable") if scores.any() else np.arange(len(passages))
+
+    selected = []
+    used_tokens = 0
+    for doc_id in order:
+        if scores.any() and scores[doc_id] <= 0:
+            break
+        passage_tokens = estimate_tokens(passages[doc_id]) + 1
+        if used_tokens + passage_tokens > token_budget:
+            continue
+        selected.append(int(doc_id))
+        used_tokens += passage_tokens
+    return " ".join(passages[doc_id] for doc_id in sorted(selected))
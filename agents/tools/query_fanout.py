@@ -0,0 +1,87 @@
+import asyncio
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+from agents.tools.search_cache import normalize_query
+from agents.tools.search_webs import search
+from agents.utils.urls import dedup_url_key
+
+
+@lru_cache(maxsize=8)
+def question_sections(excel_path: str) -> Tuple[str, ...]:
+    """Return the question sections of the Excel file as search terms, e.g. "tomadores_decision" -> "tomadores decision"."""
+    df = pd.read_excel(excel_path)
+    return tuple(str(section).replace("_", " ") for section in df["section"].dropna().unique())
+
+
+def expand_queries(topic: str, templates: Sequence[str], sections: Sequence[str] = (), max_queries: int = 6) -> List[str]:
+    """
+    Expand the topic into query variants, the templates first and then one query per question section.
+    Variants with the same terms as a previous one are dropped. The topic itself is always the first query.
+    """
+    candidates = [topic] + [template.format(topic=topic) for template in templates] + [f"{topic} {section}" for section in sections]
+    queries, seen = [], set()
+    for query in candidates:
+        key = normalize_query(query)
+        if key not in seen:
+            seen.add(key)
+            queries.append(query)
+    return queries[:max_queries]
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[Sequence[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists by reciprocal rank fusion, score(url) = sum(1 / (k + rank)).
+    URLs are deduplicated by their dedup_url_key, keeping the first result seen for each.
+    """
+    scores: Dict[str, float] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    for result_list in result_lists:
+        seen_in_list = set()
+        for rank, item in enumerate(result_list, start=1):
+            key = dedup_url_key(item["url"])
+            if key in seen_in_list:
+                continue
+            seen_in_list.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            results.setdefault(key, item)
+    # Sorting is stable, so ties keep the order in which the URLs were first seen
+    return [results[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+async def search_variants(topic: str, config: Any, sections: Optional[Sequence[str]] = None) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Search the query variants of the topic concurrently and yield (variant index, results) as each search finishes.
+    A failed variant is skipped unless all of them fail.
+    """
+    if sections is None:
+        sections = question_sections(config.search_fanout_excel) if config.search_fanout_excel else ()
+    queries = expand_queries(topic, config.search_query_templates, sections, config.search_max_queries)
+    print(f"Fan-out search of {len(queries)} query variants for {topic}")
+
+    async def indexed_search(index: int, query: str):
+        try:
+            return index, await search(query, config)
+        except Exception as e:
+            print(f"Search failed for {query}: {e}")
+            return index, e
+
+    errors = []
+    for next_done in asyncio.as_completed([indexed_search(index, query) for index, query in enumerate(queries)]):
+        index, response = await next_done
+        if isinstance(response, Exception):
+            errors.append(response)
+            continue
+        yield index, response or []
+    if len(errors) == len(queries):
+        raise errors[0]
+
+
+async def fan_out_search(topic: str, config: Any, sections: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Search the query variants of the topic concurrently and return their fused results.
+    A failed variant is skipped unless all of them fail.
+    """
+    responses = {index: results async for index, results in search_variants(topic, config, sections)}
+    result_lists = [responses[index] for index in sorted(responses)]
+    return reciprocal_rank_fusion(result_lists, k=config.search_rrf_k)
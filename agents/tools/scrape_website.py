@@ -1,14 +1,22 @@
 import aiohttp
-import chardet
-import asyncio  
+import asyncio
 from interfaces.llm_interface import LLMInterface
-from utils.prompt_manager import PromptManager
+from agents.utils.prompt_manager import PromptManager
+from agents.tools.http_client import get_fetcher, PageFetchStats
+from agents.tools.html_stream import read_html, decode_content
+from agents.tools.html_extraction import html_to_text
+from agents.tools.passage_ranker import select_passages, estimate_tokens
+from agents.utils.executor import get_parse_executor
+from agents.tools.fetch_cache import get_fetch_cache
+from agents.tools.fetch_scheduler import get_fetch_scheduler, RobotsDisallowedError
+from agents.utils.cassette import get_cassette
+from agents.utils.urls import canonicalize_url
 from langgraph.prebuilt import InjectedState
 from typing_extensions import Annotated
 from agents.research_agent.state import State
+from agents.research_agent.progress import emit_progress
 from pydantic import BaseModel, Field
-from typing import Any, cast
-from bs4 import BeautifulSoup
+from typing import Any, Dict, List, Tuple, cast
 
 
 class WebInfo(BaseModel):
@@ -23,83 +31,262 @@ class WebInfo(BaseModel):
     )
 
 
-async def extract_text(url):
+class PackedWebInfo(BaseModel):
+    """
+    Extracted information from several URLs, one entry per URL.
+    """
+    pages: List[WebInfo] = Field(
+        description="The extracted information of each URL, with the URL exactly as given."
+    )
+
+
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+FETCH_FAILURES = ("Failed to fetch content", "Skipped non-HTML content", "Request cancelled", "Disallowed by robots.txt")
+
+
+def fetch_failure(url: str, message: str) -> Dict[str, Any]:
+    """Entry of state.extracted_info for a page that could not be fetched, with one of the FETCH_FAILURES messages."""
+    return {"url": url, "error": message}
+
+
+def is_fetch_failure(info: Dict[str, Any]) -> bool:
+    """Whether an entry of state.extracted_info is a failed fetch rather than the notes of the page."""
+    return "error" in info
+
+
+async def decode_off_loop(raw_content: bytes, content_type: str = "", config=None) -> str:
+    """Decode the raw HTML bytes in the parse executor, so encoding detection does not block the event loop."""
+    if config is None:
+        return decode_content(raw_content)
+    sample_bytes = config.fetch_charset_sample_bytes if config.fetch_streaming else None
+    return await get_parse_executor(config).run(decode_content, raw_content, content_type, sample_bytes)
+
+
+async def extract_text(url, config=None):
     """Extract text from a URL, handling timeouts, encoding issues, and content type filtering."""
     print(f"Extracting text from {url}")
 
-    async with aiohttp.ClientSession(
-        connector=aiohttp.TCPConnector(ssl=False),  # Ignore SSL verification
-        timeout=aiohttp.ClientTimeout(total=30)  # 30s timeout
-    ) as session:
-        try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
-            }
-            async with session.get(url, headers=headers) as response:
-                content_type = response.headers.get('Content-Type', '').lower()
-
-                # Only process HTML responses
-                if 'text/html' not in content_type:
-                    print(f"Skipping non-HTML content from {url} (Content-Type: {content_type})")
-                    return "Skipped non-HTML content"
+    # Record or replay the page when a cassette is configured
+    cassette = get_cassette(config)
+    if cassette is not None:
+        return await cassette.call("http", {"url": url}, lambda: download_text(url, config))
+    return await download_text(url, config)
+
 
+async def download_text(url, config=None):
+    """Download the HTML of a URL through the fetch cache and the fetch scheduler, and decode it."""
+
+    # Serve fresh pages from the fetch cache without touching the network
+    cache = get_fetch_cache(config)
+    # The cache reads SQLite and decompresses the body, off the event loop
+    cached_page = await asyncio.to_thread(cache.get, url) if cache else None
+    if cached_page and cached_page.is_fresh:
+        cache.record_hit(cached_page)
+        return await decode_off_loop(cached_page.body, cached_page.headers.get("Content-Type", ""), config)
+
+    # Reuse the process-wide pooled session instead of opening a new one per URL,
+    # going through the scheduler that enforces the per-domain politeness rules
+    fetcher = get_fetcher(config)
+    scheduler = get_fetch_scheduler(config)
+    try:
+        # Stale pages are revalidated with a conditional GET
+        request_headers = cache.conditional_headers(cached_page) if cache else {}
+        async with scheduler.get(url, headers=request_headers) as response:
+            if response.status == 304 and cached_page:
+                await asyncio.to_thread(cache.refresh, url, cached_page, response.headers)
+                cache.record_hit(cached_page, revalidated=True)
+                return await decode_off_loop(cached_page.body, cached_page.headers.get("Content-Type", ""), config)
+
+            if response.status >= 400:
+                print(f"HTTP {response.status} while fetching {url}")
+                return "Failed to fetch content"
+
+            content_type = response.headers.get('Content-Type', '').lower()
+
+            # Only process HTML responses
+            if 'text/html' not in content_type:
+                print(f"Skipping non-HTML content from {url} (Content-Type: {content_type})")
+                return "Skipped non-HTML content"
+
+            complete = True
+            if config is not None and config.fetch_streaming:
+                # Stream the body, stopping at the byte cap or once enough visible text was read
+                page_stats = PageFetchStats(url=url)
+                raw_content, text = await read_html(
+                    response,
+                    page_stats,
+                    max_bytes=config.fetch_max_bytes,
+                    max_text_chars=config.fetch_max_text_chars,
+                    sample_bytes=config.fetch_charset_sample_bytes,
+                    executor=get_parse_executor(config),
+                )
+                fetcher.record_page(page_stats)
+                complete = not (page_stats.truncated or page_stats.stopped_early)
+            else:
                 raw_content = await response.read()
-                detected_encoding = chardet.detect(raw_content)['encoding'] or 'utf-8'
+                text = await decode_off_loop(raw_content, content_type, config)
 
-                return raw_content.decode(detected_encoding, errors='ignore')
+            if cache:
+                cache.record_miss()
+                # A partial body must not be cached, its validators would keep revalidating the cut page
+                if response.status == 200 and complete:
+                    headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+                    await asyncio.to_thread(cache.put, url, raw_content, headers)
 
-        except asyncio.TimeoutError:
-            print(f"Timeout while fetching {url}")
-            return "Failed to fetch content"
+            return text
 
-        except aiohttp.ClientError as e:
-            print(f"Network error while fetching {url}: {e}")
-            return "Failed to fetch content"
+    except RobotsDisallowedError:
+        print(f"Skipping {url}, disallowed by robots.txt")
+        return "Disallowed by robots.txt"
 
-        except asyncio.CancelledError:
-            print(f"Request to {url} was cancelled.")
-            return "Request cancelled"
-        
-        except Exception as e:
-            print(f"Error while fetching {url}: {e}")
-            return "Failed to fetch content"
+    except asyncio.TimeoutError:
+        print(f"Timeout while fetching {url}")
+        return "Failed to fetch content"
 
+    except aiohttp.ClientError as e:
+        print(f"Network error while fetching {url}: {e}")
+        return "Failed to fetch content"
+
+    except asyncio.CancelledError:
+        print(f"Request to {url} was cancelled.")
+        return "Request cancelled"
+    
+    except Exception as e:
+        print(f"Error while fetching {url}: {e}")
+        return "Failed to fetch content"
 
-async def extract_notes(
-    url: str,
-    state: Annotated[State, InjectedState],
-    config: dict,
-) -> str:
-    """Scrape and summarize content from a website."""
-    print(f"Extracting notes from {url}")
 
+async def fetch_page_text(url: str, config) -> str:
+    """Fetch a page and return its visible text, or one of the FETCH_FAILURES messages."""
     # Extract text from the URL
-    content = await extract_text(url)
-    if content in ["Failed to fetch content", "Skipped non-HTML content", "Request cancelled"]:
+    content = await extract_text(url, config)
+    if content in FETCH_FAILURES:
         return content  # Skip processing if the fetch failed or was non-HTML
-    
-    # Parse the HTML content
-    soup = BeautifulSoup(content, "html.parser")
-    for script in soup(["script", "style"]):
-        script.extract()  # Remove script and style tags
-    
-    # Get the text content
-    text_content = soup.get_text()
-    text_content = " ".join(text_content.split())  # Normalize whitespace
 
+    # Parse the HTML content and get the visible text with the configured engine, off the event loop
+    return await get_parse_executor(config).run(html_to_text, content, config.html_engine)
+
+
+async def page_content(text_content: str, state: State, config) -> str:
+    """The part of the page text sent to the LLM."""
+    if config.passage_ranking:
+        # Keep only the passages most relevant to the topic, within the token budget. Ranking up to
+        # fetch_max_text_chars of text is CPU-bound, so it runs in the parse executor like the HTML parsing
+        return await get_parse_executor(config).run(
+            select_passages, text_content, state.topic, config.passage_token_budget, config.passage_words
+        )
     # Limit the content to 20k characters
-    content = text_content[:20000]
+    return text_content[:20000]
+
+
+async def summarize_page(url: str, text_content: str, state: State, config) -> Dict[str, Any]:
+    """Extract the notes about the topic from the visible text of a page with the LLM."""
+    return await summarize_content(url, await page_content(text_content, state, config), state, config)
+
 
-    # Get the extract_info prompt 
-    extract_info_prompt = PromptManager(config).get_prompt("extract_info")
-    prompt = extract_info_prompt.format(
+async def summarize_content(url: str, content: str, state: State, config) -> Dict[str, Any]:
+    """Extract the notes about the topic from the content of a page already cut by page_content."""
+    # Render the extract_info prompt, compiled once per process
+    prompt = PromptManager(config).render(
+        "extract_info",
         topic=state.topic,
         url=url,
-        content=content,  # Limit content to 20k characters
+        content=content,
     )
 
-    llm = LLMInterface(config).get_llm()
-    bound_model = llm.with_structured_output(WebInfo)
-    response = cast(WebInfo, await bound_model.ainvoke(prompt))
-    notes_extracted = response.model_dump()
-    return str(notes_extracted)
+    response = cast(WebInfo, await LLMInterface(config).ainvoke(prompt, node="extract", schema=WebInfo, url=url))
+    # A semantic cache hit is the answer about another, similar page: the notes are kept under this URL
+    notes = {**response.model_dump(), "url": url}
+    await emit_progress("extraction", {"url": url, "notes": notes})
+    return notes
+
+
+def pack_pages(contents: List[Tuple[str, str]], token_budget: int, max_pages: int) -> List[List[Tuple[str, str]]]:
+    """Group the (url, content) pages in order into packs of at most max_pages and token_budget estimated tokens."""
+    packs: List[List[Tuple[str, str]]] = []
+    pack_tokens = 0
+    for url, content in contents:
+        tokens = estimate_tokens(content)
+        if not packs or len(packs[-1]) >= max_pages or pack_tokens + tokens > token_budget:
+            packs.append([])
+            pack_tokens = 0
+        packs[-1].append((url, content))
+        pack_tokens += tokens
+    return packs
+
+
+async def summarize_pages(pages: List[Tuple[str, str]], state: State, config, stats: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+    """
+    Extract the notes of several pages, packing them into shared LLM calls of extract_info_packed up to the
+    content budget. The pages the model leaves out of its answer are extracted with their own call.
+    stats counts the calls and the estimated prompt tokens saved against one call per page.
+    """
+    prompts = PromptManager(config)
+    texts = await asyncio.gather(*(page_content(text, state, config) for _, text in pages))
+    contents = [(url, content) for (url, _), content in zip(pages, texts)]
+    packs = pack_pages(contents, config.extract_pack_token_budget, config.extract_pack_max_pages)
+
+    async def extract_pack(pack: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        if len(pack) == 1:
+            url, content = pack[0]
+            stats["calls"] += 1
+            return {url: await summarize_content(url, content, state, config)}
+
+        prompt = prompts.render(
+            "extract_info_packed",
+            topic=state.topic,
+            pages="\n\n".join(
+                f"<Sitio web {url}>\n{content}\n</Sitio web {url}>" for url, content in pack
+            ),
+        )
+        response = cast(PackedWebInfo, await LLMInterface(config).ainvoke(
+            prompt, node="extract", schema=PackedWebInfo, url=" ".join(url for url, _ in pack),
+        ))
+        stats["calls"] += 1
+        stats["packed_calls"] += 1
+        stats["pages_packed"] += len(pack)
+        per_page_tokens = sum(
+            estimate_tokens(prompts.render("extract_info", topic=state.topic, url=url, content=content)) for url, content in pack
+        )
+        stats["tokens_saved"] += per_page_tokens - estimate_tokens(prompt)
+
+        by_url = {canonicalize_url(info.url): info for info in response.pages}
+        notes, missing = {}, []
+        for url, content in pack:
+            info = by_url.get(canonicalize_url(url))
+            if info is not None:
+                notes[url] = {**info.model_dump(), "url": url}
+                await emit_progress("extraction", {"url": url, "notes": notes[url]})
+            else:
+                missing.append((url, content))
+        stats["calls_saved"] += len(pack) - 1 - len(missing)
+        if missing:
+            # Fallback to one call per page the model left out, whose tokens were not saved
+            stats["fallbacks"] += len(missing)
+            stats["calls"] += len(missing)
+            stats["tokens_saved"] -= sum(
+                estimate_tokens(prompts.render("extract_info", topic=state.topic, url=url, content=content)) for url, content in missing
+            )
+            fallback = await asyncio.gather(*(summarize_content(url, content, state, config) for url, content in missing))
+            notes.update({url: page_notes for (url, _), page_notes in zip(missing, fallback)})
+        return notes
+
+    extracted: Dict[str, Dict[str, Any]] = {}
+    for notes in await asyncio.gather(*(extract_pack(pack) for pack in packs)):
+        extracted.update(notes)
+    return {url: extracted[url] for url, _ in pages}
+
+
+async def extract_notes(
+    url: str,
+    state: Annotated[State, InjectedState],
+    config: dict,
+) -> Dict[str, Any]:
+    """Scrape and summarize content from a website, returning its notes or the fetch failure."""
+    print(f"Extracting notes from {url}")
+
+    text_content = await fetch_page_text(url, config)
+    if text_content in FETCH_FAILURES:
+        return fetch_failure(url, text_content)
+
+    return await summarize_page(url, text_content, state, config)
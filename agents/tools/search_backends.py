@@ -0,0 +1,104 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from agents.tools.search_cache import normalize_query, query_similarity
+
+
+class SearchBackend(ABC):
+    """Search engine queried by search_webs.search."""
+    name: str
+
+    @abstractmethod
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Return the results of the query, as dictionaries with at least the "url" key."""
+
+    def params(self) -> Dict[str, Any]:
+        """Parameters that change the results besides the query, part of the search cache key."""
+        return {"backend": self.name}
+
+
+class TavilySearchBackend(SearchBackend):
+    """Tavily news search through the LangChain tool."""
+    name = "tavily"
+
+    def __init__(self, search_depth: str = "basic", topic: str = "news"):
+        self.search_depth = search_depth
+        self.topic = topic
+        self._tools: Dict[int, Any] = {}
+
+    def _get_tool(self, max_results: int):
+        # The wrapper is built once per max_results instead of on every query
+        if max_results not in self._tools:
+            from langchain_community.tools.tavily_search import TavilySearchResults
+            self._tools[max_results] = TavilySearchResults(
+                search_depth=self.search_depth, #advanced
+                topic=self.topic, #general
+                include_images=False,
+                include_image_description=False,
+                include_answer=False,
+                include_raw_content=False,
+                # time_range="year",
+                max_results=max_results
+                # include_domains=["wikipedia.org"]
+            )
+        return self._tools[max_results]
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        return await self._get_tool(max_results).ainvoke({"query": query})
+
+    def params(self) -> Dict[str, Any]:
+        return {"backend": self.name, "search_depth": self.search_depth, "topic": self.topic}
+
+
+class FixtureSearchBackend(SearchBackend):
+    """
+    Offline backend that serves results from a JSON file mapping queries to result lists.
+    Unknown queries get the results of the most similar query in the file. An optional
+    latency simulates the remote call for benchmarks.
+    """
+    name = "fixture"
+
+    def __init__(self, path: str, latency: float = 0.0):
+        self.path = path
+        self.latency = latency
+        with open(path, "r", encoding="utf-8") as file:
+            fixtures = json.load(file)
+        self._results = {normalize_query(query): results for query, results in fixtures.items()}
+        self.calls = 0
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        normalized = normalize_query(query)
+        if normalized not in self._results:
+            if not self._results:
+                return []
+            normalized = max(self._results, key=lambda known: query_similarity(normalized, known))
+        return [dict(item) for item in self._results[normalized][:max_results]]
+
+    def params(self) -> Dict[str, Any]:
+        return {"backend": self.name, "path": self.path}
+
+
+_backend: Optional[SearchBackend] = None
+
+
+def get_search_backend(config: Optional[Any] = None) -> SearchBackend:
+    """Return the process-wide search backend selected in the agent config."""
+    global _backend
+    if _backend is None:
+        if config is not None and config.search_backend == "fixture":
+            _backend = FixtureSearchBackend(config.search_fixture_path, latency=config.search_fixture_latency)
+        elif config is None or config.search_backend == "tavily":
+            _backend = TavilySearchBackend()
+        else:
+            raise ValueError(f"Unknown search backend: {config.search_backend}. Use 'tavily' or 'fixture'")
+    return _backend
+
+
+def set_search_backend(backend: Optional[SearchBackend]):
+    """Replace the process-wide search backend, e.g. with a fixture backend in benchmarks."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from agents.tools.passage_ranker import tokenize
+
+
+def query_key(query: str) -> str:
+    """Lowercased query with collapsed whitespace. Every word counts, as "con" and "sin" ask for different results."""
+    return " ".join(query.lower().split())
+
+
+def normalize_query(query: str) -> str:
+    """Sorted, unique, accent-free query terms without stopwords, so word order and casing do not matter."""
+    terms = sorted(set(tokenize(query)))
+    # Queries made only of stopwords keep their own words
+    return " ".join(terms) if terms else " ".join(query.lower().split())
+
+
+def query_similarity(normalized_a: str, normalized_b: str) -> float:
+    """Jaccard similarity of the terms of two normalized queries."""
+    terms_a, terms_b = set(normalized_a.split()), set(normalized_b.split())
+    if not terms_a and not terms_b:
+        return 1.0
+    return len(terms_a & terms_b) / len(terms_a | terms_b)
+
+
+class SearchCache:
+    """
+    Persistent search-results cache keyed by query_key plus search parameters, with TTL and LRU eviction.
+
+    On an exact miss, a near-identical query with the same parameters is served instead, when the
+    similarity of their normalized terms reaches similarity_threshold and the new query adds no word
+    of its own, stopwords included: a query with an extra word, like the fan-out variants
+    "<topic> noticias" of a cached topic or "empresas sin IA" of "empresas con IA", asks for other
+    results and always goes to the search engine.
+    """
+    def __init__(self, path: str, ttl: int = 86400, max_entries: int = 5000, similarity_threshold: float = 0.8):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS searches (
+                params_hash TEXT NOT NULL,
+                query TEXT NOT NULL,
+                results TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (params_hash, query)
+            )
+            """
+        )
+        self._conn.commit()
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _params_hash(params: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, query: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached results of the query or of a near-identical one, if not expired."""
+        key = query_key(query)
+        params_hash = self._params_hash(params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM searches WHERE expires_at <= ?", (now,))
+            row = self._conn.execute(
+                "SELECT query, results FROM searches WHERE params_hash = ? AND query = ?", (params_hash, key)
+            ).fetchone()
+            if row is None:
+                best, best_similarity = None, 0.0
+                words, normalized = set(key.split()), normalize_query(query)
+                for cached_query, results in self._conn.execute(
+                    "SELECT query, results FROM searches WHERE params_hash = ?", (params_hash,)
+                ):
+                    if not words <= set(cached_query.split()):
+                        continue
+                    similarity = query_similarity(normalized, normalize_query(cached_query))
+                    if similarity > best_similarity:
+                        best, best_similarity = (cached_query, results), similarity
+                if best is None or best_similarity < self.similarity_threshold:
+                    self.stats["misses"] += 1
+                    self._conn.commit()
+                    return None
+                row = best
+                self.stats["near_hits"] += 1
+            else:
+                self.stats["hits"] += 1
+            self._conn.execute(
+                "UPDATE searches SET last_access = ? WHERE params_hash = ? AND query = ?", (now, params_hash, row[0])
+            )
+            self._conn.commit()
+        return json.loads(row[1])
+
+    def put(self, query: str, params: Dict[str, Any], results: List[Dict[str, Any]]):
+        """Store the results of the query, evicting the least recently used entries beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?)",
+                (self._params_hash(params), query_key(query), json.dumps(results, ensure_ascii=False), now + self.ttl, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM searches WHERE rowid IN (SELECT rowid FROM searches ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.stats["evictions"] += count - self.max_entries
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        return {**self.stats, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache(config: Optional[Any] = None) -> Optional[SearchCache]:
+    """Return the process-wide search cache, or None if it is disabled in the agent config."""
+    global _search_cache
+    if config is not None and not config.search_cache_enabled:
+        return None
+    if _search_cache is None:
+        if config is None:
+            return None
+        _search_cache = SearchCache(
+            config.search_cache_path,
+            ttl=config.search_cache_ttl,
+            max_entries=config.search_cache_max_entries,
+            similarity_threshold=config.search_similarity_threshold,
+        )
+    return _search_cache
+
+
+def close_search_cache():
+    """Close the process-wide search cache."""
+    global _search_cache
+    if _search_cache is not None:
+        _search_cache.close()
+        _search_cache = None
@@ -1,5 +1,12 @@
 from typing import Any, Optional, cast
-from langchain_community.tools.tavily_search import TavilySearchResults
+from agents.tools.search_backends import get_search_backend
+from agents.tools.search_cache import get_search_cache
+from agents.utils.cassette import get_cassette
+
+
+def is_pdf_url(url: str) -> bool:
+    url = url.lower()
+    return url.endswith('.pdf') or '/pdf/' in url
 
 
 async def search(
@@ -9,32 +16,39 @@ async def search(
 
     This function queries the web to fetch comprehensive, accurate, and trusted results. It's particularly useful
     for answering questions about current events. Provide as much context in the query as needed to ensure high recall.
+    Results are served from the search cache when the same or a near-identical query was made recently.
     """
     print(f"Searching for {query}")
 
+    # Record or replay the search when a cassette is configured
+    cassette = get_cassette(config)
+    if cassette is not None:
+        request = {"query": query, "max_results": config.max_search_results}
+        return await cassette.call("search", request, lambda: search_engine(query, config))
+    return await search_engine(query, config)
+
+
+async def search_engine(
+    query: str, config: dict
+) -> Optional[list[dict[str, Any]]]:
+    """Query the configured search backend, serving the query from the search cache when possible."""
+    backend = get_search_backend(config)
+    cache = get_search_cache(config)
+    params = {**backend.params(), "max_results": config.max_search_results}
+
+    if cache is not None:
+        cached = cache.get(query, params)
+        if cached is not None:
+            print(f"Search cache hit for {query}")
+            return cast(list[dict[str, Any]], cached)
 
-    # Wrap the Tavily search tool
-    wrapped = TavilySearchResults(
-        search_depth="basic", #advanced
-        topic="news", #general
-        include_images=False,
-        include_image_description=False,
-        include_answer=False,
-        include_raw_content=False,
-        # time_range="year",
-        max_results=config.max_search_results
-        # include_domains=["wikipedia.org"]
-        )
-    
     # Perform the search
-    result = await wrapped.ainvoke({"query": query})
+    result = await backend.search(query, config.max_search_results)
 
     # Remove URLs that are PDFs from the search results
-    for item in result:
-        if item["url"].lower().endswith('.pdf') or '/pdf/' in item["url"].lower():
-            result.remove(item)
-        else:
-            continue
+    result = [item for item in result if not is_pdf_url(item["url"])]
 
-    return cast(list[dict[str, Any]], result)
+    if cache is not None:
+        cache.put(query, params, result)
 
+    return cast(list[dict[str, Any]], result)
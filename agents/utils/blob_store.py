@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+BLOB_KEY = "$blob"
+"Key of the reference that stands in the graph state for a payload moved to the blob store."
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and BLOB_KEY in value
+
+
+class BlobStore:
+    """
+    Content-addressed store of the large payloads of the graph state, e.g. the notes of each page, so the
+    state carries a {"$blob": <sha256>} reference instead of the payload and every checkpoint of a run
+    stores a few bytes per page rather than all the notes again. Identical payloads are stored once.
+
+    The payloads are kept as JSON in SQLite, zlib-compressed, with the most recently used ones in memory
+    up to memory_bytes; resolving a reference returns a fresh copy, so the nodes may modify it. Blobs not
+    used for ttl seconds (0 to keep them) are deleted when the database is opened: each checkpoint touches
+    the blobs its state references, so they are kept as long as the checkpoint.
+    """
+    def __init__(self, path: str, memory_bytes: int = 64 * 1024 * 1024, compression_level: int = 6, ttl: int = 0):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.compression_level = compression_level
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_size = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            """
+        )
+        if ttl:
+            self._conn.execute("DELETE FROM blobs WHERE last_access < ?", (time.time() - ttl,))
+        self._conn.commit()
+        self.stats = {"puts": 0, "stored": 0, "stored_bytes": 0, "resolved": 0, "memory_hits": 0, "disk_reads": 0, "touched": 0, "seconds": 0.0}
+
+    def _remember(self, digest: str, data: str):
+        """Keep the JSON of the blob in the in-memory LRU, evicting the least recently used ones beyond memory_bytes."""
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+        self._memory[digest] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def put_many(self, values: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        """Store the values, keyed by any name, and return their references under the same keys."""
+        start = time.perf_counter()
+        refs, rows = {}, []
+        with self._lock:
+            for key, value in values.items():
+                data = json.dumps(value, ensure_ascii=False)
+                digest = hashlib.sha256(data.encode("utf-8")).hexdigest()
+                refs[key] = {BLOB_KEY: digest}
+                self.stats["puts"] += 1
+                if digest not in self._memory:
+                    rows.append((digest, zlib.compress(data.encode("utf-8"), self.compression_level), len(data), time.time()))
+                self._remember(digest, data)
+            for row in rows:
+                if self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)", row).rowcount:
+                    self.stats["stored"] += 1
+                    self.stats["stored_bytes"] += len(row[1])
+                else:
+                    # Stored by an earlier process, only its last access is refreshed
+                    self._conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (row[3], row[0]))
+            if rows:
+                self._conn.commit()
+            self.stats["seconds"] += time.perf_counter() - start
+        return refs
+
+    def touch(self, digests: Iterable[str]):
+        """Refresh the last access of the blobs, e.g. those referenced by a checkpoint, so the TTL sweep keeps them."""
+        start = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("UPDATE blobs SET last_access = ? WHERE digest = ?", [(now, digest) for digest in set(digests)])
+            self._conn.commit()
+            self.stats["touched"] += 1
+            self.stats["seconds"] += time.perf_counter() - start
+
+    def get(self, digest: str) -> Any:
+        """The value of the blob, a fresh copy. Raises KeyError if it is not stored."""
+        with self._lock:
+            self.stats["resolved"] += 1
+            data = self._memory.get(digest)
+            if data is not None:
+                self.stats["memory_hits"] += 1
+                self._memory.move_to_end(digest)
+            else:
+                row = self._conn.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                if row is None:
+                    raise KeyError(f"Blob {digest} is not stored in {self.path}")
+                self.stats["disk_reads"] += 1
+                data = zlib.decompress(row[0]).decode("utf-8")
+                self._remember(digest, data)
+        return json.loads(data)
+
+    def resolve(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """The mapping with its blob references replaced by their values; other values are kept as they are."""
+        start = time.perf_counter()
+        resolved = {key: self.get(value[BLOB_KEY]) if is_blob_ref(value) else value for key, value in values.items()}
+        with self._lock:
+            self.stats["seconds"] += time.perf_counter() - start
+        return resolved
+
+    def get_stats(self) -> Dict[str, Any]:
+        """References created and resolved, blobs and bytes written, and the time spent on both."""
+        with self._lock:
+            return {**self.stats, "seconds": round(self.stats["seconds"], 4), "memory_blobs": len(self._memory)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store(config: Optional[Any] = None) -> Optional[BlobStore]:
+    """Return the process-wide blob store, or None if the compact state is disabled in the agent config."""
+    global _blob_store
+    if config is not None and not config.compact_state:
+        return None
+    if _blob_store is None:
+        if config is None:
+            return None
+        _blob_store = BlobStore(config.blob_store_path, memory_bytes=config.blob_store_memory_bytes, ttl=config.blob_store_ttl)
+    return _blob_store
+
+
+def close_blob_store():
+    """Close the process-wide blob store."""
+    global _blob_store
+    if _blob_store is not None:
+        _blob_store.close()
+        _blob_store = None
@@ -0,0 +1,238 @@
+import asyncio
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from langchain_core.callbacks import AsyncCallbackManager
+from langchain_core.load import dumpd
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, convert_to_messages, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, LLMResult
+from pydantic import BaseModel
+
+
+class CassetteMismatchError(Exception):
+    """Raised in replay mode when a request was not recorded in the cassette."""
+
+
+class ReplayedError(Exception):
+    """An exception recorded in the cassette, raised again in replay mode."""
+
+
+def request_key(boundary: str, request: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps({"boundary": boundary, **request}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def request_lines(request: Dict[str, Any]) -> List[str]:
+    """Lines of the request for diffs, with long text values such as prompts split into their own lines."""
+    lines = []
+    for name, value in sorted(request.items()):
+        if isinstance(value, str) and "\n" in value:
+            lines.append(f"{name}:")
+            lines.extend(f"  {line}" for line in value.splitlines())
+        else:
+            lines.append(f"{name}: {json.dumps(value, ensure_ascii=False, default=str)}")
+    return lines
+
+
+class Cassette:
+    """
+    Record/replay of the I/O boundaries of a research session: the LLM calls, the searches and the page fetches.
+
+    In record mode each interaction is appended to a JSONL file with its request, response and elapsed time.
+    In replay mode the responses are served from the file, matched by a hash of the request, after sleeping
+    the recorded time (latency "realistic") or immediately (latency "zero"). A request repeated more times than
+    it was recorded gets its last recorded response. A request never recorded raises CassetteMismatchError
+    showing the closest recorded request of the same boundary.
+    """
+    def __init__(self, path: str, mode: str = "replay", latency: str = "realistic"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}. Use 'record' or 'replay'")
+        if latency not in ("realistic", "zero"):
+            raise ValueError(f"Unknown cassette latency: {latency}. Use 'realistic' or 'zero'")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self.stats = {"recorded": 0, "replayed": 0, "repeated": 0, "mismatches": 0}
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+        else:
+            self._file = None
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        interaction = json.loads(line)
+                        self._interactions[interaction["key"]].append(interaction)
+
+    async def call(self, boundary: str, request: Dict[str, Any], fn: Callable[[], Awaitable[Any]],
+                   encode: Callable[[Any], Any] = lambda value: value,
+                   decode: Callable[[Any], Any] = lambda value: value) -> Any:
+        """
+        Run fn and record its result in record mode, or serve the recorded result in replay mode.
+        encode and decode convert the result to and from JSON-serializable data.
+        """
+        key = request_key(boundary, request)
+        if self.mode == "record":
+            start = time.perf_counter()
+            try:
+                result = await fn()
+            except Exception as e:
+                self._record(boundary, key, request, {"error": type(e).__name__, "message": str(e)}, time.perf_counter() - start)
+                raise
+            self._record(boundary, key, request, {"result": encode(result)}, time.perf_counter() - start)
+            return result
+
+        interaction = self._next_interaction(boundary, key, request)
+        if self.latency == "realistic":
+            await asyncio.sleep(interaction["elapsed"])
+        response = interaction["response"]
+        if "error" in response:
+            raise ReplayedError(f"{response['error']}: {response['message']}")
+        return decode(response["result"])
+
+    def _record(self, boundary: str, key: str, request: Dict[str, Any], response: Dict[str, Any], elapsed: float):
+        line = json.dumps(
+            {"boundary": boundary, "key": key, "request": request, "response": response, "elapsed": round(elapsed, 4)},
+            ensure_ascii=False, default=str,
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.stats["recorded"] += 1
+
+    def _next_interaction(self, boundary: str, key: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            recorded = self._interactions.get(key)
+            if not recorded:
+                self.stats["mismatches"] += 1
+                raise CassetteMismatchError(self._mismatch_message(boundary, request))
+            index = self._served[key]
+            self._served[key] += 1
+            if index >= len(recorded):
+                self.stats["repeated"] += 1
+                return recorded[-1]
+            self.stats["replayed"] += 1
+            return recorded[index]
+
+    def _mismatch_message(self, boundary: str, request: Dict[str, Any]) -> str:
+        wanted = request_lines(request)
+        candidates = [items[0]["request"] for items in self._interactions.values() if items[0]["boundary"] == boundary]
+        message = f"No {boundary} interaction recorded in {self.path} for request {json.dumps(request, ensure_ascii=False, default=str)[:300]}"
+        if not candidates:
+            return message + f". The cassette has no {boundary} interactions."
+
+        closest = max(candidates, key=lambda candidate: difflib.SequenceMatcher(None, request_lines(candidate), wanted).ratio())
+        diff = list(difflib.unified_diff(request_lines(closest), wanted, "recorded", "requested", lineterm="", n=1))
+        return message + "\nDiff against the closest recorded request:\n" + "\n".join(line[:200] for line in diff[:40])
+
+    def wrap_llm(self, llm: Optional[Any], llm_provider: str, llm_name: str) -> "CassetteChatModel":
+        """Wrap a chat model so its ainvoke calls go through the cassette. In replay mode llm may be None."""
+        return CassetteChatModel(self, llm, {"provider": llm_provider, "model": llm_name})
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def encode_llm_output(output: Any) -> Dict[str, Any]:
+    if isinstance(output, BaseMessage):
+        return {"type": "message", "data": message_to_dict(output)}
+    if isinstance(output, BaseModel):
+        return {"type": "pydantic", "data": output.model_dump()}
+    return {"type": "json", "data": output}
+
+
+def decode_llm_output(data: Dict[str, Any], schema: Optional[Any] = None) -> Any:
+    if data["type"] == "pydantic":
+        return schema.model_validate(data["data"])
+    if data["type"] == "message":
+        return messages_from_dict([data["data"]])[0]
+    return data["data"]
+
+
+class CassetteChatModel:
+    """Chat model proxy recording or replaying the ainvoke calls, plain or with structured output."""
+    def __init__(self, cassette: Cassette, llm: Optional[Any], request: Dict[str, Any], schema: Optional[Any] = None, bound: Optional[Any] = None):
+        self._cassette = cassette
+        self._llm = llm
+        self._request = request
+        self._schema = schema
+        self._bound = bound if bound is not None else llm
+
+    def with_structured_output(self, schema: Any, **kwargs) -> "CassetteChatModel":
+        bound = self._llm.with_structured_output(schema, **kwargs) if self._llm is not None else None
+        schema_name = schema.__name__ if isinstance(schema, type) else str(schema.get("title", schema))
+        return CassetteChatModel(self._cassette, self._llm, {**self._request, "schema": schema_name}, schema, bound)
+
+    def _decode(self, data: Dict[str, Any]) -> Any:
+        return decode_llm_output(data, self._schema)
+
+    async def ainvoke(self, input: Any, config: Optional[Any] = None, **kwargs) -> Any:
+        request = {**self._request, "input": input if isinstance(input, str) else dumpd(input)}
+        call = self._cassette.call(
+            "llm", request, lambda: self._bound.ainvoke(input, config, **kwargs),
+            encode=encode_llm_output, decode=self._decode,
+        )
+        if self._cassette.mode != "replay" or not (config or {}).get("callbacks"):
+            return await call
+        return await self._replay_with_callbacks(input, config, call)
+
+    async def _replay_with_callbacks(self, input: Any, config: Dict[str, Any], call: Awaitable[Any]) -> Any:
+        """Replay the call between the start and end callbacks a live chat model would fire, such as the LLM ledger's."""
+        manager = AsyncCallbackManager.configure(
+            config.get("callbacks"), inheritable_metadata=config.get("metadata"),
+            local_metadata={"ls_provider": self._request["provider"], "ls_model_name": self._request["model"]},
+        )
+        messages = [HumanMessage(content=input)] if isinstance(input, str) else convert_to_messages(input)
+        run_manager = (await manager.on_chat_model_start({"name": "CassetteChatModel"}, [messages]))[0]
+        try:
+            output = await call
+        except BaseException as e:
+            await run_manager.on_llm_error(e)
+            raise
+        message = output if isinstance(output, BaseMessage) else AIMessage(
+            content=json.dumps(encode_llm_output(output)["data"], ensure_ascii=False, default=str)
+        )
+        await run_manager.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+        return output
+
+    def __getattr__(self, name: str) -> Any:
+        if self._bound is None:
+            raise AttributeError(f"{name} is not available on a replayed chat model")
+        return getattr(self._bound, name)
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette(config: Optional[Any] = None) -> Optional[Cassette]:
+    """Return the process-wide cassette, or None if record/replay is off in the agent config."""
+    global _cassette
+    if config is not None and config.cassette_mode == "off":
+        return None
+    if _cassette is None:
+        if config is None:
+            return None
+        _cassette = Cassette(config.cassette_path, mode=config.cassette_mode, latency=config.cassette_latency)
+    return _cassette
+
+
+def close_cassette():
+    """Close the process-wide cassette, flushing a recording."""
+    global _cassette
+    if _cassette is not None:
+        _cassette.close()
+        _cassette = None
@@ -0,0 +1,296 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from langgraph.constants import TASKS
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer that stores the checkpoints and pending writes of each thread (a research run)
+    in SQLite, the serialized state compressed with zlib, so an interrupted run resumes after its last
+    finished node, even from another process.
+
+    The database calls are synchronous under a lock; the async methods run them in a worker thread,
+    so compressing and writing a large state does not stall the event loop. Threads not written for
+    ttl seconds (0 to keep them) are deleted when the database is opened.
+    """
+    def __init__(self, path: str, compression_level: int = 6, ttl: int = 0):
+        super().__init__()
+        self.path = path
+        self.compression_level = compression_level
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB NOT NULL,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            """
+        )
+        if ttl:
+            cutoff = time.time() - ttl
+            stale = "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?"
+            self._conn.execute(f"DELETE FROM writes WHERE thread_id IN ({stale})", (cutoff,))
+            self._conn.execute(f"DELETE FROM checkpoints WHERE thread_id IN ({stale})", (cutoff,))
+        self._conn.commit()
+        self.stats = {"checkpoints": 0, "writes": 0, "raw_bytes": 0, "stored_bytes": 0, "put_seconds": 0.0}
+
+    def _dump(self, value: Any) -> Tuple[str, bytes]:
+        kind, data = self.serde.dumps_typed(value)
+        compressed = zlib.compress(data, self.compression_level)
+        self.stats["raw_bytes"] += len(data)
+        self.stats["stored_bytes"] += len(compressed)
+        return kind, compressed
+
+    def _load(self, kind: str, data: bytes) -> Any:
+        return self.serde.loads_typed((kind, zlib.decompress(data)))
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, kind, checkpoint, metadata_type, metadata = row
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        sends = []
+        if parent_checkpoint_id:
+            sends = self._conn.execute(
+                "SELECT type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? "
+                "ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+
+        def config(checkpoint_id: str) -> RunnableConfig:
+            return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+        return CheckpointTuple(
+            config=config(checkpoint_id),
+            checkpoint={**self._load(kind, checkpoint), "pending_sends": [self._load(*send) for send in sends]},
+            metadata=self._load(metadata_type, metadata),
+            parent_config=config(parent_checkpoint_id) if parent_checkpoint_id else None,
+            pending_writes=[(task_id, channel, self._load(kind, value)) for task_id, channel, kind, value in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """The checkpoint of the config's checkpoint_id, or the latest one of its thread."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: Tuple = (thread_id, checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY checkpoint_id DESC LIMIT 1", params).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """The checkpoints of the config's thread (or of every thread), newest first."""
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+            "FROM checkpoints WHERE 1 = 1"
+        )
+        params: Tuple = ()
+        if config is not None:
+            query += " AND thread_id = ?"
+            params += (config["configurable"]["thread_id"],)
+            if config["configurable"].get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params += (config["configurable"]["checkpoint_ns"],)
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params += (checkpoint_id,)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params += (before_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY checkpoint_id DESC", params).fetchall()
+            tuples = []
+            for thread_id, checkpoint_ns, *row in rows:
+                checkpoint_tuple = self._tuple(thread_id, checkpoint_ns, tuple(row))
+                if filter and not all(checkpoint_tuple.metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                tuples.append(checkpoint_tuple)
+                if limit is not None and len(tuples) >= limit:
+                    break
+        yield from tuples
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        start = time.perf_counter()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        state = {key: value for key, value in checkpoint.items() if key != "pending_sends"}
+        with self._lock:
+            kind, data = self._dump(state)
+            metadata_type, metadata_data = self._dump(metadata)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                    kind, data, metadata_type, metadata_data, time.time(),
+                ),
+            )
+            self._conn.commit()
+            self.stats["checkpoints"] += 1
+            self.stats["put_seconds"] += time.perf_counter() - start
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        start = time.perf_counter()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            rows = []
+            for index, (channel, value) in enumerate(writes):
+                kind, data = self._dump(value)
+                rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, index), channel, kind, data, task_path))
+            # The special writes (errors, interrupts) replace the previous ones, the others are written once per task
+            self._conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [row for row in rows if row[4] < 0])
+            self._conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [row for row in rows if row[4] >= 0])
+            self._conn.commit()
+            self.stats["writes"] += len(rows)
+            self.stats["put_seconds"] += time.perf_counter() - start
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    def prune(self, thread_id: str):
+        """Keep only the latest checkpoint of a finished thread, its final state."""
+        with self._lock:
+            latest = self._conn.execute(
+                "SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ''", (thread_id,)
+            ).fetchone()[0]
+            if latest is None:
+                return
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id != ?", (thread_id, latest))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("UPDATE checkpoints SET parent_checkpoint_id = NULL WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def delete_threads(self, prefix: str) -> int:
+        """Delete the threads whose ID starts with prefix, e.g. every company of a batch, and return how many there were."""
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            count = self._conn.execute(
+                "SELECT COUNT(DISTINCT thread_id) FROM checkpoints WHERE thread_id LIKE ? ESCAPE '\\'", (pattern,)
+            ).fetchone()[0]
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id LIKE ? ESCAPE '\\'", (pattern,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id LIKE ? ESCAPE '\\'", (pattern,))
+            self._conn.commit()
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Checkpoints and writes stored by this process, their serialized and compressed bytes and the time spent storing them."""
+        with self._lock:
+            return {
+                **self.stats,
+                "put_seconds": round(self.stats["put_seconds"], 4),
+                "compression_ratio": round(self.stats["raw_bytes"] / max(self.stats["stored_bytes"], 1), 2),
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_checkpointer: Optional[SQLiteCheckpointSaver] = None
+
+
+def get_checkpointer(config: Optional[Any] = None) -> Optional[SQLiteCheckpointSaver]:
+    """Return the process-wide checkpointer, or None if checkpointing is disabled in the agent config."""
+    global _checkpointer
+    if config is not None and not config.checkpoint_enabled:
+        return None
+    if _checkpointer is None:
+        if config is None:
+            return None
+        _checkpointer = SQLiteCheckpointSaver(
+            config.checkpoint_path, compression_level=config.checkpoint_compression_level, ttl=config.checkpoint_ttl,
+        )
+    return _checkpointer
+
+
+def close_checkpointer():
+    """Close the process-wide checkpointer."""
+    global _checkpointer
+    if _checkpointer is not None:
+        _checkpointer.close()
+        _checkpointer = None
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ParseExecutor:
+    """
+    Runs CPU-bound work (decoding, HTML parsing, text cleaning) off the event loop.
+
+    Kinds:
+    - "process": process pool, workers are recycled after max_tasks_per_child tasks.
+    - "thread": thread pool, lighter but limited by the GIL.
+    - "inline": runs the work on the event loop, as before.
+
+    At most max_queue_depth tasks are submitted at once, the rest wait on the event loop.
+    """
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: Optional[int] = None,
+        max_queue_depth: int = 32,
+        max_tasks_per_child: Optional[int] = 200,
+    ):
+        if kind not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown executor kind: {kind}. Use 'process', 'thread' or 'inline'")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats: Dict[str, Any] = {"tasks": 0, "failures": 0, "pool_restarts": 0, "max_queue_depth": 0, "task_seconds": 0.0}
+        self._in_flight = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # With max_tasks_per_child the pool uses the spawn start method
+                self._executor = ProcessPoolExecutor(self.max_workers, max_tasks_per_child=self.max_tasks_per_child)
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="parse")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            # A semaphore is bound to the loop it is first used in
+            self._semaphore = asyncio.Semaphore(self.max_queue_depth)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in the executor. With a process pool, fn and its arguments must be picklable."""
+        if self.kind == "inline":
+            return fn(*args)
+
+        async with self._get_semaphore():
+            self._in_flight += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._in_flight)
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                executor = self._get_executor()
+                try:
+                    return await loop.run_in_executor(executor, fn, *args)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory), which fails every task in flight at once:
+                    # only the first of them replaces the broken pool, and all retry once on the current pool
+                    if self._executor is executor:
+                        self.stats["pool_restarts"] += 1
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        self._executor = None
+                    return await loop.run_in_executor(self._get_executor(), fn, *args)
+            except Exception:
+                self.stats["failures"] += 1
+                raise
+            finally:
+                self._in_flight -= 1
+                self.stats["tasks"] += 1
+                self.stats["task_seconds"] += time.perf_counter() - start
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "workers": self.max_workers, "in_flight": self._in_flight, **self.stats}
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a task sleeping for a fixed interval.
+    A responsive loop has a lag close to zero, blocking work on the loop shows up as lag spikes.
+    """
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self._sleep_start: Optional[float] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._sleep_start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - self._sleep_start - self.interval))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Count the sleep in progress, the loop may have been blocked for its whole duration
+            overdue = asyncio.get_running_loop().time() - self._sleep_start - self.interval
+            if overdue > 0:
+                self.samples.append(overdue)
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return the mean, p95 and max lag in milliseconds."""
+        if not self.samples:
+            return {"samples": 0, "mean_lag_ms": 0.0, "p95_lag_ms": 0.0, "max_lag_ms": 0.0}
+        ordered = sorted(self.samples)
+        return {
+            "samples": len(ordered),
+            "mean_lag_ms": 1000 * sum(ordered) / len(ordered),
+            "p95_lag_ms": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+            "max_lag_ms": 1000 * ordered[-1],
+        }
+
+
+_parse_executor: Optional[ParseExecutor] = None
+
+
+def get_parse_executor(config: Optional[Any] = None) -> ParseExecutor:
+    """Return the process-wide parse executor, configuring it from the agent config on first use."""
+    global _parse_executor
+    if _parse_executor is None:
+        if config is None:
+            _parse_executor = ParseExecutor()
+        else:
+            _parse_executor = ParseExecutor(
+                kind=config.parse_executor,
+                max_workers=config.parse_workers or None,
+                max_queue_depth=config.parse_queue_depth,
+                max_tasks_per_child=config.parse_max_tasks_per_child or None,
+            )
+    return _parse_executor
+
+
+def shutdown_parse_executor():
+    """Shut down the process-wide parse executor and its workers."""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown()
+        _parse_executor = None
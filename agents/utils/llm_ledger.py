@@ -0,0 +1,191 @@
+import contextvars
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage, get_buffer_string
+from langchain_core.outputs import LLMResult
+from agents.tools.passage_ranker import estimate_tokens
+
+
+def usage_from_result(response: LLMResult) -> Optional[Tuple[int, int]]:
+    """Prompt and completion tokens reported by the provider, if any."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage.get("prompt_tokens") is not None:
+        return int(usage["prompt_tokens"]), int(usage.get("completion_tokens") or 0)
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                return int(metadata["input_tokens"]), int(metadata["output_tokens"])
+    return None
+
+
+def completion_text(response: LLMResult) -> str:
+    """Text of the generations, with the arguments of the tool calls of structured outputs."""
+    parts = []
+    for generations in response.generations:
+        for generation in generations:
+            parts.append(generation.text)
+            message = getattr(generation, "message", None)
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                parts.append(json.dumps(tool_call.get("args"), ensure_ascii=False, default=str))
+    return "".join(parts)
+
+
+class LLMLedger(AsyncCallbackHandler):
+    """
+    LangChain callback handler that records every LLM call of a research run: node, company, URL,
+    model and cascade tier, prompt and completion tokens, latency, retries and cache status.
+
+    The node, URL, tier and escalation reason come from the metadata of the call (LLMInterface.ainvoke sets them). Calls served
+    by the LLM caches are recorded with record_cache_hit. A call that repeats the prompt of an earlier
+    successful call of the same node counts as a duplicate, and the failed attempts before a success
+    count as its retries. When the provider reports no usage, the tokens are estimated from the text.
+    """
+    def __init__(self, run_id: Optional[str] = None, company: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.company = company
+        self.records: List[Dict[str, Any]] = []
+        self._pending: Dict[UUID, Dict[str, Any]] = {}
+        self._failures: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._seen: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def _record(self, node: str, prompt_hash: Optional[str], **fields):
+        duplicate = False
+        if prompt_hash is not None and fields.get("error") is None:
+            self._seen[(node, prompt_hash)] += 1
+            # An escalation repeats the prompt of the small tier on purpose
+            duplicate = self._seen[(node, prompt_hash)] > 1 and fields.get("escalation") is None
+        self.records.append({
+            "run_id": self.run_id, "company": self.company, "node": node, "url": None, "model": None,
+            "tier": None, "escalation": None, "cache": "miss", "prompt_tokens": 0, "completion_tokens": 0,
+            "estimated_tokens": False, "latency": 0.0, "retries": 0, "duplicate": duplicate, "error": None,
+            "prompt_hash": prompt_hash,
+            "timestamp": time.time(), **fields,
+        })
+
+    def _start(self, run_id: UUID, prompt: str, metadata: Optional[Dict[str, Any]]):
+        metadata = metadata or {}
+        self._pending[run_id] = {
+            "node": metadata.get("node", "unknown"),
+            "url": metadata.get("url"),
+            "model": metadata.get("ls_model_name"),
+            "tier": metadata.get("tier"),
+            "escalation": metadata.get("escalation"),
+            "prompt": prompt,
+            "prompt_hash": hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16],
+            "started": time.perf_counter(),
+        }
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[BaseMessage]], *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        self._start(run_id, "\n".join(get_buffer_string(batch) for batch in messages), metadata)
+
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        self._start(run_id, "\n".join(prompts), metadata)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        call = self._pending.pop(run_id, None)
+        if call is None:
+            return
+        key = (call["node"], call["prompt_hash"])
+        usage = usage_from_result(response)
+        estimated = usage is None
+        if estimated:
+            usage = (estimate_tokens(call["prompt"]), estimate_tokens(completion_text(response)))
+        self._record(
+            call["node"], call["prompt_hash"], url=call["url"], model=call["model"],
+            tier=call["tier"], escalation=call["escalation"],
+            prompt_tokens=usage[0], completion_tokens=usage[1], estimated_tokens=estimated,
+            latency=time.perf_counter() - call["started"], retries=self._failures.pop(key, 0),
+        )
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        call = self._pending.pop(run_id, None)
+        if call is None:
+            return
+        self._failures[(call["node"], call["prompt_hash"])] += 1
+        self._record(
+            call["node"], call["prompt_hash"], url=call["url"], model=call["model"],
+            tier=call["tier"], escalation=call["escalation"],
+            latency=time.perf_counter() - call["started"], error=f"{type(error).__name__}: {error}"[:300],
+        )
+
+    def record_cache_hit(self, node: str, cache: str, model: Optional[str] = None, url: Optional[str] = None,
+                         tier: Optional[str] = None, escalation: Optional[str] = None):
+        """Record a call answered by an LLM cache ("exact" or "semantic") without calling the model."""
+        self._record(node, None, cache=cache, model=model, url=url, tier=tier, escalation=escalation)
+
+    def summary(self, prices: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Any]:
+        return summarize_records(self.records, prices)
+
+    def export_jsonl(self, path: str):
+        export_jsonl(self.records, path)
+
+
+def summarize_records(records: Iterable[Dict[str, Any]], prices: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Any]:
+    """
+    Per-node, per-tier and total counters of the records: calls, model calls, cache hits, escalations,
+    duplicates, retries, errors, prompt and completion tokens and latency of the model calls.
+    With prices (USD per million input and output tokens, by model), the cost of the model calls too.
+    """
+    def counters():
+        return {
+            "calls": 0, "llm_calls": 0, "cache_hits": 0, "escalations": 0, "duplicates": 0, "retries": 0, "errors": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "latency": 0.0, "cost": 0.0,
+        }
+
+    nodes: Dict[str, Dict[str, Any]] = defaultdict(counters)
+    tiers: Dict[str, Dict[str, Any]] = defaultdict(counters)
+    total = counters()
+    runs = set()
+    for record in records:
+        runs.add(record["run_id"])
+        price = (prices or {}).get(record.get("model") or "", {})
+        for stats in (nodes[record["node"]], tiers[record.get("tier") or "default"], total):
+            stats["calls"] += 1
+            stats["escalations"] += record.get("escalation") is not None and record["error"] is None
+            if record["cache"] != "miss":
+                stats["cache_hits"] += 1
+                continue
+            if record["error"] is not None:
+                stats["errors"] += 1
+            else:
+                stats["llm_calls"] += 1
+            stats["duplicates"] += record["duplicate"]
+            stats["retries"] += record["retries"]
+            stats["prompt_tokens"] += record["prompt_tokens"]
+            stats["completion_tokens"] += record["completion_tokens"]
+            stats["latency"] += record["latency"]
+            stats["cost"] += (record["prompt_tokens"] * price.get("input", 0.0) + record["completion_tokens"] * price.get("output", 0.0)) / 1e6
+    return {"runs": len(runs), "nodes": dict(nodes), "tiers": dict(tiers), "total": total}
+
+
+def export_jsonl(records: Iterable[Dict[str, Any]], path: str):
+    """Append the records to a JSONL file, one call per line."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+_current_ledger: contextvars.ContextVar[Optional[LLMLedger]] = contextvars.ContextVar("llm_ledger", default=None)
+
+
+def get_current_ledger() -> Optional[LLMLedger]:
+    """Return the ledger of the research run in progress in this context, if any."""
+    return _current_ledger.get()
+
+
+def set_current_ledger(ledger: Optional[LLMLedger]) -> contextvars.Token:
+    """Make the ledger record the LLM calls made in this context and the tasks it starts."""
+    return _current_ledger.set(ledger)
+
+
+def reset_current_ledger(token: contextvars.Token):
+    _current_ledger.reset(token)
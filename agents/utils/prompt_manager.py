@@ -1,28 +1,181 @@
 import json
-from typing import Dict
+import os
+import string
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Segment = Tuple[str, Optional[str], Optional[str], str]
+
+
+class PromptTemplate:
+    """
+    Prompt compiled once into its literal and field segments, rendered by joining them.
+
+    Only named fields are allowed ({topic}, {content!r}, {score:.2f}); positional, attribute and index fields
+    are rejected when the template is compiled. The literal text before the first field is the static prefix,
+    identical across renders, which is what the providers' prompt caching matches on.
+    """
+    def __init__(self, text: str, name: str = "prompt"):
+        self.text = text
+        self.name = name
+        self.segments: List[Segment] = []
+        try:
+            parsed = list(string.Formatter().parse(text))
+        except ValueError as e:
+            raise ValueError(f"Invalid prompt template {name}: {e}") from e
+        for literal, field, spec, conversion in parsed:
+            if field is not None and (not field.isidentifier() or "{" in (spec or "")):
+                raise ValueError(f"Invalid prompt template {name}: only named fields are allowed, got {{{field}}}")
+            self.segments.append((literal, field, conversion, spec or ""))
+        self.fields = {field for _, field, _, _ in self.segments if field is not None}
+        self.static_prefix = self.segments[0][0] if self.segments else ""
+
+    def render(self, **values: Any) -> str:
+        """Same result as str.format(**values) on the template text."""
+        parts = []
+        for literal, field, conversion, spec in self.segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            try:
+                value = values[field]
+            except KeyError:
+                raise KeyError(f"Missing field {field} of prompt {self.name}") from None
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            parts.append(value if not spec and isinstance(value, str) else format(value, spec))
+        return "".join(parts)
+
+
+class PromptEntry:
+    def __init__(self, value: Any, mtime_ns: int, size: int):
+        self.value = value
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.checked = time.monotonic()
+
+
+class PromptRegistry:
+    """
+    Process-wide registry of the prompt files, each read, validated and compiled once.
+
+    With hot_reload, the modification time of a file is checked at most every reload_interval seconds
+    and the file is compiled again when it changed. A file that no longer compiles, or was removed,
+    keeps its last valid version. Loads happen under a lock, so the registry can be shared by threads.
+    """
+    def __init__(self, hot_reload: bool = False, reload_interval: float = 2.0):
+        self.hot_reload = hot_reload
+        self.reload_interval = reload_interval
+        self._entries: Dict[str, PromptEntry] = {}
+        self._lock = threading.Lock()
+        self.stats = {"file_reads": 0, "stat_checks": 0, "reloads": 0, "reload_errors": 0, "renders": 0, "render_time": 0.0}
+
+    def _read(self, path: str, parse: Callable[[str], Any]) -> PromptEntry:
+        with open(path, "r", encoding="utf-8") as file:
+            stat = os.fstat(file.fileno())
+            text = file.read()
+        self.stats["file_reads"] += 1
+        return PromptEntry(parse(text), stat.st_mtime_ns, stat.st_size)
+
+    def _get(self, path: str, parse: Callable[[str], Any]) -> Any:
+        path = os.path.abspath(path)
+        entry = self._entries.get(path)
+        if entry is not None and (not self.hot_reload or time.monotonic() - entry.checked < self.reload_interval):
+            return entry.value
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                entry = self._entries[path] = self._read(path, parse)
+                return entry.value
+            if not self.hot_reload or time.monotonic() - entry.checked < self.reload_interval:
+                return entry.value
+            entry.checked = time.monotonic()
+            self.stats["stat_checks"] += 1
+            try:
+                stat = os.stat(path)
+                if (stat.st_mtime_ns, stat.st_size) != (entry.mtime_ns, entry.size):
+                    entry = self._entries[path] = self._read(path, parse)
+                    self.stats["reloads"] += 1
+            except (OSError, ValueError) as e:
+                self.stats["reload_errors"] += 1
+                print(f"Keeping the previous version of {path}: {e}")
+            return entry.value
+
+    def get_template(self, path: str) -> PromptTemplate:
+        """Return the compiled template of the prompt file."""
+        return self._get(path, lambda text: PromptTemplate(text, os.path.basename(path)))
+
+    def get_json(self, path: str) -> Any:
+        """Return the parsed content of a JSON prompt file, e.g. the examples."""
+        return self._get(path, json.loads)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "render_time": round(self.stats["render_time"], 6), "files": len(self._entries)}
+
+
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry(config: Optional[Any] = None) -> PromptRegistry:
+    """Return the process-wide prompt registry, created with the hot reload settings of the first config."""
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry(
+            hot_reload=getattr(config, "prompt_hot_reload", False),
+            reload_interval=getattr(config, "prompt_reload_interval", 2.0),
+        )
+    return _prompt_registry
+
+
+def set_prompt_registry(registry: Optional[PromptRegistry]):
+    """Replace the process-wide prompt registry, e.g. with a fresh one in benchmarks."""
+    global _prompt_registry
+    _prompt_registry = registry
+
 
 class PromptManager:
     def __init__(self, config):
         self.config = config
-        self.prompts_data = self.load_prompts()
+        self.registry = get_prompt_registry(config)
 
-    def load_prompts(self) -> Dict[str, str]:
+    def load_prompts(self) -> Dict[str, Any]:
         """
         Create and return a dictionary where:
         - The key is the name of the prompt (e.g. "examples", "is_sql_prompt"...)
         - The value is the content of the file.
         """
-        prompts = {}
-        for prompt_name, prompt_path in self.config.prompt_paths.items():
-            with open(prompt_path, 'r', encoding='utf-8') as file:
-                if prompt_name == "examples":
-                    prompts[prompt_name] = json.load(file)
-                else:
-                    prompts[prompt_name] = file.read()
-        return prompts
-
-    def get_prompt(self, prompt_name) -> str:
-        if prompt_name in self.prompts_data:
-            return self.prompts_data[prompt_name]
-        else:
+        return {prompt_name: self.get_prompt(prompt_name) for prompt_name in self.config.prompt_paths}
+
+    @property
+    def prompts_data(self) -> Dict[str, Any]:
+        return self.load_prompts()
+
+    def get_template(self, prompt_name) -> Optional[PromptTemplate]:
+        prompt_path = self.config.prompt_paths.get(prompt_name)
+        if prompt_path is None:
             return None
+        return self.registry.get_template(prompt_path)
+
+    def get_prompt(self, prompt_name) -> Any:
+        prompt_path = self.config.prompt_paths.get(prompt_name)
+        if prompt_path is None:
+            return None
+        if prompt_name == "examples":
+            return self.registry.get_json(prompt_path)
+        return self.registry.get_template(prompt_path).text
+
+    def render(self, prompt_name, **values) -> str:
+        """Render the prompt with the values of its fields."""
+        template = self.get_template(prompt_name)
+        if template is None:
+            raise KeyError(f"Unknown prompt {prompt_name}")
+        start = time.perf_counter()
+        prompt = template.render(**values)
+        self.registry.stats["renders"] += 1
+        self.registry.stats["render_time"] += time.perf_counter() - start
+        return prompt
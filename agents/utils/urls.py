@@ -0,0 +1,55 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "cmpid", "ocid", "smid", "sr_share",
+})
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _normalize_url(url: str, dedup: bool) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if dedup:
+        host = host.rstrip(".")
+        if host.startswith("www."):
+            host = host[4:]
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal, hostname drops its brackets
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    userinfo, at, _ = parts.netloc.rpartition("@")
+    netloc = f"{userinfo}{at}{host}"
+    path = parts.path or "/"
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if dedup:
+        params = [(name, value) for name, value in params if not is_tracking_param(name)]
+    query = urlencode(sorted(params))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Return a canonical form of the URL so that equivalent URLs share the same key, e.g. in the fetch cache:
+    - Lowercase scheme and host, and remove the default port. User info and IPv6 brackets are kept.
+    - Remove the fragment.
+    - Sort the query parameters.
+    """
+    return _normalize_url(url, dedup=False)
+
+
+def dedup_url_key(url: str) -> str:
+    """
+    Return the key under which the URLs found in a run are deduplicated: the canonical URL, also without
+    a leading "www.", a trailing dot of the host or the tracking parameters (utm_*, gclid, fbclid, ref...).
+    It may merge URLs whose content differs (e.g. GitHub ?ref=<branch>), so it is not a cache key.
+    """
+    return _normalize_url(url, dedup=True)
@@ -1,13 +1,46 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api.routes.agent import router as agent_router
+from agents.research_agent.agent_config import AgentConfig
+from agents.tools.http_client import get_fetcher, close_fetcher
+from agents.tools.fetch_cache import close_fetch_cache
+from agents.tools.search_cache import close_search_cache
+from agents.utils.cassette import close_cassette
+from agents.utils.checkpoint import close_checkpointer
+from agents.utils.blob_store import close_blob_store
+from agents.tools.fetch_scheduler import reset_fetch_scheduler
+from agents.utils.executor import shutdown_parse_executor
+from interfaces.llm_registry import close_llm_registry
+from interfaces.llm_cache import close_llm_cache
+from interfaces.semantic_cache import close_semantic_cache
+from api.routes.agent import router as agent_router, research
 from api.routes.auth import router as auht_router
 from fastapi.middleware.cors import CORSMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared HTTP session on startup, and release the shared resources on shutdown."""
+    # Configured from the same YAML as the research runs, which then reuse this fetcher
+    await get_fetcher(AgentConfig.from_runnable_config(research.get_runnable_config())).get_session()
+    yield
+    await close_fetcher()
+    reset_fetch_scheduler()
+    close_fetch_cache()
+    close_search_cache()
+    close_cassette()
+    close_llm_cache()
+    close_checkpointer()
+    close_blob_store()
+    close_semantic_cache()
+    shutdown_parse_executor()
+    await close_llm_registry()
+
+
 app = FastAPI(
     title="Agent API",
     description="API to interact with the Agent.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 app.add_middleware(
     CORSMiddleware,
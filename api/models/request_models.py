@@ -6,3 +6,8 @@ class InitAgentRequest(BaseModel):
 
 class AskAgentRequest(BaseModel):
     question: str
+
+class ResearchRequest(BaseModel):
+    topic: str
+    # With checkpointing, the run to resume, e.g. the thread_id of the checkpoint event of an interrupted stream
+    thread_id: Optional[str] = None
@@ -2,14 +2,17 @@ import sys
 import os
 import re
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from fastapi import APIRouter, HTTPException, Depends
-from api.models.request_models import AskAgentRequest
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from api.models.request_models import AskAgentRequest, ResearchRequest
 from api.models.response_models import AgentResponse, QuestionResponse
 from api.services.agent_service import Agent
+from api.services.research_service import ResearchService
 from api.middleware.security import get_current_user
 # Change agent_name with your specific agent 
 router = APIRouter(prefix="/agent_name")
 agent = Agent()
+research = ResearchService()
 
 @router.get("/")
 async def root():
@@ -40,3 +43,18 @@ async def ask_agent(request: AskAgentRequest, current_user=Depends(get_current_u
             }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/research/stream")
+async def research_stream(request: ResearchRequest, http_request: Request, current_user=Depends(get_current_user)):
+    """
+    Investiga un tema y envía el progreso como server-sent events: inicio y fin de cada nodo,
+    las notas de cada URL en cuanto se extraen, los tokens de la síntesis y el resultado final.
+    """
+    if not request.topic:
+        raise HTTPException(status_code=400, detail="El tema no puede estar vacío.")
+    return StreamingResponse(
+        research.stream(request.topic, http_request, request.thread_id),
+        media_type="text/event-stream",
+        # No caching or proxy buffering, so each event reaches the client when it is sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
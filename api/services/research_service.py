@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import yaml
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+from fastapi import Request
+from langchain_core.runnables import RunnableConfig
+from agents.research_agent.agent import ResearcherAgent
+from agents.research_agent.progress import stream_sse
+from agents.research_agent.state import State
+
+
+class ResearchService:
+    """Runs the research agent and streams its progress to the client as server-sent events."""
+    def __init__(self, keepalive: float = 15.0):
+        self.keepalive = keepalive
+        self.runnable_config = None
+
+    def get_runnable_config(self) -> RunnableConfig:
+        if self.runnable_config is None:
+            config_path = os.getenv("AGENT_CONFIG_PATH") or "config/research_agent_config.yaml"
+            with open(config_path, "r") as file:
+                self.runnable_config = RunnableConfig(configurable=yaml.safe_load(file))
+        return self.runnable_config
+
+    async def stream(self, topic: str, request: Request, thread_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Server-sent events of a research run on the topic. Each request gets its own agent, which keeps the
+        state of its run; the HTTP pool, caches and model clients are shared and released on shutdown.
+        The run is cancelled as soon as the client disconnects. With checkpointing, the run of thread_id
+        resumes where it stopped; without it, a new run starts and its checkpoint event gives its thread_id.
+        """
+        agent = ResearcherAgent()
+        events = stream_sse(agent.astream(State(topic=topic), self.get_runnable_config(), thread_id=thread_id), self.keepalive)
+        async with aclosing(events):
+            async for chunk in events:
+                if await request.is_disconnected():
+                    break
+                yield chunk
@@ -0,0 +1,50 @@
+"""Benchmark of a batch of companies, one at a time vs the concurrent batch runner.
+
+The synthetic session of benchmarks/session.py is replayed with its recorded latencies (recorded first if the
+cassette does not exist), by a BatchRunner with concurrency 1, like the former loop of agents/main.py, and
+with --concurrency companies at once.
+
+Run from the repository root:
+    python benchmarks/bench_batch_runner.py [--companies 6] [--concurrency 4] [--record]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+from langchain_core.runnables import RunnableConfig
+from agents.research_agent.batch import BatchRunner
+from agents.tools.page_dedup import reset_fingerprint_store
+from agents.tools.search_backends import set_search_backend
+from benchmarks.session import CASSETTE_PATH, COMPANIES, record_session, session_config
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=len(COMPANIES))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(CASSETTE_PATH):
+        seconds, stats = await record_session(CASSETTE_PATH)
+        print(f"Recorded session: {seconds:6.2f} s, {stats['recorded']} interactions")
+
+    config = RunnableConfig(configurable=session_config(cassette_mode="replay", cassette_path=CASSETTE_PATH))
+    companies = COMPANIES[:args.companies]
+    summaries = {}
+    for concurrency in (1, args.concurrency):
+        reset_fingerprint_store()
+        runner = BatchRunner(config, concurrency=concurrency)
+        report = await runner.run(companies)
+        await runner.agent.aclose()
+        summaries[concurrency] = (report.summary(), report.llm)
+    set_search_backend(None)
+
+    print(f"{len(companies)} companies, replayed with recorded latencies")
+    for concurrency, (summary, llm) in summaries.items():
+        print(f"Concurrency {concurrency}: {summary}, {llm['llm_calls']} LLM calls")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
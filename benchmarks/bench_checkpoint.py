@@ -0,0 +1,100 @@
+"""Benchmark of durable checkpointing: its overhead per run and the work saved by resuming an interrupted run.
+
+The synthetic session of benchmarks/session.py is replayed with its recorded latencies (recorded first if the
+cassette does not exist), without and with the SQLite checkpointer, in a temporary database. Then one company
+is interrupted after --interrupt-after seconds and run again with the same thread ID, which resumes after the
+last finished node instead of starting over.
+
+Run from the repository root:
+    python benchmarks/bench_checkpoint.py [--companies 6] [--interrupt-after 10] [--record]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import tempfile
+import time
+from langchain_core.runnables import RunnableConfig
+from agents.research_agent.agent import ResearcherAgent
+from agents.research_agent.state import State
+from agents.tools.page_dedup import reset_fingerprint_store
+from agents.tools.search_backends import set_search_backend
+from benchmarks.session import CASSETTE_PATH, COMPANIES, record_session, session_config
+
+
+async def run_companies(config, companies):
+    """Research the companies one after the other and return the elapsed seconds and the checkpoint stats."""
+    reset_fingerprint_store()
+    agent = ResearcherAgent()
+    start = time.perf_counter()
+    for company in companies:
+        await agent.run(State(topic=f"{company} info"), RunnableConfig(configurable=config))
+    elapsed = time.perf_counter() - start
+    await agent.aclose()
+    set_search_backend(None)
+    return elapsed, agent.checkpoint_stats
+
+
+async def resume_demo(config, company: str, interrupt_after: float):
+    """LLM calls and seconds of a full run, and of an interrupted run plus its resumption."""
+    runnable_config = RunnableConfig(configurable=config)
+    agent = ResearcherAgent()
+    reset_fingerprint_store()
+    start = time.perf_counter()
+    full = await agent.run(State(topic=f"{company} info"), runnable_config, thread_id="full")
+    full_seconds = time.perf_counter() - start
+
+    reset_fingerprint_store()
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(agent.run(State(topic=f"{company} info"), runnable_config, thread_id="resumed"), interrupt_after)
+    except asyncio.TimeoutError:
+        pass
+    interrupted_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    resumed = await agent.run(State(topic=f"{company} info"), runnable_config, thread_id="resumed")
+    resumed_seconds = time.perf_counter() - start
+    await agent.aclose()
+    set_search_backend(None)
+    return {
+        "full": {"seconds": round(full_seconds, 2), "llm_calls": full["llm_ledger"]["total"]["llm_calls"]},
+        "interrupted_seconds": round(interrupted_seconds, 2),
+        "resumed": {
+            "seconds": round(resumed_seconds, 2),
+            "llm_calls": resumed["llm_ledger"]["total"]["llm_calls"],
+            "resumed_at": resumed["checkpoint"]["resumed_at"],
+        },
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=len(COMPANIES))
+    parser.add_argument("--interrupt-after", type=float, default=10.0)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(CASSETTE_PATH):
+        seconds, stats = await record_session(CASSETTE_PATH)
+        print(f"Recorded session: {seconds:6.2f} s, {stats['recorded']} interactions")
+
+    companies = COMPANIES[:args.companies]
+    with tempfile.TemporaryDirectory() as directory:
+        overrides = dict(cassette_mode="replay", cassette_path=CASSETTE_PATH, checkpoint_path=os.path.join(directory, "checkpoints.sqlite"))
+        off_seconds, _ = await run_companies(session_config(**overrides), companies)
+        on_seconds, stats = await run_companies(session_config(checkpoint_enabled=True, **overrides), companies)
+        database_bytes = os.path.getsize(overrides["checkpoint_path"])
+
+        overrides["checkpoint_path"] = os.path.join(directory, "resume.sqlite")
+        demo = await resume_demo(session_config(checkpoint_enabled=True, **overrides), companies[0], args.interrupt_after)
+
+    print(f"{len(companies)} companies, replayed with recorded latencies")
+    print(f"Checkpoints off: {off_seconds:6.2f} s")
+    print(f"Checkpoints on:  {on_seconds:6.2f} s, {stats['put_seconds'] * 1000 / max(stats['checkpoints'], 1):.2f} ms per checkpoint")
+    print(f"Stored: {stats}, database {database_bytes / 1024:.1f} KiB after pruning")
+    print(f"Resume of {companies[0]} interrupted after {args.interrupt_after} s: {demo}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""Benchmark of the graph state size per loop, with the full state vs the compact state.
+
+The synthetic session of benchmarks/session.py is replayed with its recorded latencies (recorded first if the
+cassette does not exist), with compact_state off and on, checkpointing every node in a temporary database.
+After every node, the state is serialized with the LangGraph serializer, as each checkpoint does; the size
+and serialization time of the state at the end of each loop are averaged over the companies.
+
+Run from the repository root:
+    python benchmarks/bench_compact_state.py [--companies 6] [--record]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from agents.research_agent.agent import ResearcherAgent
+from agents.research_agent.state import State
+from agents.tools.page_dedup import reset_fingerprint_store
+from agents.tools.search_backends import set_search_backend
+from agents.utils.blob_store import get_blob_store
+from agents.utils.checkpoint import get_checkpointer
+from agents.utils.llm_ledger import set_current_ledger
+from benchmarks.session import CASSETTE_PATH, COMPANIES, record_session, session_config
+
+
+async def measure(config, companies):
+    """State bytes and serialization ms at the end of each loop, per company, and the checkpoint stats."""
+    serde = JsonPlusSerializer()
+    per_loop = defaultdict(list)
+    reset_fingerprint_store()
+    agent = ResearcherAgent()
+    for company in companies:
+        state = State(topic=f"{company} info")
+        graph, run = agent.prepare_run(state, RunnableConfig(configurable=config))
+        graph, graph_input, run_config, _, _ = await agent.resume_point(graph, run, state, None)
+        ledger_token = set_current_ledger(run.ledger)
+        loops = {}
+        try:
+            async for values in graph.astream(graph_input, run_config, stream_mode="values"):
+                start = time.perf_counter()
+                _, data = serde.dumps_typed(values)
+                # The last state of each loop is the largest one, it holds every note extracted so far
+                loops[values.get("loop_count", 0)] = (len(data), (time.perf_counter() - start) * 1000)
+        finally:
+            agent.close_ledger(run, ledger_token)
+        for loop, sample in loops.items():
+            per_loop[loop].append(sample)
+    checkpoint_stats = get_checkpointer(run.config).get_stats()
+    blob_store = get_blob_store(run.config)
+    blob_stats = blob_store.get_stats() if blob_store else None
+    await agent.aclose()
+    set_search_backend(None)
+    return per_loop, checkpoint_stats, blob_stats
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=len(COMPANIES))
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(CASSETTE_PATH):
+        seconds, stats = await record_session(CASSETTE_PATH)
+        print(f"Recorded session: {seconds:6.2f} s, {stats['recorded']} interactions")
+
+    companies = COMPANIES[:args.companies]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for compact in (False, True):
+            config = session_config(
+                cassette_mode="replay", cassette_path=CASSETTE_PATH, compact_state=compact, checkpoint_enabled=True,
+                checkpoint_path=os.path.join(directory, f"checkpoints-{compact}.sqlite"),
+                blob_store_path=os.path.join(directory, "blobs.sqlite"),
+            )
+            results[compact] = await measure(config, companies)
+
+    print(f"{len(companies)} companies, replayed with recorded latencies")
+    for compact, (per_loop, checkpoint_stats, blob_stats) in results.items():
+        print(f"{'Compact' if compact else 'Full'} state:")
+        for loop in sorted(per_loop):
+            sizes = [size for size, _ in per_loop[loop]]
+            times = [ms for _, ms in per_loop[loop]]
+            print(f"  loop {loop}: {statistics.mean(sizes) / 1024:7.1f} KiB, {statistics.mean(times):6.2f} ms to serialize ({len(sizes)} companies)")
+        print(f"  checkpoints: {checkpoint_stats}")
+        if blob_stats:
+            print(f"  blob store: {blob_stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""Benchmark of the extraction calls and prompt tokens, one call per page vs pages packed into shared calls.
+
+Each mode records its own synthetic session (benchmarks/session.py) the first time, then replays it
+with the LLM ledger on, and the extract node's calls, prompt tokens and latency are compared.
+
+Run from the repository root:
+    python benchmarks/bench_extract_packing.py [--companies 3] [--budget 8000] [--record]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import json
+import tempfile
+from benchmarks.session import COMPANIES, record_session, run_session, session_config
+from agents.utils.llm_ledger import summarize_records
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=8000)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    companies = COMPANIES[:args.companies]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for packing in (False, True):
+            overrides = {"extract_packing": packing, "extract_pack_token_budget": args.budget}
+            name = f"packed_{args.budget}" if packing else "per_page"
+            path = os.path.join(CORPUS_DIR, f"session_extract_{name}_{len(companies)}.jsonl")
+            if args.record or not os.path.exists(path):
+                seconds, stats = await record_session(path, companies, **overrides)
+                print(f"Recorded {name} session: {seconds:6.2f} s, {stats['recorded']} interactions")
+            ledger_path = os.path.join(tmp, f"{name}.jsonl")
+            config = session_config(cassette_mode="replay", cassette_path=path, llm_ledger_path=ledger_path, **overrides)
+            seconds, _ = await run_session(config, companies)
+            with open(ledger_path, "r", encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+            results[name] = (seconds, summarize_records(records)["nodes"]["extract"])
+
+    print(f"{len(companies)} companies, replayed with recorded latencies")
+    for name, (seconds, extract) in results.items():
+        print(
+            f"{name:12}: {extract['llm_calls']:3d} extraction calls, {extract['prompt_tokens']:7d} prompt tokens, "
+            f"{extract['latency']:7.2f} s in extraction calls, {seconds:6.2f} s total"
+        )
+    per_page, packed = results["per_page"][1], results[f"packed_{args.budget}"][1]
+    print(
+        f"Saved: {per_page['llm_calls'] - packed['llm_calls']} calls, "
+        f"{per_page['prompt_tokens'] - packed['prompt_tokens']} prompt tokens"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Benchmark of the HTML to text engines over the saved news corpus.
+
+Each engine runs in its own process so that its peak RSS is measured in isolation.
+The engines' outputs are also compared page by page, as they must give the same visible text.
+
+Run from the repository root:
+    python benchmarks/bench_html_extraction.py [corpus_dir]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import hashlib
+import json
+import resource
+import subprocess
+import time
+from benchmarks.corpus import CORPUS_DIR, load_corpus
+from agents.tools.html_extraction import ENGINES, get_extractor
+
+ROUNDS = 3
+
+
+def run_engine(engine: str, corpus_dir: str):
+    """Extract every page of the corpus with the engine and print the figures as JSON."""
+    pages = load_corpus(corpus_dir)
+    extractor = get_extractor(engine)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        texts = [extractor.extract(page["html"]) for page in pages]
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "engine": extractor.name,
+        "pages_per_sec": len(pages) * ROUNDS / elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "hashes": [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts],
+    }))
+
+
+def main(corpus_dir: str):
+    pages = load_corpus(corpus_dir)
+    print(f"{len(pages)} pages, {ROUNDS} rounds")
+    results = []
+    for engine in ENGINES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--engine", engine, corpus_dir],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for result in results:
+        print(f"{result['engine']:6s} {result['pages_per_sec']:10.1f} pages/sec {result['peak_rss_mb']:8.1f} MB peak RSS")
+
+    reference = results[0]
+    for result in results[1:]:
+        mismatches = [page["url"] for page, a, b in zip(pages, reference["hashes"], result["hashes"]) if a != b]
+        print(f"{result['engine']} vs {reference['engine']}: {len(pages) - len(mismatches)}/{len(pages)} pages with the same visible text")
+        for url in mismatches:
+            print(f"  different text: {url}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--engine":
+        run_engine(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else CORPUS_DIR)
+    else:
+        main(sys.argv[1] if len(sys.argv) > 1 else CORPUS_DIR)
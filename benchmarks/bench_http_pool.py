@@ -0,0 +1,83 @@
+"""Benchmark of connections opened per 100 fetches, one session per URL vs the shared pool.
+
+Run from the repository root:
+    python benchmarks/bench_http_pool.py
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import time
+import aiohttp
+from aiohttp import web
+from agents.tools.http_client import HttpFetcher, DEFAULT_HEADERS
+
+N_FETCHES = 100
+BATCH_SIZE = 5  # Same as max_search_results, URLs are fetched in batches by extract_info
+PAGE = "<html><body>" + "<p>Lorem ipsum dolor sit amet.</p>" * 200 + "</body></html>"
+
+
+async def start_fixture_server():
+    """Start a local HTML server that counts the TCP connections it accepts."""
+    transports = set()
+
+    async def handler(request):
+        transports.add(request.transport)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{page}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, port, transports
+
+
+async def fetch_per_url_session(url):
+    """Fetch the URL the way extract_text used to: a new session and connector per URL."""
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=False),
+        timeout=aiohttp.ClientTimeout(total=30),
+        headers=DEFAULT_HEADERS,
+    ) as session:
+        async with session.get(url) as response:
+            return await response.read()
+
+
+async def fetch_shared_pool(fetcher, url):
+    """Fetch the URL through the shared pooled fetcher."""
+    async with fetcher.get(url) as response:
+        return await response.read()
+
+
+async def run_batches(fetch, urls):
+    start = time.perf_counter()
+    for i in range(0, len(urls), BATCH_SIZE):
+        await asyncio.gather(*(fetch(url) for url in urls[i:i + BATCH_SIZE]))
+    return time.perf_counter() - start
+
+
+async def main():
+    runner, port, transports = await start_fixture_server()
+    urls = [f"http://127.0.0.1:{port}/page{i}" for i in range(N_FETCHES)]
+
+    try:
+        transports.clear()
+        elapsed = await run_batches(fetch_per_url_session, urls)
+        print(f"Session per URL: {len(transports):4d} connections opened, {elapsed * 1000:8.1f} ms for {N_FETCHES} fetches")
+
+        transports.clear()
+        fetcher = HttpFetcher()
+        elapsed = await run_batches(lambda url: fetch_shared_pool(fetcher, url), urls)
+        stats = fetcher.get_stats()
+        await fetcher.close()
+        print(f"Shared pool:     {len(transports):4d} connections opened, {elapsed * 1000:8.1f} ms for {N_FETCHES} fetches "
+              f"({stats['connections_reused']} reused)")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""Benchmark of the LLM response cache on a re-run of the same companies.
+
+The recorded synthetic session (benchmarks/session.py) is replayed twice with a fresh response cache,
+like two nightly runs over unchanged pages: the first run fills the cache and the second one is
+served from it. The per-node hit rates and the tokens and seconds saved are printed.
+
+Run from the repository root:
+    python benchmarks/bench_llm_cache.py [--companies 2] [--latency realistic|zero]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import tempfile
+from benchmarks.session import CASSETTE_PATH, COMPANIES, record_session, run_session, session_config
+from interfaces.llm_cache import LLMResponseCache
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=2)
+    parser.add_argument("--latency", choices=["realistic", "zero"], default="realistic")
+    args = parser.parse_args()
+
+    if not os.path.exists(CASSETTE_PATH):
+        await record_session(CASSETTE_PATH)
+
+    companies = COMPANIES[:args.companies]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "llm.sqlite")
+        config = session_config(
+            cassette_mode="replay", cassette_latency=args.latency, llm_cache_enabled=True, llm_cache_path=cache_path,
+        )
+        for run in ("First run", "Second run"):
+            seconds, stats = await run_session(config, companies)
+            print(f"{run}: {seconds:6.2f} s, {stats['replayed'] + stats['repeated']} interactions replayed")
+
+        cache = LLMResponseCache(cache_path)
+        for node, stats in cache.get_total_stats().items():
+            print(
+                f"  {node:10} hit rate {stats['hit_rate']:6.1%}, {stats['hits']:3d} hits, "
+                f"{stats['tokens_saved']:7d} tokens and {stats['latency_saved']:6.2f} s saved"
+            )
+        cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Benchmark of the model cascade: every call on the strong model vs the small model first with escalations.
+
+Each mode records its own synthetic session (benchmarks/session.py) the first time, with a fake
+strong model of 2-6 s per call and a fake small model of 0.5-1.5 s whose self-reported confidence
+varies per prompt. The sessions are replayed with the LLM ledger on, and the per-tier calls, latency
+and cost (at the configured llm_prices) are compared.
+
+Run from the repository root:
+    python benchmarks/bench_llm_cascade.py [--companies 3] [--min-confidence 0.7] [--record]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import json
+import tempfile
+from benchmarks.session import COMPANIES, record_session, run_session, session_config
+from agents.utils.llm_ledger import summarize_records
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+MODEL_LATENCY = {"gpt-4o": (2.0, 6.0), "gpt-4o-mini": (0.5, 1.5)}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=3)
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    companies = COMPANIES[:args.companies]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for cascade in (False, True):
+            overrides = {
+                "llm_name": "gpt-4o", "llm_small_name": "gpt-4o-mini", "llm_cascade": cascade,
+                "llm_cascade_min_confidence": args.min_confidence,
+            }
+            name = f"cascade_{args.min_confidence}" if cascade else "strong_only"
+            path = os.path.join(CORPUS_DIR, f"session_{name}_{len(companies)}.jsonl")
+            if args.record or not os.path.exists(path):
+                seconds, stats = await record_session(path, companies, model_latency=MODEL_LATENCY, **overrides)
+                print(f"Recorded {name} session: {seconds:6.2f} s, {stats['recorded']} interactions")
+            ledger_path = os.path.join(tmp, f"{name}.jsonl")
+            config = session_config(cassette_mode="replay", cassette_path=path, llm_ledger_path=ledger_path, **overrides)
+            seconds, _ = await run_session(config, companies)
+            with open(ledger_path, "r", encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+            results[name] = (seconds, summarize_records(records, config["llm_prices"]))
+
+    print(f"{len(companies)} companies, replayed with recorded latencies")
+    for name, (seconds, summary) in results.items():
+        total = summary["total"]
+        print(f"{name:16}: {seconds:6.2f} s, {total['llm_calls']:3d} calls, ${total['cost']:.4f}")
+        for tier, stats in summary["tiers"].items():
+            print(
+                f"  {tier:8} {stats['llm_calls']:3d} calls, {stats['escalations']:3d} escalations, "
+                f"{stats['latency']:7.2f} s in calls, ${stats['cost']:.4f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""Benchmark of the LLM rate limiter against a local fake provider that enforces RPM and TPM limits.
+
+A batch of page extractions is sent at once, with a few synthesis calls queued behind them, like
+several companies researched concurrently. Without the limiter every call goes out at once and the
+provider answers 429 to the calls beyond its limits. With the limiter the calls are admitted within
+the buckets, the concurrency adapts to the 429s, and the synthesis lane goes first.
+
+The "minute" of the provider and of the limiter is shortened to --period seconds.
+
+Run from the repository root:
+    python benchmarks/bench_llm_rate_limiter.py [--extractions 120] [--syntheses 6] [--period 2]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import collections
+import random
+import time
+from interfaces.llm_rate_limiter import LLMRateLimiter
+
+
+class FakeRateLimitError(Exception):
+    """429 answer of the fake provider."""
+    status_code = 429
+
+
+class FakeLimitedProvider:
+    """
+    Provider that allows rpm requests and tpm tokens per sliding period, answering 429 beyond them.
+    Its latency grows with the number of requests in flight.
+    """
+    def __init__(self, rpm: int, tpm: int, period: float, base_latency: float = 0.05):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.period = period
+        self.base_latency = base_latency
+        self._window = collections.deque()
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    async def complete(self, tokens: int) -> str:
+        now = time.monotonic()
+        while self._window and self._window[0][0] <= now - self.period:
+            self._window.popleft()
+        if len(self._window) >= self.rpm or sum(used for _, used in self._window) + tokens > self.tpm:
+            self.rejected += 1
+            await asyncio.sleep(0.005)
+            raise FakeRateLimitError("Rate limit reached")
+        self._window.append((now, tokens))
+        self.accepted += 1
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.base_latency * (1 + self.in_flight / 10))
+        finally:
+            self.in_flight -= 1
+        return "ok"
+
+
+async def run(provider: FakeLimitedProvider, limiter, calls):
+    latencies = collections.defaultdict(list)
+    failures = 0
+    start = time.perf_counter()
+
+    async def one(node: str, tokens: int, priority: int):
+        nonlocal failures
+        call_start = time.perf_counter()
+        try:
+            if limiter is None:
+                await provider.complete(tokens)
+            else:
+                await limiter.call(("fake", "model"), lambda: provider.complete(tokens), tokens=tokens, priority=priority)
+        except FakeRateLimitError:
+            failures += 1
+            return
+        latencies[node].append(time.perf_counter() - call_start)
+
+    await asyncio.gather(*(one(*call) for call in calls))
+    return time.perf_counter() - start, failures, latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extractions", type=int, default=120)
+    parser.add_argument("--syntheses", type=int, default=6)
+    parser.add_argument("--rpm", type=int, default=40)
+    parser.add_argument("--tpm", type=int, default=60000)
+    parser.add_argument("--period", type=float, default=2.0)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    calls = [("extract", rng.randint(1000, 2500), 1) for _ in range(args.extractions)]
+    calls += [("synthesize", 3000, 0) for _ in range(args.syntheses)]
+
+    for name in ("No limiter", "Rate limiter"):
+        provider = FakeLimitedProvider(args.rpm, args.tpm, args.period)
+        limiter = None
+        if name == "Rate limiter":
+            limiter = LLMRateLimiter(
+                rpm=args.rpm, tpm=args.tpm, max_concurrency=16, backoff_base=args.period / 8,
+                backoff_max=args.period, latency_target=args.period, period=args.period,
+            )
+        elapsed, failures, latencies = await run(provider, limiter, calls)
+        print(f"{name}: {elapsed:6.2f} s, {len(calls) - failures}/{len(calls)} calls completed, {provider.rejected} 429s")
+        for node, values in latencies.items():
+            print(f"  {node:10} mean latency {sum(values) / len(values):6.2f} s, max {max(values):6.2f} s")
+        if limiter is not None:
+            print(f"  Limiter stats: {limiter.get_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""Benchmark of the cost of getting a structured-output model per call, new client vs the shared registry.
+
+Only the client construction is measured, no request is sent. A dummy API key is used if none is set.
+
+Run from the repository root:
+    python benchmarks/bench_llm_registry.py [--calls 200]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import time
+from langchain.chat_models import init_chat_model
+from agents.tools.scrape_website import WebInfo
+from interfaces.llm_registry import LLMRegistry
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--provider", default="openai")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    args = parser.parse_args()
+    api_key = os.getenv("OPENAI_API_KEY") or "sk-benchmark"
+
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        init_chat_model(args.model, model_provider=args.provider, api_key=api_key).with_structured_output(WebInfo)
+    per_call = time.perf_counter() - start
+
+    registry = LLMRegistry(api_key=api_key)
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        registry.get_structured(args.provider, args.model, 0.0, WebInfo)
+    shared = time.perf_counter() - start
+    await registry.aclose()
+
+    print(f"{args.calls} calls")
+    print(f"New client per call: {1000 * per_call / args.calls:8.3f} ms/call")
+    print(f"Shared registry:     {1000 * shared / args.calls:8.3f} ms/call")
+    print(f"Registry stats: {registry.get_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
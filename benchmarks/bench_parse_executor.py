@@ -0,0 +1,51 @@
+"""Benchmark of the event loop lag while the corpus pages are parsed concurrently.
+
+Each executor kind parses every page of the corpus at once, as extract_info does,
+while a LoopLagMonitor measures how late the event loop wakes up.
+
+Run from the repository root:
+    python benchmarks/bench_parse_executor.py [corpus_dir] [engine]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import time
+from benchmarks.corpus import CORPUS_DIR, load_corpus
+from agents.tools.html_extraction import html_to_text
+from agents.utils.executor import LoopLagMonitor, ParseExecutor
+
+
+async def parse_all(executor: ParseExecutor, pages, engine: str):
+    # Yield between pages like the real fetch and LLM calls do, so the monitor can observe the loop
+    async def parse(html):
+        await asyncio.sleep(0)
+        return await executor.run(html_to_text, html, engine)
+
+    return await asyncio.gather(*(parse(page["html"]) for page in pages))
+
+
+async def main(corpus_dir: str, engine: str):
+    pages = load_corpus(corpus_dir)
+    print(f"{len(pages)} pages, engine {engine}")
+    for kind in ("inline", "thread", "process"):
+        executor = ParseExecutor(kind=kind)
+        # Warm up the pool so worker start-up is not measured
+        await parse_all(executor, pages[:executor.max_workers], engine)
+
+        start = time.perf_counter()
+        async with LoopLagMonitor(interval=0.01) as monitor:
+            await parse_all(executor, pages, engine)
+        elapsed = time.perf_counter() - start
+        executor.shutdown()
+
+        lag = monitor.get_stats()
+        print(f"{kind:8s} {len(pages) / elapsed:8.1f} pages/sec  "
+              f"max lag {lag['max_lag_ms']:8.1f} ms  p95 lag {lag['p95_lag_ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        sys.argv[1] if len(sys.argv) > 1 else CORPUS_DIR,
+        sys.argv[2] if len(sys.argv) > 2 else "bs4",
+    ))
@@ -0,0 +1,64 @@
+"""Benchmark of the prompt tokens per page, first 20k characters vs relevance-ranked passages.
+
+Recall is approximated by the share of the topic terms found in the page that are
+still present in the content sent to the LLM. Without --topic, each page's <title> is its topic.
+
+Run from the repository root:
+    python benchmarks/bench_passage_ranking.py [corpus_dir] [--topic "Bankinter info"] [--budget 2000]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import re
+import time
+from benchmarks.corpus import CORPUS_DIR, load_corpus
+from agents.tools.html_extraction import html_to_text
+from agents.tools.passage_ranker import estimate_tokens, select_passages, tokenize
+
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+def term_recall(topic: str, page_text: str, content: str) -> float:
+    page_terms = set(tokenize(topic)) & set(tokenize(page_text))
+    if not page_terms:
+        return 1.0
+    return len(page_terms & set(tokenize(content))) / len(page_terms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus_dir", nargs="?", default=CORPUS_DIR)
+    parser.add_argument("--topic", default=None)
+    parser.add_argument("--budget", type=int, default=2000)
+    parser.add_argument("--passage-words", type=int, default=120)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir)
+    baseline_tokens = ranked_tokens = 0
+    baseline_recall = ranked_recall = 0.0
+    ranking_seconds = 0.0
+    for page in pages:
+        text = html_to_text(page["html"])
+        title = TITLE_RE.search(page["html"])
+        topic = args.topic or (" ".join(title.group(1).split()) if title else "")
+
+        baseline = text[:20000]
+        start = time.perf_counter()
+        ranked = select_passages(text, topic, args.budget, args.passage_words)
+        ranking_seconds += time.perf_counter() - start
+
+        baseline_tokens += estimate_tokens(baseline)
+        ranked_tokens += estimate_tokens(ranked)
+        baseline_recall += term_recall(topic, text, baseline)
+        ranked_recall += term_recall(topic, text, ranked)
+
+    n = len(pages)
+    print(f"{n} pages, token budget {args.budget}")
+    print(f"First 20k characters: {baseline_tokens / n:8.0f} tokens/page, topic term recall {baseline_recall / n:.1%}")
+    print(f"Ranked passages:      {ranked_tokens / n:8.0f} tokens/page, topic term recall {ranked_recall / n:.1%}")
+    print(f"Token reduction: {1 - ranked_tokens / baseline_tokens:.1%}, ranking time {1000 * ranking_seconds / n:.1f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark of the end-to-end latency of the research loops, barrier graph vs streaming pipeline.
+
+Each mode records its own synthetic session (benchmarks/session.py) the first time, with the same
+page delays and the same LLM latency per prompt, and the sessions are then replayed with their
+recorded latencies, so the difference comes only from how the stages overlap.
+
+Run from the repository root:
+    python benchmarks/bench_pipeline_latency.py [--companies 3] [--fanout] [--record]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+from benchmarks.session import COMPANIES, record_session, run_session, session_config
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=3)
+    parser.add_argument("--fanout", action="store_true", help="Search several query variants per topic")
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    companies = COMPANIES[:args.companies]
+    overrides = {"search_fanout": args.fanout, "search_fanout_excel": ""}
+    results = {}
+    for mode in ("graph", "streaming"):
+        path = os.path.join(CORPUS_DIR, f"session_{mode}{'_fanout' if args.fanout else ''}_{len(companies)}.jsonl")
+        if args.record or not os.path.exists(path):
+            seconds, stats = await record_session(path, companies, pipeline_mode=mode, **overrides)
+            print(f"Recorded {mode} session: {seconds:6.2f} s, {stats['recorded']} interactions")
+        config = session_config(cassette_mode="replay", cassette_path=path, pipeline_mode=mode, **overrides)
+        results[mode], stats = await run_session(config, companies)
+
+    print(f"{len(companies)} companies, replayed with recorded latencies")
+    for mode, seconds in results.items():
+        print(f"{mode:9}: {seconds:6.2f} s, {seconds / len(companies):5.2f} s/company")
+    print(f"Speedup: {results['graph'] / results['streaming']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
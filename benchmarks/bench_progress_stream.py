@@ -0,0 +1,84 @@
+"""Benchmark of the time to the first useful byte, the whole run vs the server-sent events of its progress.
+
+The synthetic session of benchmarks/session.py is replayed with its recorded latencies (recorded first if the
+cassette does not exist), each company researched once with run and once through the SSE stream of astream.
+Without streaming, the first byte a client gets is the result at the end of the run. With --client-delay,
+the SSE reader sleeps after each event, like a slow client, and the events merged while it waits are counted.
+
+Run from the repository root:
+    python benchmarks/bench_progress_stream.py [--companies 3] [--client-delay 0.0] [--record]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import time
+from collections import Counter
+from langchain_core.runnables import RunnableConfig
+from agents.research_agent.agent import ResearcherAgent
+from agents.research_agent.progress import stream_sse
+from agents.research_agent.state import State
+from agents.tools.page_dedup import reset_fingerprint_store
+from agents.tools.search_backends import set_search_backend
+from benchmarks.session import CASSETTE_PATH, COMPANIES, record_session, session_config
+
+
+async def stream_company(agent: ResearcherAgent, company: str, config, client_delay: float):
+    """Seconds to the first SSE byte, the first extraction, the first synthesis and the result, and the event counts."""
+    start = time.perf_counter()
+    firsts, counts = {}, Counter()
+    async for chunk in stream_sse(agent.astream(State(topic=f"{company} info"), config)):
+        event = chunk.split("\n", 1)[0].removeprefix("event: ")
+        counts[event] += 1
+        name = {"node_start": "first_byte", "extraction": "first_extraction", "result": "result"}.get(event)
+        if event == "node_end" and '"synthesized_info"' in chunk:
+            name = "first_synthesis"
+        if name is not None and name not in firsts:
+            firsts[name] = time.perf_counter() - start
+        if client_delay:
+            await asyncio.sleep(client_delay)
+    return firsts, counts
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=3)
+    parser.add_argument("--client-delay", type=float, default=0.0)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(CASSETTE_PATH):
+        seconds, stats = await record_session(CASSETTE_PATH)
+        print(f"Recorded session: {seconds:6.2f} s, {stats['recorded']} interactions")
+
+    config = RunnableConfig(configurable=session_config(cassette_mode="replay", cassette_path=CASSETTE_PATH))
+    companies = COMPANIES[:args.companies]
+    # The sessions replay from the start of the cassette, so each mode researches the companies in order
+    reset_fingerprint_store()
+    agent = ResearcherAgent()
+    run_seconds = []
+    for company in companies:
+        start = time.perf_counter()
+        await agent.run(State(topic=f"{company} info"), config)
+        run_seconds.append(time.perf_counter() - start)
+    await agent.aclose()
+
+    reset_fingerprint_store()
+    agent = ResearcherAgent()
+    streamed = [await stream_company(agent, company, config, args.client_delay) for company in companies]
+    await agent.aclose()
+    set_search_backend(None)
+
+    print(f"{len(companies)} companies, replayed with recorded latencies, client delay {args.client_delay} s/event")
+    for company, seconds, (firsts, counts) in zip(companies, run_seconds, streamed):
+        print(
+            f"{company:10}: run {seconds:6.2f} s to the result | SSE first byte {firsts['first_byte']:5.2f} s, "
+            f"first extraction {firsts.get('first_extraction', float('nan')):5.2f} s, "
+            f"first synthesis {firsts.get('first_synthesis', float('nan')):6.2f} s, result {firsts['result']:6.2f} s, "
+            f"events {dict(counts)}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
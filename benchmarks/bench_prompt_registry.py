@@ -0,0 +1,101 @@
+"""Benchmark of the prompt file reads and render time of a batch, files read per use vs the shared prompt registry.
+
+A batch of --companies research runs is simulated with the prompts of config/research_agent_config.yaml:
+one extract_info render per page and one synthesize and validate render per company. The per-use mode
+reads every prompt file for each PromptManager and renders with str.format, like before the registry.
+The renders of both modes are checked to be identical. With --hot-reload the modification time of
+the prompt files is checked at every use, the worst case of the reload interval.
+
+Run from the repository root:
+    python benchmarks/bench_prompt_registry.py [--companies 26] [--pages 10] [--hot-reload]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import json
+import random
+import time
+import yaml
+from types import SimpleNamespace
+from agents.utils.prompt_manager import PromptManager, PromptRegistry, set_prompt_registry
+from benchmarks.session import COMPANIES, SENTENCES
+
+CONFIG_PATH = "config/research_agent_config.yaml"
+
+
+class PerUsePromptManager:
+    """Reads every prompt file when constructed, as the prompt manager did before the registry."""
+    file_reads = 0
+
+    def __init__(self, config):
+        self.prompts_data = {}
+        for prompt_name, prompt_path in config.prompt_paths.items():
+            with open(prompt_path, "r", encoding="utf-8") as file:
+                self.prompts_data[prompt_name] = file.read()
+            PerUsePromptManager.file_reads += 1
+
+    def render(self, prompt_name, **values) -> str:
+        return self.prompts_data[prompt_name].format(**values)
+
+
+def batch_renders(companies, pages: int, rng: random.Random):
+    """(prompt name, values) of the renders of a batch, the content of a page about 20k characters."""
+    renders = []
+    for company in companies:
+        topic = f"{company} información corporativa"
+        extracted = {}
+        for page in range(pages):
+            url = f"https://{company.lower()}.example.com/{page}"
+            content = " ".join(rng.choice(SENTENCES).format(company=company, n=rng.randint(10, 5000)) for _ in range(160))[:20000]
+            renders.append(("extract_info", {"topic": topic, "url": url, "content": content}))
+            extracted[url] = {"url": url, "notes": content[:2000]}
+        synthesized = {"summary": " ".join(SENTENCES).format(company=company, n=100), "references": list(extracted)}
+        renders.append(("synthesize", {
+            "topic": topic,
+            "extracted_info": json.dumps(extracted, indent=2, ensure_ascii=False),
+            "previous_info": json.dumps("", indent=2, ensure_ascii=False),
+        }))
+        renders.append(("validate", {"topic": topic, "synthesized_info": json.dumps(synthesized, indent=2, ensure_ascii=False)}))
+    return renders
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=26)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--hot-reload", action="store_true")
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH, "r") as file:
+        prompt_paths = yaml.safe_load(file)["prompt_paths"]
+    config = SimpleNamespace(
+        prompt_paths=prompt_paths, prompt_hot_reload=args.hot_reload, prompt_reload_interval=0.0,
+    )
+    companies = [COMPANIES[i % len(COMPANIES)] for i in range(args.companies)]
+    renders = batch_renders(companies, args.pages, random.Random(0))
+
+    start = time.perf_counter()
+    per_use = [PerUsePromptManager(config).render(name, **values) for name, values in renders]
+    per_use_seconds = time.perf_counter() - start
+
+    registry = PromptRegistry(hot_reload=args.hot_reload, reload_interval=0.0)
+    set_prompt_registry(registry)
+    start = time.perf_counter()
+    shared = [PromptManager(config).render(name, **values) for name, values in renders]
+    shared_seconds = time.perf_counter() - start
+    assert shared == per_use, "The registry renders differ from str.format"
+
+    stats = registry.get_stats()
+    print(f"{args.companies} companies, {args.pages} pages each, {len(renders)} renders, hot reload {'on' if args.hot_reload else 'off'}")
+    print(f"Files read per use: {PerUsePromptManager.file_reads:6d} file reads, {1e6 * per_use_seconds / len(renders):8.2f} us/render")
+    print(
+        f"Shared registry:    {stats['file_reads']:6d} file reads, {stats['stat_checks']:6d} mtime checks, "
+        f"{1e6 * shared_seconds / len(renders):8.2f} us/render ({1e6 * stats['render_time'] / len(renders):.2f} us rendering)"
+    )
+    static_prefixes = {name: len(registry.get_template(path).static_prefix) for name, path in config.prompt_paths.items()}
+    print(f"Static prefix characters: {static_prefixes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Replay of a recorded research session, to benchmark and profile the agent with no network.
+
+The synthetic session of benchmarks/session.py is recorded first if the cassette does not exist.
+A cassette recorded from a real session (cassette_mode: record in the YAML config) can be replayed
+with --cassette, as long as the agent configuration matches the one it was recorded with.
+
+Run from the repository root:
+    python benchmarks/bench_replay_session.py [--record] [--latency realistic|zero] [--profile 25] [--cassette path]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import cProfile
+import pstats
+from benchmarks.session import CASSETTE_PATH, record_session, run_session, session_config
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cassette", default=CASSETTE_PATH)
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--latency", choices=["realistic", "zero"], default="realistic")
+    parser.add_argument("--profile", type=int, default=0, help="Print the N functions with the most cumulative time")
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(args.cassette):
+        seconds, stats = await record_session(args.cassette)
+        print(f"Recorded session: {seconds:6.2f} s, {stats['recorded']} interactions")
+
+    config = session_config(cassette_mode="replay", cassette_path=args.cassette, cassette_latency=args.latency)
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    seconds, stats = await run_session(config)
+    if profiler:
+        profiler.disable()
+    print(f"Replayed session ({args.latency} latency): {seconds:6.2f} s, cassette stats {stats}")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Benchmark of the search layer over a batch of company runs, with and without the search-results cache.
+
+Uses the fixture search backend with a simulated latency per remote query. Each company is
+researched --runs times, and every run also makes a follow-up query that only reorders or
+rephrases the terms of the first one, as the validation step does.
+
+Run from the repository root:
+    python benchmarks/bench_search_cache.py [--runs 3] [--latency 0.8] [--write-fixture]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from agents.research_agent.agent_config import AgentConfig
+from agents.tools import search_cache
+from agents.tools.search_backends import FixtureSearchBackend, set_search_backend
+from agents.tools.search_webs import search
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "search_results.json")
+COMPANIES = ["Veolia", "Celsa", "Tous", "Laboratorios Rovi", "Bon Preu", "Bacardi", "Damm", "Carrefour",
+             "Unicaja", "Bankinter", "Ayvens", "Mutua Madrileña", "El Corte Inglés", "Ferrovial"]
+
+
+def queries(company: str):
+    return [f"{company} info", f"{company} facturación anual 2024 número de empleados"]
+
+
+def follow_ups(company: str):
+    return [f"Info {company}", f"Número total de empleados y facturación anual {company} 2024"]
+
+
+def build_fixture(path: str):
+    """Write a fixture with five news results per company query, one of them a PDF."""
+    fixture = {}
+    for company in COMPANIES:
+        slug = company.lower().replace(" ", "-")
+        for n, query in enumerate(queries(company)):
+            fixture[query] = [
+                {"url": f"https://news{i}.example.com/{slug}/{n}-{i}", "content": f"{query}: news article {i}"}
+                for i in range(4)
+            ] + [{"url": f"https://{slug}.example.com/pdf/report-{n}.pdf", "content": f"{query}: annual report"}]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(fixture, file, ensure_ascii=False, indent=1)
+
+
+async def run_batch(config, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        for company in COMPANIES:
+            for query in queries(company) + follow_ups(company):
+                await search(query, config)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.8)
+    parser.add_argument("--write-fixture", action="store_true")
+    args = parser.parse_args()
+
+    if args.write_fixture or not os.path.exists(FIXTURE_PATH):
+        build_fixture(FIXTURE_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for enabled in (False, True):
+            backend = FixtureSearchBackend(FIXTURE_PATH, latency=args.latency)
+            set_search_backend(backend)
+            search_cache.close_search_cache()
+            config = AgentConfig(
+                max_search_results=5, search_cache_enabled=enabled, search_cache_path=os.path.join(tmp, "search.sqlite"),
+                search_cache_ttl=86400, search_cache_max_entries=5000, search_similarity_threshold=0.8,
+            )
+            seconds = await run_batch(config, args.runs)
+            label = "With cache" if enabled else "No cache"
+            print(f"{label:10}: {backend.calls:4d} remote queries, {seconds:6.2f} s")
+            cache = search_cache.get_search_cache(config)
+            if cache is not None:
+                print(f"            cache stats {cache.get_stats()}")
+        search_cache.close_search_cache()
+        set_search_backend(None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Benchmark of semantic cache lookups, one-off cache per call vs the long-lived engine.
+
+The one-off path mirrors the old RedisConnector: a new cache per call, so every lookup embeds
+the question again and scores the stored vectors one by one. The engine keeps an embedding memo
+and scores all the stored vectors in one product. Local hashing embeddings and the in-memory
+index are used, so nothing is sent to an API.
+
+Run from the repository root:
+    python benchmarks/bench_semantic_cache.py [--entries 5000] [--lookups 500]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import random
+import time
+import numpy as np
+from interfaces.semantic_cache import EmbeddingMemo, HashingEmbeddings, InMemoryVectorIndex, SemanticCache
+
+WORDS = """empresa resultados beneficio ventas crecimiento director consejo estrategia mercado inversion
+deuda dividendo accion plantilla expansion adquisicion filial energia banco seguros tecnologia""".split()
+
+
+def make_prompt(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(60))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    prompts = [make_prompt(rng) for _ in range(args.entries)]
+    # Half of the lookups repeat a stored prompt with one word changed, the rest are new
+    queries = []
+    for i in range(args.lookups):
+        if i % 2:
+            words = rng.choice(prompts).split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            queries.append(" ".join(words))
+        else:
+            queries.append(make_prompt(rng))
+    # Each query is looked up twice, as a re-run would
+    queries = queries + queries
+
+    embeddings = HashingEmbeddings()
+    stored = np.asarray(embeddings.embed_documents(prompts), dtype=np.float32)
+    stored /= np.linalg.norm(stored, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    one_off_hits = 0
+    for query in queries:
+        vector = np.asarray(HashingEmbeddings().embed_documents([query])[0], dtype=np.float32)
+        vector /= np.linalg.norm(vector)
+        best = max(float(vector @ row) for row in stored)
+        one_off_hits += best >= 0.95
+    one_off = time.perf_counter() - start
+
+    cache = SemanticCache(EmbeddingMemo(embeddings), InMemoryVectorIndex(capacity=args.entries), threshold=0.95)
+    for prompt in prompts:
+        await cache.aupdate(prompt, "extract", {"type": "json", "data": prompt[:20]})
+    cache.embedder.stats.update(memo_hits=0, embedded=0)
+    start = time.perf_counter()
+    for query in queries:
+        await cache.alookup(query, "extract", "extract")
+    engine = time.perf_counter() - start
+
+    print(f"{args.entries} stored prompts, {len(queries)} lookups")
+    print(f"One-off cache per call: {1000 * one_off / len(queries):8.3f} ms/lookup, {one_off_hits} hits")
+    print(f"Long-lived engine:      {1000 * engine / len(queries):8.3f} ms/lookup")
+    print(f"Engine stats: {cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Saved corpus of news HTML pages used by the benchmarks.
+
+Save pages into the corpus from a file with one URL per line:
+    python benchmarks/corpus.py urls.txt [corpus_dir]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import hashlib
+import json
+from typing import Dict, List
+from agents.tools.http_client import HttpFetcher
+from agents.tools.html_stream import decode_html
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+def load_corpus(corpus_dir: str = CORPUS_DIR) -> List[Dict[str, str]]:
+    """Return the saved pages as dictionaries with the url and the html."""
+    index_path = os.path.join(corpus_dir, "index.json")
+    if not os.path.exists(index_path):
+        raise SystemExit(f"No corpus found in {corpus_dir}. Save pages first with: python benchmarks/corpus.py urls.txt")
+    with open(index_path, "r", encoding="utf-8") as file:
+        index = json.load(file)
+    pages = []
+    for file_name, url in index.items():
+        with open(os.path.join(corpus_dir, file_name), "r", encoding="utf-8") as file:
+            pages.append({"url": url, "html": file.read()})
+    return pages
+
+
+async def save_corpus(urls: List[str], corpus_dir: str = CORPUS_DIR):
+    """Fetch the URLs and save the HTML pages into the corpus directory."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    index_path = os.path.join(corpus_dir, "index.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as file:
+            index = json.load(file)
+
+    fetcher = HttpFetcher()
+    try:
+        for url in urls:
+            try:
+                async with fetcher.get(url) as response:
+                    content_type = response.headers.get("Content-Type", "")
+                    if "text/html" not in content_type.lower():
+                        print(f"Skipping non-HTML content from {url}")
+                        continue
+                    html = decode_html(await response.read(), content_type)
+            except Exception as e:
+                print(f"Error while fetching {url}: {e}")
+                continue
+            file_name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16] + ".html"
+            with open(os.path.join(corpus_dir, file_name), "w", encoding="utf-8") as file:
+                file.write(html)
+            index[file_name] = url
+            print(f"Saved {url}")
+    finally:
+        await fetcher.close()
+
+    with open(index_path, "w", encoding="utf-8") as file:
+        json.dump(index, file, indent=2)
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "r", encoding="utf-8") as file:
+        urls = [line.strip() for line in file if line.strip()]
+    asyncio.run(save_corpus(urls, sys.argv[2] if len(sys.argv) > 2 else CORPUS_DIR))
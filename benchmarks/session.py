@@ -0,0 +1,188 @@
+"""Synthetic research sessions recorded to a cassette, for benchmarking the agent offline.
+
+The session runs the real agent against a local HTML server with per-page delays, the fixture
+search backend and a fake chat model with a per-call latency, recording every call to a cassette.
+Replaying that cassette reproduces the session with the same latencies and no network.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import json
+import random
+import re
+import tempfile
+import time
+import typing
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from aiohttp import web
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from interfaces.llm_registry import LLMRegistry, set_llm_registry
+from agents.research_agent.agent import ResearcherAgent
+from agents.research_agent.state import State
+from agents.tools.page_dedup import reset_fingerprint_store
+from agents.tools.search_backends import set_search_backend
+from agents.utils.cassette import get_cassette
+
+CASSETTE_PATH = os.path.join(os.path.dirname(__file__), "corpus", "session.jsonl")
+COMPANIES = ["Veolia", "Celsa", "Bankinter", "Ferrovial", "Damm", "Unicaja"]
+SENTENCES = [
+    "{company} cerró el ejercicio 2024 con una facturación de {n} millones de euros.",
+    "La plantilla de {company} supera los {n} empleados en España y Portugal.",
+    "El consejero delegado de {company} presentó el nuevo plan estratégico.",
+    "{company} tiene su sede principal en Madrid y opera en {n} países.",
+    "Los analistas destacan el crecimiento de {company} en el último trimestre.",
+]
+VALIDATED_TOPIC_RE = re.compile(r"PROPOCIONADO: (.+?)\.\s")
+PACKED_PAGE_RE = re.compile(r"<Sitio web (\S+)>\n(.*?)\n</Sitio web", re.S)
+
+
+def session_config(**overrides) -> Dict[str, Any]:
+    """Agent configuration of the synthetic session, the YAML config with the given overrides."""
+    import yaml
+    with open("config/research_agent_config.yaml", "r") as file:
+        config = yaml.safe_load(file)
+    config.update(
+        max_loops=2, fetch_cache_enabled=False, search_cache_enabled=False, llm_cache_enabled=False,
+        llm_rate_limit_enabled=False, fetch_respect_robots=False, checkpoint_enabled=False,
+        cassette_path=CASSETTE_PATH,
+    )
+    config.update(overrides)
+    return config
+
+
+def page_html(company: str, seed: int) -> str:
+    """News page about the company. The last page of each search is a syndicated copy of the first one."""
+    rng = random.Random(seed - seed % 100 if seed % 100 == 4 else seed)
+    words = ["".join(rng.choice("bcdfglmnprstv") + rng.choice("aeiou") for _ in range(3)) for _ in range(40)]
+    paragraphs = [
+        " ".join(
+            rng.choice(SENTENCES).format(company=company, n=rng.randint(2, 900)) + " " + " ".join(rng.sample(words, 8)) + "."
+            for _ in range(6)
+        )
+        for _ in range(rng.randint(20, 60))
+    ]
+    body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+    return f"<html><head><title>{company} noticias {seed}</title></head><body><nav>Menu</nav>{body}</body></html>"
+
+
+async def start_page_server(delay_range=(0.2, 3.0), seed: int = 0):
+    """Local HTML server where each page answers after its own fixed delay, like sites of different speed."""
+    rng = random.Random(seed)
+    delays: Dict[str, float] = {}
+
+    async def handler(request):
+        path = request.path
+        delay = delays.setdefault(path, rng.uniform(*delay_range))
+        await asyncio.sleep(delay)
+        company, page = request.match_info["company"], int(request.match_info["page"])
+        return web.Response(text=page_html(company.replace("-", " ").title(), page), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{company}/{page}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+def write_search_fixture(path: str, port: int, pages_per_query: int = 5):
+    """Fixture of the search backend pointing at the local server, for every topic the session searches."""
+    fixture = {}
+    for company in COMPANIES:
+        slug = company.lower().replace(" ", "-")
+        for n, topic in enumerate([f"{company} info", f"{company} info facturación y empleados"]):
+            fixture[topic] = [
+                {"url": f"http://127.0.0.1:{port}/{slug}/{n * 100 + i}", "content": topic}
+                for i in range(pages_per_query)
+            ]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(fixture, file, ensure_ascii=False)
+
+
+def fake_value(annotation: Any, name: str, prompt: str) -> Any:
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        return fake_value(typing.get_args(annotation)[0], name, prompt)
+    if annotation is bool:
+        return False
+    if annotation is float:
+        # e.g. the confidence asked of the small model of a cascade, stable per prompt
+        return round(random.Random(zlib.crc32(prompt.encode("utf-8"))).uniform(0.4, 1.0), 2)
+    if origin in (list, List):
+        return [f"{name} {i}" for i in range(3)]
+    return f"{name}: {prompt[-200:]}"
+
+
+class FakeChatModel:
+    """
+    Chat model with structured output filled from the schema fields. Each prompt gets its own latency
+    within latency_range, the same in every session, so that sessions run in different modes are comparable.
+    """
+    def __init__(self, latency_range=(1.0, 4.0), schema: Optional[type] = None):
+        self.latency_range = latency_range
+        self.schema = schema
+
+    def with_structured_output(self, schema: type, **kwargs) -> "FakeChatModel":
+        return FakeChatModel(self.latency_range, schema=schema)
+
+    async def ainvoke(self, input: Any, config: Optional[Any] = None, **kwargs) -> Any:
+        prompt = input if isinstance(input, str) else str(input)
+        low, high = self.latency_range
+        await asyncio.sleep(low + (high - low) * random.Random(zlib.crc32(prompt.encode("utf-8"))).random())
+        if self.schema is None:
+            return AIMessage(content=f"Summary of {prompt[-200:]}")
+        if "pages" in self.schema.model_fields:
+            # Packed extraction: one entry per page of the prompt
+            pages = [{"url": url, "notes": f"notes: {content[-200:]}"} for url, content in PACKED_PAGE_RE.findall(prompt)]
+            return self.schema.model_validate({"pages": pages})
+        values = {name: fake_value(field.annotation, name, prompt) for name, field in self.schema.model_fields.items()}
+        if "new_topic" in values:
+            # Ask for a second loop about the missing fields of the validated topic
+            match = VALIDATED_TOPIC_RE.search(prompt)
+            values["is_satisfactory"] = match is None or "facturación" in match.group(1)
+            values["new_topic"] = None if values["is_satisfactory"] else f"{match.group(1)} facturación y empleados"
+        return self.schema.model_validate(values)
+
+
+async def run_session(config: Dict[str, Any], companies: List[str] = COMPANIES) -> Tuple[float, Dict[str, int]]:
+    """Research the companies one after the other and return the elapsed seconds and the cassette stats."""
+    # Notes reused from an earlier session in this process would change the prompts
+    reset_fingerprint_store()
+    agent = ResearcherAgent()
+    start = time.perf_counter()
+    for company in companies:
+        await agent.run(State(topic=f"{company} info"), RunnableConfig(configurable=config))
+    elapsed = time.perf_counter() - start
+    cassette = get_cassette()
+    stats = cassette.get_stats() if cassette else {}
+    await agent.aclose()
+    set_search_backend(None)
+    return elapsed, stats
+
+
+async def record_session(path: str = CASSETTE_PATH, companies: List[str] = COMPANIES,
+                         model_latency: Optional[Dict[str, Tuple[float, float]]] = None, **overrides) -> Tuple[float, Dict[str, int]]:
+    """
+    Record the synthetic session to a cassette and return the recording time in seconds and the cassette stats.
+    model_latency gives the fake models their own latency range by model name, e.g. a faster small model.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    runner, port = await start_page_server()
+    model_latency = model_latency or {}
+    set_llm_registry(LLMRegistry(factory=lambda model, **kwargs: FakeChatModel(model_latency.get(model, (1.0, 4.0)))))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            fixture_path = os.path.join(tmp, "search.json")
+            write_search_fixture(fixture_path, port)
+            config = session_config(
+                cassette_mode="record", cassette_path=path, search_backend="fixture", search_fixture_path=fixture_path,
+                **overrides,
+            )
+            return await run_session(config, companies)
+    finally:
+        set_llm_registry(None)
+        await runner.cleanup()
@@ -1,14 +1,21 @@
 import os
 import redis
 from dotenv import load_dotenv
-from langchain_community.cache import RedisSemanticCache
 from langchain_openai import OpenAIEmbeddings
-from langchain_core.outputs import Generation
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from interfaces.semantic_cache import EmbeddingMemo, RedisVectorIndex, SemanticCache
 
 # Cargar variables de entorno
 load_dotenv('.env', override=True)
 
+
+def redis_url_from_env() -> str:
+    """Returns the Redis URL based on environment variables."""
+    redis_host = os.getenv("REDIS_HOST", "localhost")
+    redis_port = os.getenv("REDIS_PORT", 6379)
+    return f"redis://{redis_host}:{redis_port}"
+
+
 class RedisConnector:
     """Class to manage Redis operations and semantic caching."""
     def __init__(self, redis_url: Optional[str] = None):
@@ -17,12 +24,20 @@ class RedisConnector:
         self.cache_hits = 0
         self.cache_misses = 0
         self.connector_type = "redis"
+        # One long-lived semantic cache per embeddings object and threshold, with its embedding memo
+        self._semantic_caches: Dict[Tuple[int, float], Tuple[OpenAIEmbeddings, SemanticCache]] = {}
 
     def _get_redis_url(self):
         """Returns the Redis URL based on environment variables."""
-        redis_host = os.getenv("REDIS_HOST", "localhost")
-        redis_port = os.getenv("REDIS_PORT", 6379)
-        return f"redis://{redis_host}:{redis_port}"
+        return redis_url_from_env()
+
+    def _semantic_cache(self, embeddings: OpenAIEmbeddings, score_threshold: float) -> SemanticCache:
+        """Return the semantic cache of the embeddings. score_threshold is a cosine distance, as in RedisSemanticCache."""
+        key = (id(embeddings), score_threshold)
+        if key not in self._semantic_caches:
+            cache = SemanticCache(EmbeddingMemo(embeddings), RedisVectorIndex(self.redis_url), threshold=1.0 - score_threshold)
+            self._semantic_caches[key] = (embeddings, cache)
+        return self._semantic_caches[key][1]
 
     def clear_cache(self):
         """Clears all cache entries."""
@@ -48,19 +63,18 @@ class RedisConnector:
 
     def update_cache(self, question: str, answer: str, embeddings: OpenAIEmbeddings, llm_string: str = "default", score_threshold: float = 0.03):
         """Adds a question-answer pair to the cache."""
-        semantic_cache = RedisSemanticCache(redis_url=self.redis_url, embedding=embeddings, score_threshold=score_threshold)
-        answer = [Generation(text=answer)]  # Ensure answer is a Generation object
-        semantic_cache.update(question, return_val=answer, llm_string=llm_string)
-        print(f"Added to cache: Q: {question} | A: {answer[0].text}")
+        semantic_cache = self._semantic_cache(embeddings, score_threshold)
+        semantic_cache.update(question, llm_string, {"type": "json", "data": answer})
+        print(f"Added to cache: Q: {question} | A: {answer}")
 
     def lookup_cache(self, question: str, embeddings: OpenAIEmbeddings, llm_string: str = "default", score_threshold: float = 0.03) -> Optional[str]:
         """Retrieves an answer from the cache for the given question."""
-        semantic_cache = RedisSemanticCache(redis_url=self.redis_url, embedding=embeddings, score_threshold=score_threshold)
-        cached_response = semantic_cache.lookup(question, llm_string=llm_string)
+        semantic_cache = self._semantic_cache(embeddings, score_threshold)
+        cached_response = semantic_cache.lookup(question, llm_string, node="redis_connector")
         print(f"Checking cache for: '{question}'")
 
         if cached_response:
-            cached_response = cached_response[0].text
+            cached_response = cached_response["data"]
             print(f"Cached response: {cached_response}")
             self.cache_hits += 1
             print(f"[CACHE HIT] Retrieved from cache: '{question}'")
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from langchain_core.load import dumpd
+
+
+def llm_request_key(prompt: Any, provider: str, model: str, temperature: float, schema: Optional[str]) -> str:
+    """Hash of the rendered prompt, the model identity, the temperature and the output schema."""
+    request = {
+        "prompt": prompt if isinstance(prompt, str) else dumpd(prompt),
+        "provider": provider,
+        "model": model,
+        "temperature": float(temperature),
+        "schema": schema,
+    }
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent exact-match cache of LLM responses, in SQLite, with LRU eviction beyond max_bytes
+    and an optional TTL (0 to keep the responses until evicted).
+
+    Each node (extract, synthesize, validate) has its hit and miss counters, and the tokens and seconds
+    that the hits saved. They are kept for this process in stats and added to the totals stored
+    in the database, which add up across batch runs.
+    """
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttl: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                node TEXT NOT NULL,
+                response TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+            CREATE TABLE IF NOT EXISTS node_stats (
+                node TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                tokens_saved INTEGER NOT NULL DEFAULT 0,
+                latency_saved REAL NOT NULL DEFAULT 0
+            );
+            """
+        )
+        self._conn.commit()
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"hits": 0, "misses": 0, "tokens_saved": 0, "latency_saved": 0.0})
+
+    def _count(self, node: str, hit: bool, tokens: int = 0, latency: float = 0.0):
+        stats = self.stats[node]
+        stats["hits" if hit else "misses"] += 1
+        stats["tokens_saved"] += tokens
+        stats["latency_saved"] += latency
+        self._conn.execute(
+            f"""
+            INSERT INTO node_stats (node, {"hits" if hit else "misses"}, tokens_saved, latency_saved) VALUES (?, 1, ?, ?)
+            ON CONFLICT(node) DO UPDATE SET {"hits = hits" if hit else "misses = misses"} + 1,
+                tokens_saved = tokens_saved + excluded.tokens_saved, latency_saved = latency_saved + excluded.latency_saved
+            """,
+            (node, tokens, latency),
+        )
+
+    def get(self, key: str, node: str) -> Optional[Dict[str, Any]]:
+        """Return the encoded response of the request, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, tokens, latency, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl and row[3] + self.ttl <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count(node, hit=False)
+                self._conn.commit()
+                return None
+            self._count(node, hit=True, tokens=row[1], latency=row[2])
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, node: str, response: Dict[str, Any], tokens: int, latency: float):
+        """Store the encoded response, evicting the least recently used responses beyond max_bytes."""
+        data = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, node, data, tokens, latency, len(data), now, now),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                for evicted_key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+                    if excess <= 0:
+                        break
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (evicted_key,))
+                    excess -= size
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-node counters of this process, with the hit rate."""
+        with self._lock:
+            return {
+                node: {**stats, "hit_rate": stats["hits"] / max(stats["hits"] + stats["misses"], 1)}
+                for node, stats in self.stats.items()
+            }
+
+    def get_total_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-node counters stored in the database, summed over every run that used it."""
+        with self._lock:
+            rows = self._conn.execute("SELECT node, hits, misses, tokens_saved, latency_saved FROM node_stats").fetchall()
+        return {
+            node: {"hits": hits, "misses": misses, "tokens_saved": tokens, "latency_saved": latency,
+                   "hit_rate": hits / max(hits + misses, 1)}
+            for node, hits, misses, tokens, latency in rows
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache(config: Optional[Any] = None) -> Optional[LLMResponseCache]:
+    """Return the process-wide LLM response cache, or None if it is disabled in the agent config."""
+    global _llm_cache
+    if config is not None and not config.llm_cache_enabled:
+        return None
+    if _llm_cache is None:
+        if config is None:
+            return None
+        _llm_cache = LLMResponseCache(config.llm_cache_path, max_bytes=config.llm_cache_max_bytes, ttl=config.llm_cache_ttl)
+    return _llm_cache
+
+
+def close_llm_cache():
+    """Close the process-wide LLM response cache."""
+    global _llm_cache
+    if _llm_cache is not None:
+        _llm_cache.close()
+        _llm_cache = None
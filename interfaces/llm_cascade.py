@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel, Field, create_model
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """A model of the cascade: the small tier answers first, the strong tier takes the escalations."""
+    name: str
+    provider: str
+    model: str
+
+
+_confidence_schemas: Dict[type, type] = {}
+
+
+def with_confidence(schema: type) -> type:
+    """Subclass of the output schema with a self-reported confidence, asked of the small tier."""
+    if schema not in _confidence_schemas:
+        _confidence_schemas[schema] = create_model(
+            f"{schema.__name__}WithConfidence",
+            __base__=schema,
+            __doc__=schema.__doc__,
+            confidence=(float, Field(
+                description="Confianza de 0 a 1 en que la respuesta es correcta y completa según el contenido proporcionado."
+            )),
+        )
+    return _confidence_schemas[schema]
+
+
+def escalation_reason(output: Any, min_confidence: float) -> Optional[str]:
+    """
+    Why the small tier's answer should be escalated, or None to accept it: no valid structured output,
+    a confidence below min_confidence, or empty required text fields (e.g. notes of a page).
+    """
+    if output is None:
+        return "invalid_output"
+    if isinstance(output, BaseMessage):
+        return None if str(output.content).strip() else "empty_output"
+    if isinstance(output, BaseModel):
+        confidence = getattr(output, "confidence", None)
+        if confidence is not None and confidence < min_confidence:
+            return "low_confidence"
+        for name, field in type(output).model_fields.items():
+            value = getattr(output, name)
+            if field.is_required() and isinstance(value, str) and not value.strip():
+                return "empty_field"
+    return None
+
+
+def strip_confidence(output: Any, schema: Optional[type]) -> Any:
+    """The small tier's answer as an instance of the original schema."""
+    if schema is None or not isinstance(output, BaseModel) or type(output) is schema:
+        return output
+    return schema.model_validate(output.model_dump(exclude={"confidence"}))
@@ -1,9 +1,23 @@
-from typing import Optional
+import asyncio
+import json
+import time
+from typing import Any, Optional
 
-from langchain.chat_models import init_chat_model
+from langchain_core.exceptions import OutputParserException
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables.config import ensure_config, merge_configs
+from pydantic import ValidationError
 import os 
 from dotenv import load_dotenv
+from agents.utils.cassette import get_cassette, encode_llm_output, decode_llm_output
+from agents.tools.passage_ranker import estimate_tokens
+from interfaces.llm_cache import get_llm_cache, llm_request_key
+from interfaces.llm_registry import get_llm_registry, schema_name
+from interfaces.semantic_cache import get_semantic_cache
+from agents.utils.llm_ledger import get_current_ledger
+from interfaces.llm_rate_limiter import get_llm_rate_limiter
+from interfaces.llm_cascade import ModelTier, escalation_reason, strip_confidence, with_confidence
 
 load_dotenv('.env', override=True)
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -14,10 +28,136 @@ class LLMInterface:
     def __init__(self, config):
         self.config = config
 
-    def get_llm(self) -> Optional[BaseChatModel]:
-        """Initialize the configured language model."""
+    def _registry(self):
+        # With the rate limiter in front of the calls, the clients do not retry 429s on their own
+        client_kwargs = {"max_retries": 0} if self.config.llm_rate_limit_enabled else None
+        return get_llm_registry(openai_api_key, client_kwargs)
 
-        llm_name = self.config.llm_name
-        llm_provider = self.config.llm_provider
+    def default_tier(self) -> ModelTier:
+        """The configured model, used by every node outside cascade mode and by the escalations in it."""
+        return ModelTier("strong" if self.config.llm_cascade else "default", self.config.llm_provider, self.config.llm_name)
 
-        return init_chat_model(llm_name, model_provider=llm_provider, api_key=openai_api_key)
+    def small_tier(self) -> ModelTier:
+        return ModelTier("small", self.config.llm_small_provider, self.config.llm_small_name)
+
+    def get_llm(self, tier: Optional[ModelTier] = None) -> Optional[BaseChatModel]:
+        """Return the shared client of the configured language model, or of the given tier."""
+        tier = tier or self.default_tier()
+
+        # Record or replay the LLM calls when a cassette is configured, replay needs no model
+        cassette = get_cassette(self.config)
+        if cassette is not None and cassette.mode == "replay":
+            return cassette.wrap_llm(None, tier.provider, tier.model)
+
+        llm = self._registry().get_client(tier.provider, tier.model, self.config.llm_temperature)
+        if cassette is not None:
+            return cassette.wrap_llm(llm, tier.provider, tier.model)
+        return llm
+
+    def get_structured_llm(self, schema: Any, tier: Optional[ModelTier] = None) -> Any:
+        """Return the shared runnable of the configured language model, or of the given tier, bound to the output schema."""
+        tier = tier or self.default_tier()
+        cassette = get_cassette(self.config)
+        if cassette is not None:
+            return self.get_llm(tier).with_structured_output(schema)
+        return self._registry().get_structured(tier.provider, tier.model, self.config.llm_temperature, schema)
+
+    def warm_up(self, schemas=()):
+        """Build the clients and the structured-output runnables of the configured models ahead of the first call."""
+        if get_cassette(self.config) is not None:
+            return
+        registry = self._registry()
+        registry.warm_up(self.config.llm_provider, self.config.llm_name, self.config.llm_temperature, schemas)
+        if self.config.llm_cascade:
+            small = self.small_tier()
+            registry.warm_up(small.provider, small.model, self.config.llm_temperature, [with_confidence(schema) for schema in schemas])
+
+    async def ainvoke(self, prompt: Any, node: str, schema: Optional[Any] = None, url: Optional[str] = None) -> Any:
+        """
+        Invoke the configured model, with structured output if a schema is given.
+
+        In cascade mode, the nodes in llm_cascade_small_nodes ask the small tier first, with a confidence field
+        added to the schema. Its answer is escalated to the strong tier (llm_name) when it is not valid structured
+        output, its confidence is below llm_cascade_min_confidence or a required text field is empty.
+        """
+        if not self.config.llm_cascade or node not in self.config.llm_cascade_small_nodes:
+            return await self._ainvoke_tier(prompt, node, schema, url, self.default_tier())
+
+        small_schema = with_confidence(schema) if isinstance(schema, type) else schema
+        try:
+            output = await self._ainvoke_tier(prompt, node, small_schema, url, self.small_tier())
+            reason = escalation_reason(output, self.config.llm_cascade_min_confidence)
+        except (OutputParserException, ValidationError):
+            reason = "invalid_output"
+        if reason is None:
+            return strip_confidence(output, schema)
+        return await self._ainvoke_tier(prompt, node, schema, url, self.default_tier(), escalation=reason)
+
+    async def _ainvoke_tier(self, prompt: Any, node: str, schema: Optional[Any], url: Optional[str], tier: ModelTier, escalation: Optional[str] = None) -> Any:
+        """
+        Invoke the model of the tier. The exact same request is served from the LLM response cache, counted
+        under the node (extract, synthesize, validate...). For the nodes in semantic_cache_nodes, a close-enough
+        earlier prompt is served from the semantic cache. The call is recorded in the ledger of the current run,
+        with the node, the URL it is about, the tier and the reason of the escalation that led to it.
+        """
+        ledger = get_current_ledger()
+        cache = get_llm_cache(self.config)
+        semantic_cache = get_semantic_cache(self.config, openai_api_key) if node in self.config.semantic_cache_nodes else None
+        key = semantic_text = scope = None
+        call = {"node": node, "url": url, "tier": tier.name, "escalation": escalation}
+
+        if cache is not None:
+            key = llm_request_key(
+                prompt, tier.provider, tier.model, self.config.llm_temperature,
+                schema_name(schema) if schema is not None else None,
+            )
+            # SQLite lookups of the cache run in a thread, off the event loop
+            cached = await asyncio.to_thread(cache.get, key, node)
+            if cached is not None:
+                if ledger is not None:
+                    ledger.record_cache_hit(cache="exact", model=tier.model, **call)
+                return decode_llm_output(cached, schema)
+
+        if semantic_cache is not None:
+            semantic_text = (prompt if isinstance(prompt, str) else str(prompt))[:self.config.semantic_cache_max_chars]
+            scope = json.dumps([
+                tier.provider, tier.model, float(self.config.llm_temperature),
+                schema_name(schema) if schema is not None else None, node,
+            ])
+            cached = await semantic_cache.alookup(semantic_text, scope, node)
+            if cached is not None:
+                if ledger is not None:
+                    ledger.record_cache_hit(cache="semantic", model=tier.model, **call)
+                return decode_llm_output(cached, schema)
+
+        runnable = self.get_structured_llm(schema, tier) if schema is not None else self.get_llm(tier)
+        start = time.perf_counter()
+        # Added to the callbacks inherited from the graph run, so its event streams see the model's tokens
+        invoke_config = merge_configs(ensure_config(), {"callbacks": [ledger], "metadata": call}) if ledger is not None else None
+        limiter = get_llm_rate_limiter(self.config)
+        if limiter is None:
+            output = await runnable.ainvoke(prompt, invoke_config)
+        else:
+            prompt_text = prompt if isinstance(prompt, str) else str(prompt)
+            output = await limiter.call(
+                (tier.provider, tier.model),
+                lambda: runnable.ainvoke(prompt, invoke_config),
+                tokens=estimate_tokens(prompt_text) + self.config.llm_expected_output_tokens,
+                priority=self.config.llm_priorities.get(node, max(self.config.llm_priorities.values(), default=0)),
+            )
+        latency = time.perf_counter() - start
+        if cache is None and semantic_cache is None:
+            return output
+
+        encoded = encode_llm_output(output)
+        if cache is not None:
+            usage = output.usage_metadata if isinstance(output, BaseMessage) else None
+            if usage:
+                tokens = usage["total_tokens"]
+            else:
+                prompt_text = prompt if isinstance(prompt, str) else str(prompt)
+                tokens = estimate_tokens(prompt_text) + estimate_tokens(json.dumps(encoded["data"], ensure_ascii=False, default=str))
+            await asyncio.to_thread(cache.put, key, node, encoded, tokens, latency)
+        if semantic_cache is not None:
+            await semantic_cache.aupdate(semantic_text, scope, encoded)
+        return output
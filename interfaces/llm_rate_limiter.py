@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+ModelKey = Tuple[str, str]
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether the error is a provider rate limit (HTTP 429), e.g. openai.RateLimitError."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from the Retry-After header of the rate limit response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+@dataclass
+class ModelState:
+    """Buckets, adaptive concurrency and counters of a single model."""
+    requests: float
+    tokens: float
+    limit: float
+    last_refill: float = field(default_factory=time.monotonic)
+    backoff_until: float = 0.0
+    in_flight: int = 0
+    waiters: List[Tuple[int, int, int, asyncio.Future]] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+    calls: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    slow: int = 0
+    tokens_reserved: int = 0
+    total_wait: float = 0.0
+    wait_by_priority: Dict[int, List[float]] = field(default_factory=dict)
+
+
+class LLMRateLimiter:
+    """
+    Shared async limiter in front of the model calls, per provider and model.
+
+    - Request-per-minute and token-per-minute token buckets, the tokens of each call estimated before it.
+    - AIMD concurrency: each success raises the limit by 1/limit, a 429 halves it, and a latency above
+      latency_target lowers it by a tenth.
+    - 429s are retried after the Retry-After delay or a jittered exponential backoff.
+    - Priority lanes: waiting calls are admitted lowest priority first, so the synthesis and the validation
+      get the next slot and bucket tokens ahead of bulk page extractions.
+
+    period is the length of the "minute" of the buckets, shorter in tests against a fake provider.
+    """
+    def __init__(
+        self,
+        rpm: int = 500,
+        tpm: int = 200000,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        latency_target: float = 30.0,
+        period: float = 60.0,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.latency_target = latency_target
+        self.period = period
+        self._models: Dict[ModelKey, ModelState] = {}
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_loop(self):
+        """Futures and timers are bound to a loop, forget the waiters of a previous loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            for state in self._models.values():
+                state.waiters.clear()
+                state.timer = None
+                state.in_flight = 0
+
+    def _get_model(self, model: ModelKey) -> ModelState:
+        if model not in self._models:
+            self._models[model] = ModelState(requests=float(self.rpm), tokens=float(self.tpm), limit=float(self.max_concurrency))
+        return self._models[model]
+
+    def _refill(self, state: ModelState, now: float):
+        elapsed = now - state.last_refill
+        state.requests = min(float(self.rpm), state.requests + elapsed * self.rpm / self.period)
+        state.tokens = min(float(self.tpm), state.tokens + elapsed * self.tpm / self.period)
+        state.last_refill = now
+
+    def _dispatch(self, state: ModelState):
+        """Admit the waiting calls in priority order while a slot, a request and their tokens are available."""
+        state.timer = None
+        now = time.monotonic()
+        self._refill(state, now)
+        while state.waiters:
+            priority, _, tokens, future = state.waiters[0]
+            if future.done():
+                heapq.heappop(state.waiters)
+                continue
+            if state.in_flight >= int(state.limit):
+                return
+            delay = state.backoff_until - now
+            if delay <= 0:
+                # Wait for whichever bucket refills last
+                delay = max(
+                    (1 - state.requests) * self.period / self.rpm,
+                    (tokens - state.tokens) * self.period / self.tpm,
+                )
+            if delay > 0:
+                state.timer = self._loop.call_later(delay, self._dispatch, state)
+                return
+            heapq.heappop(state.waiters)
+            state.requests -= 1
+            state.tokens -= tokens
+            state.in_flight += 1
+            future.set_result(None)
+
+    async def _acquire(self, state: ModelState, tokens: int, priority: int):
+        start = time.monotonic()
+        future = self._loop.create_future()
+        heapq.heappush(state.waiters, (priority, next(self._sequence), min(tokens, self.tpm), future))
+        if state.timer is None:
+            self._dispatch(state)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(state)
+            raise
+        waited = time.monotonic() - start
+        state.total_wait += waited
+        state.wait_by_priority.setdefault(priority, []).append(waited)
+
+    def _release(self, state: ModelState):
+        state.in_flight -= 1
+        if state.timer is None:
+            self._dispatch(state)
+
+    def _backoff_delay(self, error: BaseException, attempt: int) -> float:
+        delay = retry_after(error)
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.5)
+        return min(self.backoff_max, delay)
+
+    async def call(self, model: ModelKey, fn: Callable[[], Awaitable[T]], tokens: int, priority: int = 1) -> T:
+        """Run fn once the model's buckets and concurrency allow it, retrying rate limited calls."""
+        self._ensure_loop()
+        state = self._get_model(model)
+        attempt = 0
+        while True:
+            await self._acquire(state, tokens, priority)
+            state.calls += 1
+            state.tokens_reserved += tokens
+            start = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                # Multiplicative decrease, and every call of the model waits out the backoff
+                state.rate_limited += 1
+                state.retries += 1
+                state.limit = max(float(self.min_concurrency), state.limit / 2)
+                state.backoff_until = max(state.backoff_until, time.monotonic() + self._backoff_delay(e, attempt))
+                attempt += 1
+                continue
+            finally:
+                self._release(state)
+            if time.monotonic() - start > self.latency_target:
+                state.slow += 1
+                state.limit = max(float(self.min_concurrency), state.limit * 0.9)
+            else:
+                state.limit = min(float(self.max_concurrency), state.limit + 1 / state.limit)
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model calls, rate limits, retries, current concurrency limit and mean wait per priority lane."""
+        return {
+            f"{provider}/{model}": {
+                "calls": state.calls,
+                "rate_limited": state.rate_limited,
+                "retries": state.retries,
+                "slow": state.slow,
+                "concurrency_limit": round(state.limit, 2),
+                "in_flight": state.in_flight,
+                "waiting": len(state.waiters),
+                "tokens_reserved": state.tokens_reserved,
+                "mean_wait_s": {
+                    priority: sum(waits) / len(waits) for priority, waits in sorted(state.wait_by_priority.items())
+                },
+            }
+            for (provider, model), state in self._models.items()
+        }
+
+
+_rate_limiter: Optional[LLMRateLimiter] = None
+
+
+def get_llm_rate_limiter(config: Optional[Any] = None) -> Optional[LLMRateLimiter]:
+    """Return the process-wide LLM rate limiter, or None if it is disabled in the agent config."""
+    global _rate_limiter
+    if config is not None and not config.llm_rate_limit_enabled:
+        return None
+    if _rate_limiter is None:
+        if config is None:
+            return None
+        _rate_limiter = LLMRateLimiter(
+            rpm=config.llm_rpm,
+            tpm=config.llm_tpm,
+            max_concurrency=config.llm_max_concurrency,
+            max_retries=config.llm_max_retries,
+            backoff_base=config.llm_backoff_base,
+            backoff_max=config.llm_backoff_max,
+            latency_target=config.llm_latency_target,
+        )
+    return _rate_limiter
+
+
+def set_llm_rate_limiter(limiter: Optional[LLMRateLimiter]):
+    """Replace the process-wide LLM rate limiter, e.g. with one of a shorter period in benchmarks."""
+    global _rate_limiter
+    _rate_limiter = limiter
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
+
+ClientKey = Tuple[str, str, float]
+
+
+def schema_name(schema: Any) -> str:
+    return schema.__name__ if isinstance(schema, type) else str(schema.get("title", schema))
+
+
+class LLMRegistry:
+    """
+    Process-wide registry of chat model clients keyed by provider, model and temperature, and of their
+    structured-output runnables keyed also by output schema, so each one is built once and shared.
+
+    Construction happens under a lock and without awaiting, so the registry is safe to use from
+    threads and concurrent tasks. The clients keep HTTP connection pools bound to the event loop
+    that first used them: when the registry is used from a different event loop, every client is rebuilt.
+    """
+    def __init__(self, factory: Callable[..., BaseChatModel] = init_chat_model, api_key: Optional[str] = None, client_kwargs: Optional[Dict[str, Any]] = None):
+        self.factory = factory
+        self.api_key = api_key
+        self.client_kwargs = client_kwargs or {}
+        self._clients: Dict[ClientKey, BaseChatModel] = {}
+        self._structured: Dict[Tuple[ClientKey, str], Any] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"clients_built": 0, "structured_built": 0, "client_hits": 0, "structured_hits": 0, "rebuilds": 0}
+
+    def _check_loop(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is not loop:
+            if self._loop is not None and self._clients:
+                self._clients.clear()
+                self._structured.clear()
+                self.stats["rebuilds"] += 1
+            self._loop = loop
+
+    def _client(self, key: ClientKey) -> BaseChatModel:
+        client = self._clients.get(key)
+        if client is None:
+            provider, model, temperature = key
+            client = self.factory(model, model_provider=provider, temperature=temperature, api_key=self.api_key, **self.client_kwargs)
+            self._clients[key] = client
+            self.stats["clients_built"] += 1
+        else:
+            self.stats["client_hits"] += 1
+        return client
+
+    def get_client(self, provider: str, model: str, temperature: float) -> BaseChatModel:
+        """Return the shared client of the model."""
+        with self._lock:
+            self._check_loop()
+            return self._client((provider, model, float(temperature)))
+
+    def get_structured(self, provider: str, model: str, temperature: float, schema: Any) -> Any:
+        """Return the shared runnable of the model bound to the output schema."""
+        key = (provider, model, float(temperature))
+        with self._lock:
+            self._check_loop()
+            structured = self._structured.get((key, schema_name(schema)))
+            if structured is None:
+                structured = self._client(key).with_structured_output(schema)
+                self._structured[(key, schema_name(schema))] = structured
+                self.stats["structured_built"] += 1
+            else:
+                self.stats["structured_hits"] += 1
+            return structured
+
+    def warm_up(self, provider: str, model: str, temperature: float, schemas: Iterable[Any] = ()):
+        """Build the client of the model and its structured-output runnables ahead of the first call."""
+        self.get_client(provider, model, temperature)
+        for schema in schemas:
+            self.get_structured(provider, model, temperature, schema)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "clients": len(self._clients), "structured": len(self._structured)}
+
+    async def aclose(self):
+        """Close the HTTP clients of the registered models and forget them."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._structured.clear()
+            self._loop = None
+        for client in clients:
+            # e.g. the AsyncOpenAI and OpenAI clients of ChatOpenAI, each with its own connection pool
+            for name in ("root_async_client", "root_client"):
+                close = getattr(getattr(client, name, None), "close", None)
+                if close is None:
+                    continue
+                try:
+                    result = close()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    print(f"Error while closing the {type(client).__name__} client: {e}")
+
+
+_llm_registry: Optional[LLMRegistry] = None
+
+
+def get_llm_registry(api_key: Optional[str] = None, client_kwargs: Optional[Dict[str, Any]] = None) -> LLMRegistry:
+    """Return the process-wide LLM client registry. client_kwargs are passed to the clients it builds."""
+    global _llm_registry
+    if _llm_registry is None:
+        _llm_registry = LLMRegistry(api_key=api_key, client_kwargs=client_kwargs)
+    return _llm_registry
+
+
+async def close_llm_registry():
+    """Close the clients of the process-wide LLM registry."""
+    global _llm_registry
+    if _llm_registry is not None:
+        await _llm_registry.aclose()
+        _llm_registry = None
+
+
+def set_llm_registry(registry: Optional[LLMRegistry]):
+    """Replace the process-wide LLM registry, e.g. with one building fake models in benchmarks."""
+    global _llm_registry
+    _llm_registry = registry
@@ -0,0 +1,321 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from agents.tools.passage_ranker import tokenize
+
+Match = Optional[Tuple[float, Dict[str, Any]]]
+
+
+class HashingEmbeddings:
+    """
+    Local embeddings without a model: signed feature hashing of the word tokens, for tests,
+    offline benchmarks and single-node use where an embeddings API is not wanted.
+    """
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return vectors.tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+
+class EmbeddingMemo:
+    """Embeddings with a bounded LRU memo keyed by a hash of the text, so the same text is embedded once."""
+    def __init__(self, embeddings: Any, max_entries: int = 10000):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memo_hits": 0, "embedded": 0}
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _split(self, texts: List[str]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        with self._lock:
+            vectors = []
+            for text in texts:
+                vector = self._memo.get(self._key(text))
+                if vector is not None:
+                    self._memo.move_to_end(self._key(text))
+                vectors.append(vector)
+            missing = [index for index, vector in enumerate(vectors) if vector is None]
+            self.stats["memo_hits"] += len(texts) - len(missing)
+            self.stats["embedded"] += len(missing)
+        return vectors, missing
+
+    def _store(self, texts: List[str], vectors: List[Optional[np.ndarray]], missing: List[int], embedded: List[List[float]]) -> np.ndarray:
+        with self._lock:
+            for index, values in zip(missing, embedded):
+                vector = np.asarray(values, dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                vectors[index] = vector / norm if norm else vector
+                self._memo[self._key(texts[index])] = vectors[index]
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return np.vstack(vectors)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-norm embeddings of the texts, one row per text. Only the texts not in the memo are embedded, in one batch."""
+        vectors, missing = self._split(texts)
+        embedded = self.embeddings.embed_documents([texts[index] for index in missing]) if missing else []
+        return self._store(texts, vectors, missing, embedded)
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        vectors, missing = self._split(texts)
+        embedded = await self.embeddings.aembed_documents([texts[index] for index in missing]) if missing else []
+        return self._store(texts, vectors, missing, embedded)
+
+
+class VectorIndex(ABC):
+    """Store of unit-norm vectors with their payloads, searched by cosine similarity within a scope."""
+    # Whether the calls block on I/O, so the async cache runs them in a thread
+    blocking: bool = False
+
+    @abstractmethod
+    def add(self, vector: np.ndarray, scope: str, payload: Dict[str, Any]):
+        """Store the payload under the vector, in the scope."""
+
+    @abstractmethod
+    def search(self, vectors: np.ndarray, scope: str) -> List[Match]:
+        """Return the most similar stored entry of the scope for each row of vectors, as (similarity, payload), or None."""
+
+    def close(self):
+        pass
+
+
+class InMemoryVectorIndex(VectorIndex):
+    """
+    NumPy vector index for tests and single-node use. All the query vectors are scored against
+    the whole matrix in one product. Beyond capacity, the least recently matched entry is replaced.
+    """
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._lock = threading.Lock()
+        self.stats = {"evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, vector: np.ndarray, scope: str, payload: Dict[str, Any]):
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            if len(self._payloads) < self.capacity:
+                row = len(self._payloads)
+                self._scopes.append(scope)
+                self._payloads.append(payload)
+            else:
+                row = int(self._last_used.argmin())
+                self._scopes[row] = scope
+                self._payloads[row] = payload
+                self.stats["evictions"] += 1
+            self._vectors[row] = vector
+            self._last_used[row] = time.monotonic()
+
+    def search(self, vectors: np.ndarray, scope: str) -> List[Match]:
+        with self._lock:
+            size = len(self._payloads)
+            if not size:
+                return [None] * len(vectors)
+            similarities = vectors @ self._vectors[:size].T
+            similarities[:, np.array(self._scopes) != scope] = -np.inf
+            best = similarities.argmax(axis=1)
+            matches: List[Match] = []
+            now = time.monotonic()
+            for query, row in enumerate(best):
+                similarity = float(similarities[query, row])
+                if similarity == -np.inf:
+                    matches.append(None)
+                    continue
+                self._last_used[row] = now
+                matches.append((similarity, self._payloads[row]))
+            return matches
+
+
+class RedisVectorIndex(VectorIndex):
+    """
+    Redis (RediSearch) vector index, shared by several processes or nodes. Entries are hashes under prefix,
+    with a FLAT cosine index created on first use, and expire after ttl seconds when ttl > 0.
+    """
+    blocking = True
+
+    def __init__(self, redis_url: str, name: str = "llmcache", ttl: int = 0):
+        import redis
+        self.name = name
+        self.prefix = f"{name}:"
+        self.ttl = ttl
+        self._client = redis.from_url(redis_url)
+        self._dim: Optional[int] = None
+
+    def _ensure_index(self, dim: int):
+        if self._dim == dim:
+            return
+        from redis.commands.search.field import TagField, TextField, VectorField
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+        try:
+            self._client.ft(self.name).info()
+        except Exception:
+            self._client.ft(self.name).create_index(
+                [
+                    TagField("scope"),
+                    TextField("payload", no_stem=True),
+                    VectorField("vector", "FLAT", {"TYPE": "FLOAT32", "DIM": dim, "DISTANCE_METRIC": "COSINE"}),
+                ],
+                definition=IndexDefinition(prefix=[self.prefix], index_type=IndexType.HASH),
+            )
+        self._dim = dim
+
+    def add(self, vector: np.ndarray, scope: str, payload: Dict[str, Any]):
+        self._ensure_index(vector.shape[0])
+        data = vector.astype(np.float32).tobytes()
+        key = self.prefix + hashlib.sha256(scope.encode("utf-8") + data).hexdigest()
+        self._client.hset(key, mapping={"scope": scope, "payload": json.dumps(payload, ensure_ascii=False), "vector": data})
+        if self.ttl:
+            self._client.expire(key, self.ttl)
+
+    def search(self, vectors: np.ndarray, scope: str) -> List[Match]:
+        from redis.commands.search.query import Query
+        self._ensure_index(vectors.shape[1])
+        query = (
+            Query(f"(@scope:{{{scope}}})=>[KNN 1 @vector $vector AS distance]")
+            .sort_by("distance").return_fields("payload", "distance").dialect(2)
+        )
+        matches: List[Match] = []
+        for vector in vectors:
+            result = self._client.ft(self.name).search(query, query_params={"vector": vector.astype(np.float32).tobytes()})
+            if not result.docs:
+                matches.append(None)
+                continue
+            doc = result.docs[0]
+            matches.append((1.0 - float(doc.distance), json.loads(doc.payload)))
+        return matches
+
+    def close(self):
+        self._client.close()
+
+
+def scope_id(scope: str) -> str:
+    """Short hexadecimal id of a scope, safe as a Redis tag."""
+    return hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticCache:
+    """
+    Long-lived semantic cache: a text is embedded once (EmbeddingMemo) and answered with the payload
+    of the most similar text stored in the same scope, when their cosine similarity reaches threshold.
+
+    The scope holds what must match exactly besides the text, such as the model and the output schema.
+    Each node (extract, synthesize...) has its hit and miss counters.
+    """
+    def __init__(self, embedder: EmbeddingMemo, index: VectorIndex, threshold: float = 0.95):
+        self.embedder = embedder
+        self.index = index
+        self.threshold = threshold
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"hits": 0, "misses": 0, "similarity": 0.0})
+
+    def _resolve(self, match: Match, node: str) -> Optional[Dict[str, Any]]:
+        with self._stats_lock:
+            stats = self.stats[node]
+            if match is None or match[0] < self.threshold:
+                stats["misses"] += 1
+                return None
+            stats["hits"] += 1
+            stats["similarity"] += match[0]
+        return match[1]
+
+    def lookup(self, text: str, scope: str, node: str = "default") -> Optional[Dict[str, Any]]:
+        """Return the payload stored for a close-enough text in the scope, or None."""
+        vectors = self.embedder.embed([text])
+        return self._resolve(self.index.search(vectors, scope_id(scope))[0], node)
+
+    def update(self, text: str, scope: str, payload: Dict[str, Any]):
+        """Store the payload as the answer to the text in the scope."""
+        self.index.add(self.embedder.embed([text])[0], scope_id(scope), payload)
+
+    async def alookup(self, text: str, scope: str, node: str = "default") -> Optional[Dict[str, Any]]:
+        vectors = await self.embedder.aembed([text])
+        if self.index.blocking:
+            match = (await asyncio.to_thread(self.index.search, vectors, scope_id(scope)))[0]
+        else:
+            match = self.index.search(vectors, scope_id(scope))[0]
+        return self._resolve(match, node)
+
+    async def aupdate(self, text: str, scope: str, payload: Dict[str, Any]):
+        vector = (await self.embedder.aembed([text]))[0]
+        if self.index.blocking:
+            await asyncio.to_thread(self.index.add, vector, scope_id(scope), payload)
+        else:
+            self.index.add(vector, scope_id(scope), payload)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-node hits, misses, hit rate and mean similarity of the hits, and the embedding memo counters."""
+        with self._stats_lock:
+            nodes = {
+                node: {
+                    "hits": stats["hits"], "misses": stats["misses"],
+                    "hit_rate": stats["hits"] / max(stats["hits"] + stats["misses"], 1),
+                    "mean_similarity": stats["similarity"] / stats["hits"] if stats["hits"] else 0.0,
+                }
+                for node, stats in self.stats.items()
+            }
+        return {"nodes": nodes, "embeddings": dict(self.embedder.stats)}
+
+    def close(self):
+        self.index.close()
+
+
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache(config: Optional[Any] = None, api_key: Optional[str] = None) -> Optional[SemanticCache]:
+    """Return the process-wide semantic cache, or None if it is disabled in the agent config."""
+    global _semantic_cache
+    if config is not None and not config.semantic_cache_enabled:
+        return None
+    if _semantic_cache is None:
+        if config is None:
+            return None
+        if config.semantic_cache_embeddings == "hashing":
+            embeddings = HashingEmbeddings()
+        elif config.semantic_cache_embeddings == "openai":
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings(api_key=api_key, model=config.embedding_model)
+        else:
+            raise ValueError(f"Unknown semantic cache embeddings: {config.semantic_cache_embeddings}. Use 'openai' or 'hashing'")
+        if config.semantic_cache_backend == "memory":
+            index = InMemoryVectorIndex(capacity=config.semantic_cache_capacity)
+        elif config.semantic_cache_backend == "redis":
+            from connectors.db_connectors.redis_connector import redis_url_from_env
+            index = RedisVectorIndex(config.semantic_cache_redis_url or redis_url_from_env(), ttl=config.semantic_cache_ttl)
+        else:
+            raise ValueError(f"Unknown semantic cache backend: {config.semantic_cache_backend}. Use 'memory' or 'redis'")
+        _semantic_cache = SemanticCache(EmbeddingMemo(embeddings), index, threshold=config.semantic_cache_threshold)
+    return _semantic_cache
+
+
+def close_semantic_cache():
+    """Close the process-wide semantic cache."""
+    global _semantic_cache
+    if _semantic_cache is not None:
+        _semantic_cache.close()
+        _semantic_cache = None
@@ -0,0 +1,41 @@
+import os
+import pytest
+from agents.tools.html_extraction import ENGINES, html_to_text
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+FIXTURES = sorted(name for name in os.listdir(FIXTURES_DIR) if name.endswith(".html"))
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("name", FIXTURES)
+def test_engines_give_the_same_visible_text(name):
+    html = read_fixture(name)
+    texts = {engine: html_to_text(html, engine) for engine in ENGINES}
+    assert len(set(texts.values())) == 1, texts
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<html><body><p>a</p><template><p>t</p></template><p>bc</p></body></html>", "abc"),
+    ("<html><body><template><div>x<template>y</template></div></template>z</body></html>", "z"),
+    ("<html><body><p>a<![CDATA[ cdata ]]>b</p></body></html>", "ab"),
+    ("<html><body><p>caf&eacute; &amp; &unknown; &lt;b&gt;</p></body></html>", "café & &unknown; <b>"),
+    ("<html><head><script>var a = 1</script><style>b {}</style></head><body>z</body></html>", "z"),
+    ("<?xml version='1.0' encoding='utf-8'?><html><body>x</body></html>", "x"),
+    ("", ""),
+])
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_edge_cases(engine, html, expected):
+    assert html_to_text(html, engine) == expected
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_hidden_content_is_left_out(engine):
+    text = html_to_text(read_fixture("hidden_content.html"), engine)
+    for hidden in ("comentario oculto", "Internet Explorer", "plantilla", "anidada", "cdata", "generado", "document.write", "@media"):
+        assert hidden not in text
+    assert text.startswith("Texto visible del artículo.")
+    assert text.endswith("Fin.")
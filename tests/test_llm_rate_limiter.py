@@ -0,0 +1,158 @@
+import asyncio
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+from typing import List, Optional
+import pytest
+from interfaces.llm_rate_limiter import LLMRateLimiter, is_rate_limit_error, retry_after
+
+MODEL = ("fake", "model")
+
+
+class FakeRateLimitError(Exception):
+    """429 answer of the fake provider, with the response headers the OpenAI client exposes."""
+    status_code = 429
+
+    def __init__(self, headers: dict):
+        super().__init__("Rate limit reached")
+        self.response = SimpleNamespace(headers=headers)
+
+
+class FakeProvider:
+    """Provider that answers 429 to its first `failures` calls, then the concurrency limit seen by each call."""
+    def __init__(self, limiter: LLMRateLimiter, failures: int = 0, retry_after: Optional[str] = None):
+        self.limiter = limiter
+        self.failures = failures
+        self.headers = {"retry-after": retry_after} if retry_after is not None else {}
+        self.call_times: List[float] = []
+        self.limits: List[float] = []
+
+    async def __call__(self) -> str:
+        self.call_times.append(time.monotonic())
+        self.limits.append(self.limiter.get_stats()["fake/model"]["concurrency_limit"])
+        if len(self.call_times) <= self.failures:
+            raise FakeRateLimitError(self.headers)
+        return "ok"
+
+
+def test_rate_limit_errors_are_recognized():
+    assert is_rate_limit_error(FakeRateLimitError({}))
+    assert not is_rate_limit_error(ValueError("invalid output"))
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2", 2.0),
+    ("0.5", 0.5),
+    ("-1", 0.0),
+    ("soon", None),
+    (None, None),
+])
+def test_retry_after_header(value, expected):
+    headers = {"retry-after": value} if value is not None else {}
+    assert retry_after(FakeRateLimitError(headers)) == expected
+
+
+def test_retry_after_http_date():
+    delay = retry_after(FakeRateLimitError({"Retry-After": formatdate(time.time() + 30, usegmt=True)}))
+    assert 28 <= delay <= 30
+
+
+def test_429_halves_the_concurrency_limit():
+    limiter = LLMRateLimiter(max_concurrency=8, backoff_base=0.0, backoff_max=0.0)
+    provider = FakeProvider(limiter, failures=2)
+
+    assert asyncio.run(limiter.call(MODEL, provider, tokens=10)) == "ok"
+    # 8 on the first call, halved by each 429, then raised by 1/limit by the success
+    assert provider.limits == [8.0, 4.0, 2.0]
+    stats = limiter.get_stats()["fake/model"]
+    assert stats["concurrency_limit"] == 2.5
+    assert stats["rate_limited"] == 2
+    assert stats["retries"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_concurrency_limit_stays_above_the_minimum():
+    limiter = LLMRateLimiter(max_concurrency=4, min_concurrency=2, backoff_base=0.0, backoff_max=0.0)
+    provider = FakeProvider(limiter, failures=3)
+
+    asyncio.run(limiter.call(MODEL, provider, tokens=10))
+    assert provider.limits == [4.0, 2.0, 2.0, 2.0]
+
+
+def test_retries_give_up_after_max_retries():
+    limiter = LLMRateLimiter(max_retries=2, backoff_base=0.0, backoff_max=0.0)
+    provider = FakeProvider(limiter, failures=5)
+
+    with pytest.raises(FakeRateLimitError):
+        asyncio.run(limiter.call(MODEL, provider, tokens=10))
+    assert len(provider.call_times) == 3
+    assert limiter.get_stats()["fake/model"]["in_flight"] == 0
+
+
+def test_retry_waits_the_retry_after_delay():
+    # The backoff would wait 10 s, the Retry-After header asks for 0.2 s
+    limiter = LLMRateLimiter(backoff_base=10.0, backoff_max=60.0)
+    provider = FakeProvider(limiter, failures=1, retry_after="0.2")
+
+    asyncio.run(limiter.call(MODEL, provider, tokens=10))
+    waited = provider.call_times[1] - provider.call_times[0]
+    assert 0.2 <= waited < 1.0
+
+
+def test_backoff_delays_every_call_of_the_model():
+    async def run():
+        limiter = LLMRateLimiter(backoff_base=10.0, backoff_max=60.0)
+        provider = FakeProvider(limiter, failures=1, retry_after="0.2")
+        first = asyncio.create_task(limiter.call(MODEL, provider, tokens=10))
+        await asyncio.sleep(0.05)
+        # Issued during the backoff of the first call, it waits for its end too
+        start = time.monotonic()
+        await limiter.call(MODEL, lambda: asyncio.sleep(0, "ok"), tokens=10)
+        await first
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.1
+
+
+def test_waiting_calls_are_admitted_by_priority():
+    async def run():
+        limiter = LLMRateLimiter(max_concurrency=1)
+        order = []
+        release = asyncio.Event()
+
+        async def blocking():
+            await release.wait()
+            return "ok"
+
+        def labelled(label):
+            async def fn():
+                order.append(label)
+                return label
+            return fn
+
+        # The first call holds the only slot while the others queue up
+        holder = asyncio.create_task(limiter.call(MODEL, blocking, tokens=10, priority=1))
+        await asyncio.sleep(0)
+        calls = [
+            asyncio.create_task(limiter.call(MODEL, labelled(label), tokens=10, priority=priority))
+            for label, priority in [("extract-1", 2), ("extract-2", 2), ("synthesize", 0), ("validate", 1)]
+        ]
+        await asyncio.sleep(0)
+        assert limiter.get_stats()["fake/model"]["waiting"] == 4
+        release.set()
+        await asyncio.gather(holder, *calls)
+        return order
+
+    # Lowest priority first, in arrival order within a lane
+    assert asyncio.run(run()) == ["synthesize", "validate", "extract-1", "extract-2"]
+
+
+def test_bucket_limits_the_request_rate():
+    async def run():
+        # 5 requests per 0.5 s period: the bucket starts full, the next 5 calls wait for its refill
+        limiter = LLMRateLimiter(rpm=5, tpm=100000, period=0.5)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.call(MODEL, lambda: asyncio.sleep(0, "ok"), tokens=10) for _ in range(10)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.4
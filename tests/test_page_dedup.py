@@ -0,0 +1,66 @@
+import itertools
+import os
+import pytest
+from agents.research_agent.agent_config import AgentConfig
+from agents.tools.page_dedup import MAX_DISTANCE, FingerprintStore, group_near_duplicates, simhash
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "pages")
+# The same press release as published by the company, a news site (section, byline, share footer)
+# and a news agency (own headline and dateline, reworded attribution)
+SYNDICATED = ["veolia_results.txt", "veolia_results_syndicated.txt", "veolia_results_agency.txt"]
+# Another article about the same company, and the results of another company from a similar template
+DISTINCT = ["veolia_water_contract.txt", "damm_results.txt"]
+
+
+def fingerprint(name: str) -> int:
+    with open(os.path.join(PAGES_DIR, name), "r", encoding="utf-8") as file:
+        return simhash(file.read())
+
+
+def distance(a: str, b: str) -> int:
+    return bin(fingerprint(a) ^ fingerprint(b)).count("1")
+
+
+def test_default_max_distance_is_the_configured_one():
+    assert AgentConfig.from_runnable_config({}).dedup_max_distance == MAX_DISTANCE
+
+
+@pytest.mark.parametrize("a, b", list(itertools.combinations(SYNDICATED, 2)))
+def test_syndicated_copies_are_near_duplicates(a, b):
+    assert distance(a, b) <= MAX_DISTANCE
+
+
+@pytest.mark.parametrize("a, b", [
+    *itertools.combinations(DISTINCT, 2),
+    *itertools.product(SYNDICATED, DISTINCT),
+])
+def test_distinct_pages_are_not_near_duplicates(a, b):
+    # With a margin, so that a default tuned on these pages does not sit on their boundary
+    assert distance(a, b) > MAX_DISTANCE + 4
+
+
+def test_repeated_boilerplate_does_not_make_pages_similar():
+    boilerplate = "Suscríbete a nuestro boletín para recibir las últimas noticias de empresas. " * 40
+    with open(os.path.join(PAGES_DIR, "veolia_water_contract.txt"), "r", encoding="utf-8") as file:
+        water = file.read()
+    with open(os.path.join(PAGES_DIR, "damm_results.txt"), "r", encoding="utf-8") as file:
+        damm = file.read()
+    assert bin(simhash(water + boilerplate) ^ simhash(damm + boilerplate)).count("1") > MAX_DISTANCE
+
+
+def test_group_near_duplicates():
+    names = SYNDICATED[:2] + DISTINCT + SYNDICATED[2:]
+    groups = group_near_duplicates([fingerprint(name) for name in names])
+    assert groups == [[0, 1, 4], [2], [3]]
+
+
+def test_fingerprint_store_reuses_notes_for_the_same_topic_only():
+    store = FingerprintStore()
+    notes = {"url": "https://www.veolia.com/resultados-2024", "notes": "Facturación de 44.700 millones de euros."}
+    store.add(fingerprint("veolia_results.txt"), "Veolia info", notes)
+
+    assert store.lookup(fingerprint("veolia_results_syndicated.txt"), "Veolia info") == notes
+    # The notes were extracted for Veolia, a page found while researching another topic is extracted again
+    assert store.lookup(fingerprint("veolia_results_syndicated.txt"), "Damm info") is None
+    assert store.lookup(fingerprint("veolia_water_contract.txt"), "Veolia info") is None
+    assert store.get_stats() == {"lookups": 3, "reused": 1, "entries": 1}
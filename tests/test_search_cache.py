@@ -0,0 +1,40 @@
+import pytest
+from agents.tools.search_cache import SearchCache
+
+PARAMS = {"backend": "fixture", "max_results": 5}
+RESULTS = [{"url": "https://example.com/empresas-con-ia", "title": "Empresas con IA"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SearchCache(str(tmp_path / "search_cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_casing_and_whitespace_hit_the_same_entry(cache):
+    cache.put("Empresas con IA", PARAMS, RESULTS)
+    assert cache.get("  empresas   CON ia ", PARAMS) == RESULTS
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_word_order_is_a_near_hit(cache):
+    cache.put("empresas con IA", PARAMS, RESULTS)
+    assert cache.get("IA empresas con", PARAMS) == RESULTS
+    assert cache.get_stats()["near_hits"] == 1
+
+
+@pytest.mark.parametrize("cached, query", [
+    ("empresas con IA", "empresas sin IA"),
+    ("Veolia", "Veolia info"),
+    ("empresas con IA", "empresas con IA noticias"),
+])
+def test_queries_with_a_word_of_their_own_miss(cache, cached, query):
+    cache.put(cached, PARAMS, RESULTS)
+    assert cache.get(query, PARAMS) is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_other_search_parameters_miss(cache):
+    cache.put("empresas con IA", PARAMS, RESULTS)
+    assert cache.get("empresas con IA", {**PARAMS, "max_results": 10}) is None